@@ -0,0 +1 @@
+default_app_config = 'yumljira.apps.projects.apps.ProjectsConfig'
@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 
 class ProjectsConfig(AppConfig):
-    name = 'projects'
+    name = 'yumljira.apps.projects'
+    label = 'projects'
+
+    def ready(self):
+        from . import signals  # noqa: F401
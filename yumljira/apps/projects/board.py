@@ -0,0 +1,149 @@
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+
+from .choices import COLUMN_CHANGE, COMMENT_CHANGE, PROJECT_CHANGE, SPRINT_CHANGE, TASK_CHANGE
+from .models import BoardChange, Comment, Task
+
+
+"""
+Board payload is built from a fixed number of flat queries (sprints, columns,
+tasks with comment counts and time totals, assignees) which are stitched together
+in memory. Number of queries does not depend on number of columns or tasks.
+Built boards are cached until the project changes (see `board_cache.py`).
+
+Clients keep boards up to date with changes since board `version` they have
+(see `get_board_changes`). Only changed objects are read so cost of the sync
+depends on number of changes, not on size of the board.
+"""
+
+COLUMN_FIELDS = ('pk', 'title', 'number_in_board', 'should_show', 'removable')
+
+TASK_FIELDS = ('pk', 'title', 'priority', 'task_type', 'created_by', 'assigned_to',
+    'story', 'column', 'rank', 'created', 'modified')
+
+SPRINT_FIELDS = ('pk', 'name', 'is_closed', 'created')
+
+COMMENT_FIELDS = ('pk', 'content', 'owner', 'task', 'created', 'modified')
+
+USER_FIELDS = ('pk', 'username', 'first_name', 'last_name')
+
+
+def get_board(project):
+    """
+    Builds board of the project.
+
+    Args:
+        project (`Project`) - Project instance.
+
+    Returns:
+        Dict with project data, its board version, sprints, columns with tasks
+        and users assigned to those tasks.
+    """
+    columns = list(project.columns.order_by('number_in_board').values(*COLUMN_FIELDS))
+    tasks_by_column = {column['pk']: [] for column in columns}
+    tasks = _get_tasks(Task.objects.filter(column__project=project))
+
+    for task in tasks:
+        tasks_by_column[task['column']].append(task)
+
+    for column in columns:
+        column['tasks'] = tasks_by_column[column['pk']]
+
+    return {
+        'pk': project.pk,
+        'name': project.name,
+        'key': project.key,
+        'board_type': project.board_type,
+        'version': project.board_version,
+        'sprints': list(project.sprints.order_by('id').values(*SPRINT_FIELDS)),
+        'columns': columns,
+        'assignees': _get_assignees(tasks),
+    }
+
+
+def get_board_changes(project, since):
+    """
+    Gets board objects changed after board version `since` (see `BoardChange`).
+
+    Args:
+        project (`Project`) - Project instance.
+        since (int) - Board version client has.
+
+    Returns:
+        Dict with current board `version`, project data (when project or its
+        time total changed), changed sprints, columns, tasks (with comment
+        counts and time totals) and comments, users assigned to changed tasks
+        and `deleted` dict with primary keys of removed objects of every kind.
+        None when changes are not kept since `since` version so client
+        has to refetch the whole board.
+    """
+    version = project.board_version
+
+    # Changes saved after project was read are left for the next sync.
+    changes = BoardChange.objects.filter(project=project, version__gt=since, version__lte=version)
+
+    if since > version or (since < version and not changes.filter(version=since + 1).exists()):
+        return None
+
+    changed = defaultdict(set)
+
+    for kind, pk in changes.order_by().values_list('kind', 'object_pk').distinct():
+        changed[kind].add(pk)
+
+    found = {
+        SPRINT_CHANGE: _get_changed(project.sprints.order_by('id'),
+            changed[SPRINT_CHANGE], SPRINT_FIELDS),
+        COLUMN_CHANGE: _get_changed(project.columns.order_by('number_in_board'),
+            changed[COLUMN_CHANGE], COLUMN_FIELDS),
+        TASK_CHANGE: _get_tasks(Task.objects.filter(column__project=project,
+            pk__in=changed[TASK_CHANGE])) if changed[TASK_CHANGE] else [],
+        COMMENT_CHANGE: _get_changed(Comment.objects.filter(task__column__project=project)
+            .order_by('created', 'id'), changed[COMMENT_CHANGE], COMMENT_FIELDS),
+    }
+
+    return {
+        'pk': project.pk,
+        'version': version,
+        'project': {
+            'name': project.name,
+            'key': project.key,
+            'board_type': project.board_type,
+            'total_minutes': project.total_minutes,
+        } if changed[PROJECT_CHANGE] or changed[TASK_CHANGE] else None,
+        'sprints': found[SPRINT_CHANGE],
+        'columns': found[COLUMN_CHANGE],
+        'tasks': found[TASK_CHANGE],
+        'comments': found[COMMENT_CHANGE],
+        'assignees': _get_assignees(found[TASK_CHANGE]),
+        'deleted': {kind + 's': sorted(changed[kind] - {item['pk'] for item in items})
+            for kind, items in found.items()},
+    }
+
+
+def _get_changed(queryset, pks, fields):
+    """Reads only changed objects, the query is skipped when nothing changed."""
+    return list(queryset.filter(pk__in=pks).values(*fields)) if pks else []
+
+
+def _get_tasks(queryset):
+    tasks = list(queryset.with_time_logged()
+        .annotate(comments_count=Count('comments'))
+        .order_by('rank', 'id')
+        .values(*TASK_FIELDS, 'time_logged_sum', 'comments_count'))
+
+    for task in tasks:
+        task['time_logged'] = task.pop('time_logged_sum')
+
+    return tasks
+
+
+def _get_assignees(tasks):
+    assignees = {task['assigned_to'] for task in tasks if task['assigned_to']}
+
+    if not assignees:
+        return []
+
+    return list(get_user_model().objects.filter(pk__in=assignees)
+        .order_by('id').values(*USER_FIELDS))
@@ -0,0 +1,73 @@
+from django.core.cache import cache
+
+
+"""
+Board cache description:
+    Built board payloads (see `board.py`) are kept in default cache under
+    project pk and its board version. Version is bumped by `Project.board_changed`
+    whenever anything shown on the board changes:
+        * saves and deletes of projects, columns, sprints, tasks, comments and
+          time logs (see `signals.py`),
+        * bulk and queryset updates which skip signals (column numbers and
+          ranks, task moves and rank rebalancing, bulk time logs).
+
+    Version is read before the board is built so snapshot is never older than
+    its key. Snapshots of old versions are never read again and are left to expire,
+    so nothing has to be removed on writes and a snapshot built from not yet
+    committed data is not reachable after commit. The same holds for caches
+    not shared by processes. Numbers of cache hits and misses are counted in cache
+    too, so they are shared by processes using shared cache backend.
+"""
+
+BOARD_CACHE_KEY = 'projects:board:{}:{}'
+
+BOARD_CACHE_TIMEOUT = 60 * 60
+"""Snapshots expire after this many seconds, also those of changes not bumping version (e.g. renamed assignees)."""
+
+BOARD_STATS_KEYS = {'hits': 'projects:board:stats:hits', 'misses': 'projects:board:stats:misses'}
+
+
+def get_cached_board(project_pk, version, build):
+    """
+    Gets board snapshot of the project from cache or builds and caches it.
+
+    Args:
+        project_pk (int) - Project primary key.
+        version (int) - Board version read before calling, see `Project.board_version`.
+        build (callable) - Builds board payload, called on cache miss.
+    """
+    key = BOARD_CACHE_KEY.format(project_pk, version)
+    board = cache.get(key)
+
+    if board is not None:
+        _count('hits')
+        return board
+
+    _count('misses')
+    board = build()
+    cache.set(key, board, BOARD_CACHE_TIMEOUT)
+
+    return board
+
+
+def get_board_cache_stats():
+    """Returns dict with numbers of board cache `hits` and `misses`."""
+    values = cache.get_many(BOARD_STATS_KEYS.values())
+
+    return {name: values.get(key, 0) for name, key in BOARD_STATS_KEYS.items()}
+
+
+def reset_board_cache_stats():
+    cache.delete_many(BOARD_STATS_KEYS.values())
+
+
+def _count(name):
+    key = BOARD_STATS_KEYS[name]
+
+    # `add` does nothing when counter already exists, `incr` is atomic in shared backends.
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Counter was evicted in the meantime.
+            pass
@@ -54,3 +54,24 @@ BACKLOG = 'BACKLOG'
 DONE = 'DONE'
 IN_PROGRESS = 'IN PROGRESS'
 SELECTED_FOR_DEV = 'SELECTED_FOR_DEVELOPMENT'
+
+BOARD_COLUMNS = {
+    KANBAN: (BACKLOG, SELECTED_FOR_DEV, IN_PROGRESS, DONE),
+    SCRUM: (BACKLOG, TO_DO, IN_PROGRESS, DONE),
+}
+"""Titles of columns created for new board of given type."""
+
+PROJECT_CHANGE = 'project'
+SPRINT_CHANGE = 'sprint'
+COLUMN_CHANGE = 'column'
+TASK_CHANGE = 'task'
+COMMENT_CHANGE = 'comment'
+
+BOARD_CHANGE_KINDS = (
+    (PROJECT_CHANGE, PROJECT_CHANGE),
+    (SPRINT_CHANGE, SPRINT_CHANGE),
+    (COLUMN_CHANGE, COLUMN_CHANGE),
+    (TASK_CHANGE, TASK_CHANGE),
+    (COMMENT_CHANGE, COMMENT_CHANGE),
+)
+"""Kinds of board objects recorded in `BoardChange` log."""
@@ -0,0 +1,115 @@
+import re
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+
+from django.utils.translation import gettext as _, gettext_noop
+
+from .choices import OPTION_TO_MINUTE
+
+
+"""
+Durations description:
+    Users log time as number of minutes e.g. '20' or as periods e.g. '2h 30m'.
+    Periods are separated by single space and each of them is a number followed
+    by one of `AVAILABLE_TIME_OPTIONS` characters. Period cannot repeat, negative
+    values are counted as 0 and the first value has to be greater than 0.
+    Periods may contain fractions e.g. '0.5h', total is rounded half up to whole
+    minutes and has to fit `MAX_MINUTES`.
+
+    Duration is parsed in single pass over its periods. The same strings are
+    logged again and again (e.g. '1h', '30m') so parsed values are cached.
+"""
+
+DURATION_CACHE_SIZE = 4096
+"""Number of distinct duration strings kept in cache."""
+
+MAX_MINUTES = 2147483647
+"""The biggest value of integer column minutes are stored in."""
+
+MINUTES_RE = re.compile(r'\s*[+-]?\d+\s*')
+
+# Messages are translated when error is raised, cached results keep them untranslated.
+NOT_POSITIVE = gettext_noop('You have to log more than 0 minutes')
+WRONG_VALUES = gettext_noop('Wrong values')
+REPEATED_PERIODS = gettext_noop('You cannot repeat periods')
+TOO_LONG = gettext_noop('Logged time is too long')
+WRONG_PERIODS = gettext_noop('You can only use those characters to describe periods: m, h, d, w')
+
+
+class DurationError(ValueError):
+    """Raised when duration cannot be parsed. Message is already translated."""
+
+
+def parse_duration(value):
+    """
+    Parses logged duration.
+
+    Args:
+        value (str or int) - Minutes e.g. '20' or periods e.g. '2h 30m'.
+
+    Returns:
+        Number of minutes (int).
+
+    Raises:
+        DurationError: When value is not valid duration.
+    """
+    minutes, error = _parse_duration(str(value))
+
+    if error:
+        raise DurationError(_(error))
+
+    return minutes
+
+
+@lru_cache(maxsize=DURATION_CACHE_SIZE)
+def _parse_duration(value):
+    """Returns tuple (minutes, None) or (None, error message) so errors are cached too."""
+    if MINUTES_RE.fullmatch(value):
+        return _check_minutes(int(value))
+
+    minutes = Decimal(0)
+    periods = set()
+    error = None
+
+    for number, period in enumerate(value.split(' ')):
+        try:
+            time = Decimal(period[:-1])
+        except InvalidOperation:
+            time = None
+
+        if time is None or not time.is_finite():
+            # Wrong value is reported before wrong periods found earlier.
+            return (None, WRONG_VALUES)
+
+        time = max(time, 0)
+
+        if error:
+            continue
+
+        option = period[-1]
+
+        if option in periods:
+            error = REPEATED_PERIODS
+        elif option not in OPTION_TO_MINUTE or (number == 0 and time == 0):
+            error = WRONG_PERIODS
+        elif time > MAX_MINUTES:
+            # Checked before multiplying so huge exponents do not overflow.
+            error = TOO_LONG
+        else:
+            periods.add(option)
+            minutes += OPTION_TO_MINUTE[option] * time
+
+    if error:
+        return (None, error)
+
+    return _check_minutes(int(minutes.to_integral_value(rounding=ROUND_HALF_UP)))
+
+
+def _check_minutes(minutes):
+    if minutes <= 0:
+        return (None, NOT_POSITIVE)
+
+    if minutes > MAX_MINUTES:
+        return (None, TOO_LONG)
+
+    return (minutes, None)
@@ -0,0 +1,67 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+"""
+Exports are streamed row by row. Rows are read with server side cursor
+(`QuerySet.iterator`) so memory usage does not depend on number of exported rows.
+"""
+
+EXPORT_CHUNK_SIZE = 2000
+"""Number of rows fetched from database cursor at once."""
+
+TIME_LOG_EXPORT_FIELDS = ('pk', 'date', 'time_logged', 'user', 'user__username',
+    'task', 'task__title', 'task__column__project', 'created')
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+
+class _Echo:
+    """File-like object which returns written value instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, fields):
+    """
+    Yields CSV lines of `rows` with header made of `fields`.
+
+    Args:
+        rows (iterable) - Dicts with `fields` keys e.g. from `QuerySet.values`.
+        fields (tuple) - Names of exported fields.
+    """
+    writer = csv.writer(_Echo())
+
+    yield writer.writerow(fields)
+
+    for row in rows:
+        yield writer.writerow([row[field] for field in fields])
+
+
+def stream_jsonl(rows):
+    """Yields JSON Lines of `rows`."""
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def stream_export(queryset, fields, export_format):
+    """
+    Yields lines of `queryset` export.
+
+    Args:
+        queryset (`QuerySet`) - Exported objects.
+        fields (tuple) - Names of exported fields, lookups of related fields are allowed.
+        export_format (str) - One of `EXPORT_FORMATS` keys.
+    """
+    rows = queryset.values(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    if export_format == 'csv':
+        return stream_csv(rows, fields)
+
+    return stream_jsonl(rows)
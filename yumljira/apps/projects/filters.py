@@ -1,6 +1,23 @@
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Greatest
+
 from django_filters import rest_framework as filters
 
-from .models import Comment, Project, Task, TimeLog
+from .models import Comment, Project, Task, TimeLog, TimeLogRollup
+
+
+def has_trigram_extension():
+    """Checks if `pg_trgm` extension is installed in the database (see migration 0023)."""
+    if connection.vendor != 'postgresql':
+        return False
+
+    if not hasattr(connection, 'has_trigram_extension'):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            connection.has_trigram_extension = cursor.fetchone() is not None
+
+    return connection.has_trigram_extension
 
 
 class TimeLogFilter(filters.FilterSet):
@@ -12,9 +29,20 @@ class TimeLogFilter(filters.FilterSet):
         fields = ['user', 'date_after', 'date_before', 'task__column__project', 'task']
 
 
-class CommentFilter(filters.FilterSet):
+class TimeLogRollupFilter(filters.FilterSet):
+    """Filters rollups with the same params as `TimeLogFilter`."""
     date_before = filters.DateFilter(field_name='date', lookup_expr='lte')
     date_after = filters.DateFilter(field_name='date', lookup_expr='gte')
+    task__column__project = filters.NumberFilter(field_name='project')
+
+    class Meta:
+        model = TimeLogRollup
+        fields = ['user', 'date_after', 'date_before', 'task__column__project', 'task']
+
+
+class CommentFilter(filters.FilterSet):
+    date_before = filters.DateFilter(field_name='created', lookup_expr='date__lte')
+    date_after = filters.DateFilter(field_name='created', lookup_expr='date__gte')
 
     class Meta:
         model = Comment
@@ -30,7 +58,25 @@ class TaskFilter(filters.FilterSet):
 class ProjectFilter(filters.FilterSet):
     key = filters.CharFilter(lookup_expr='icontains')
     name = filters.CharFilter(lookup_expr='icontains')
+    search = filters.CharFilter(method='filter_search')
+    """
+    Searches `name` or `key` containing value. When `pg_trgm` is installed substring
+    lookups use trigram indexes (see migration 0023) and results are ordered by similarity.
+    """
 
     class Meta:
         model = Project
         fields = ['created_by', 'key', 'board_type', 'name']
+
+    def filter_search(self, queryset, name, value):
+        queryset = queryset.filter(Q(name__icontains=value) | Q(key__icontains=value))
+
+        if not has_trigram_extension():
+            return queryset.order_by('name', 'id')
+
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        return queryset.annotate(similarity=Greatest(
+            TrigramSimilarity('name', value),
+            TrigramSimilarity('key', value),
+        )).order_by('-similarity', 'id')
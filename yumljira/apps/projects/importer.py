@@ -0,0 +1,303 @@
+import json
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.utils.translation import gettext as _
+
+from rest_framework.exceptions import ValidationError
+
+from .durations import DurationError, parse_duration
+from .models import Column, Comment, Project, Sprint, Task, TimeLog
+from .ranks import rank_after
+from .validators import validate_story
+
+
+"""
+Import description:
+    Projects are imported from JSON Lines file. Every line is a single record
+    with `type` key and fields of the model. Records reference each other with
+    `ref` values given in the file and users are referenced by username:
+
+        {"type": "project", "ref": "p1", "name": "Web", "key": "WEB", "board_type": "kanban"}
+        {"type": "column", "ref": "c1", "project": "p1", "title": "TO DO"}
+        {"type": "sprint", "project": "p1", "name": "Sprint 1"}
+        {"type": "task", "ref": "t1", "column": "c1", "title": "Story", "task_type": "STORY"}
+        {"type": "task", "ref": "t2", "column": "c1", "title": "Login", "story": "t1",
+            "created_by": "john", "assigned_to": "jane"}
+        {"type": "comment", "task": "t2", "owner": "john", "content": "Done?"}
+        {"type": "timelog", "task": "t2", "user": "jane", "date": "2019-10-01", "time_logged": "1h 30m"}
+
+    Record has to be placed after records it references. Columns are numbered
+    and tasks are ranked in order they appear in the file. Stories of tasks
+    are validated like in API (see `validate_story`).
+
+    Records are buffered and saved with `bulk_create` in chunks. Buffers are also
+    flushed when record references one which is not saved yet. Users of buffered
+    records are resolved with one query per chunk. Only references and primary
+    keys of saved records are kept in memory.
+"""
+
+RECORD_TYPES = ('project', 'column', 'sprint', 'task', 'comment', 'timelog')
+"""Types of records in order they are saved when buffers are flushed."""
+
+
+class ProjectImporter:
+    """
+    Imports projects from JSON Lines records in one transaction.
+
+    Args:
+        chunk_size (int) - Max number of buffered records of single type.
+        default_user (`User`) - User used when record does not name project
+            creator, comment owner or time log user.
+    """
+
+    def __init__(self, chunk_size=1000, default_user=None):
+        self.chunk_size = chunk_size
+        self.default_user = default_user
+
+        self.pending = {record_type: [] for record_type in RECORD_TYPES}
+        """Buffered (line number, instance, users) tuples of every record type."""
+        self.pending_refs = {record_type: set() for record_type in RECORD_TYPES}
+
+        self.projects = {}
+        """Project ref -> pk."""
+        self.columns = {}
+        """Column ref -> (pk, project pk)."""
+        self.tasks = {}
+        """Task ref -> (pk, project pk, task type)."""
+        self.refs = {'project': self.projects, 'column': self.columns, 'task': self.tasks}
+
+        self.column_numbers = defaultdict(int)
+        self.task_ranks = {}
+        self.users = {}
+        self.counts = {record_type: 0 for record_type in RECORD_TYPES}
+
+    def run(self, lines):
+        """
+        Imports records from iterable of JSON lines (str or bytes).
+
+        Returns:
+            Dict with number of imported records of every type.
+
+        Raises:
+            ValidationError: When any record is invalid. Nothing is saved then.
+        """
+        with transaction.atomic():
+            for line_number, line in enumerate(lines, 1):
+                if isinstance(line, bytes):
+                    line = line.decode('utf-8')
+
+                if line.strip():
+                    self._add(line_number, line)
+
+            self.flush()
+
+        return self.counts
+
+    def flush(self):
+        """Saves all buffered records."""
+        self._load_users()
+
+        for record_type in RECORD_TYPES:
+            entries = self.pending[record_type]
+
+            if not entries:
+                continue
+
+            instances = []
+
+            for line_number, instance, users in entries:
+                for field, username in users.items():
+                    if username not in self.users:
+                        raise self._error(line_number, {field: [_('User does not exist.')]})
+
+                    setattr(instance, field + '_id', self.users[username])
+
+                instances.append(instance)
+
+            getattr(self, '_save_{}s'.format(record_type))(instances)
+
+            self.counts[record_type] += len(instances)
+            self.pending[record_type] = []
+            self.pending_refs[record_type] = set()
+
+    def _add(self, line_number, line):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise self._error(line_number, {'type': [_('Line is not valid JSON.')]})
+
+        if not isinstance(record, dict) or record.get('type') not in RECORD_TYPES:
+            raise self._error(line_number, {'type': [_('Unknown record type.')]})
+
+        record_type = record.pop('type')
+        ref = record.pop('ref', None)
+        users = {}
+        instance = getattr(self, '_build_{}'.format(record_type))(line_number, record, users)
+
+        try:
+            instance.full_clean(exclude=[field.name for field in instance._meta.fields
+                if field.is_relation], validate_unique=False)
+        except DjangoValidationError as error:
+            raise self._error(line_number, error.message_dict)
+
+        self.pending[record_type].append((line_number, instance, users))
+
+        if ref is not None:
+            if ref in self.pending_refs[record_type] or ref in self.refs.get(record_type, ()):
+                raise self._error(line_number, {'ref': [_('Reference is already used.')]})
+
+            self.pending_refs[record_type].add(ref)
+            instance._import_ref = ref
+
+        if len(self.pending[record_type]) >= self.chunk_size:
+            self.flush()
+
+    def _resolve(self, line_number, record_type, ref, field):
+        """Returns saved object referenced by `ref`, flushes buffers when it is not saved yet."""
+        if ref in self.pending_refs[record_type]:
+            self.flush()
+
+        if ref not in self.refs[record_type]:
+            raise self._error(line_number, {field: [_('Unknown reference.')]})
+
+        return self.refs[record_type][ref]
+
+    def _user(self, line_number, record, field, users, default=None, required=False):
+        """Returns `default` user when record does not name one, otherwise it is resolved on flush."""
+        username = record.pop(field, None)
+
+        if username is not None:
+            users[field] = username
+            return None
+
+        if required and default is None:
+            raise self._error(line_number, {field: [_('This field is required.')]})
+
+        return default
+
+    def _build_project(self, line_number, record, users):
+        created_by = self._user(line_number, record, 'created_by', users, self.default_user)
+
+        return Project(created_by=created_by, **self._fields(line_number, record,
+            ('name', 'key', 'board_type')))
+
+    def _build_column(self, line_number, record, users):
+        project = self._resolve(line_number, 'project',
+            record.pop('project', None), 'project')
+
+        self.column_numbers[project] += 1
+        number = self.column_numbers[project]
+
+        return Column(project_id=project, number_in_board=number,
+            **self._fields(line_number, record, ('title', 'should_show', 'removable')))
+
+    def _build_sprint(self, line_number, record, users):
+        project = self._resolve(line_number, 'project',
+            record.pop('project', None), 'project')
+
+        return Sprint(project_id=project, **self._fields(line_number, record, ('name', 'is_closed')))
+
+    def _build_task(self, line_number, record, users):
+        column, _project = self._resolve(line_number, 'column',
+            record.pop('column', None), 'column')
+
+        story = record.pop('story', None)
+        story_type = None
+
+        if story is not None:
+            story, _project, story_type = self._resolve(line_number, 'task', story, 'story')
+
+        self._user(line_number, record, 'created_by', users)
+        self._user(line_number, record, 'assigned_to', users)
+
+        task = Task(column_id=column, story_id=story,
+            **self._fields(line_number, record, ('title', 'description', 'priority', 'task_type')))
+
+        if story is not None:
+            valid, errors = validate_story(task.task_type, story_type)
+
+            if not valid:
+                raise self._error(line_number, errors)
+
+        self.task_ranks[column] = rank_after(self.task_ranks.get(column))
+        task.rank = self.task_ranks[column]
+
+        return task
+
+    def _build_comment(self, line_number, record, users):
+        task = self._resolve(line_number, 'task', record.pop('task', None), 'task')[0]
+        owner = self._user(line_number, record, 'owner', users, self.default_user, required=True)
+
+        return Comment(task_id=task, owner=owner, **self._fields(line_number, record, ('content',)))
+
+    def _build_timelog(self, line_number, record, users):
+        task = self._resolve(line_number, 'task', record.pop('task', None), 'task')[0]
+        user = self._user(line_number, record, 'user', users, self.default_user, required=True)
+        fields = self._fields(line_number, record, ('date', 'time_logged'))
+
+        try:
+            fields['time_logged'] = parse_duration(fields.get('time_logged'))
+        except DurationError as error:
+            raise self._error(line_number, {'time_logged': [str(error)]})
+
+        return TimeLog(task_id=task, user=user, **fields)
+
+    def _fields(self, line_number, record, allowed):
+        unknown = set(record) - set(allowed)
+
+        if unknown:
+            raise self._error(line_number, {field: [_('Unknown field.')] for field in unknown})
+
+        return record
+
+    def _load_users(self):
+        """Resolves usernames of all buffered records with one query."""
+        usernames = {username
+            for entries in self.pending.values()
+            for _line_number, _instance, users in entries
+            for username in users.values()} - self.users.keys()
+
+        if usernames:
+            self.users.update(get_user_model().objects
+                .filter(username__in=usernames)
+                .values_list('username', 'pk'))
+
+    def _save_projects(self, projects):
+        Project.objects.bulk_create(projects, batch_size=self.chunk_size)
+        self._store_refs(projects, self.projects, lambda project: project.pk)
+
+    def _save_columns(self, columns):
+        Column.objects.bulk_create(columns, batch_size=self.chunk_size)
+        self._store_refs(columns, self.columns, lambda column: (column.pk, column.project_id))
+
+    def _save_sprints(self, sprints):
+        Sprint.objects.bulk_create(sprints, batch_size=self.chunk_size)
+
+    def _save_tasks(self, tasks):
+        Task.objects.bulk_create(tasks, batch_size=self.chunk_size)
+
+        column_projects = dict(Column.objects.filter(pk__in={task.column_id for task in tasks})
+            .values_list('pk', 'project'))
+
+        self._store_refs(tasks, self.tasks,
+            lambda task: (task.pk, column_projects[task.column_id], task.task_type))
+
+    def _save_comments(self, comments):
+        Comment.objects.bulk_create(comments, batch_size=self.chunk_size)
+
+    def _save_timelogs(self, time_logs):
+        TimeLog.objects.bulk_create(time_logs, batch_size=self.chunk_size)
+        TimeLog.add_to_totals(time_logs)
+
+    def _store_refs(self, instances, refs, value):
+        for instance in instances:
+            ref = getattr(instance, '_import_ref', None)
+
+            if ref is not None:
+                refs[ref] = value(instance)
+
+    def _error(self, line_number, errors):
+        return ValidationError({'line': [line_number], **errors})
@@ -0,0 +1,99 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from yumljira.apps.projects.durations import _parse_duration, parse_duration
+from yumljira.apps.projects.serializers import TimeLogBulkSerializer
+
+
+COMMON_DURATIONS = ('15', '30', '45', '15m', '30m', '1h', '2h', '1h 30m', '2h 15m',
+    '0.5h', '1d', '4h', '1w 2d', '3h 45m')
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures parsing of logged durations and validation and save of bulk time logs '
+        'as done by bulk endpoint. Time logs are rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=50000,
+            help='Number of parsed durations.')
+        parser.add_argument('--unique', type=float, default=0.1,
+            help='Part of durations which are not repeated (0-1).')
+        parser.add_argument('--entries', type=int, default=TimeLogBulkSerializer.max_time_logs,
+            help='Number of entries of bulk request.')
+        parser.add_argument('--requests', type=int, default=10,
+            help='Number of measured bulk requests.')
+
+    def handle(self, *args, **options):
+        durations = self._get_durations(options['count'], options['unique'])
+
+        uncached = self._measure(_parse_duration.__wrapped__, durations)
+
+        _parse_duration.cache_clear()
+        cached = self._measure(parse_duration, durations)
+
+        self.stdout.write('Durations: {}'.format(len(durations)))
+        self.stdout.write('Without cache: {:.3f}s'.format(uncached))
+        self.stdout.write('With cache: {:.3f}s ({})'.format(cached, _parse_duration.cache_info()))
+
+        _parse_duration.cache_clear()
+        validation, save = self._measure_bulk(durations, options['entries'], options['requests'])
+
+        self.stdout.write('Bulk requests: {} of {} entries'.format(options['requests'], options['entries']))
+        self.stdout.write('Validation: {:.3f}s'.format(validation))
+        self.stdout.write('Save: {:.3f}s'.format(save))
+
+    def _get_durations(self, count, unique):
+        randomizer = random.Random(0)
+
+        return [
+            '{}h {}m'.format(randomizer.randint(1, 99), randomizer.randint(1, 59))
+            if randomizer.random() < unique else randomizer.choice(COMMON_DURATIONS)
+            for _ in range(count)
+        ]
+
+    def _measure(self, parse, durations):
+        start = time.perf_counter()
+
+        for duration in durations:
+            parse(duration)
+
+        return time.perf_counter() - start
+
+    def _measure_bulk(self, durations, entries, requests):
+        """Returns total times of validation and save of `requests` bulk time logs."""
+        try:
+            from yumljira.apps.projects.test_factories import TaskFactory
+            from yumljira.apps.users.test_factories import UserFactory
+        except ImportError:
+            raise CommandError('Benchmark requires development requirements (factory-boy).')
+
+        randomizer = random.Random(0)
+        validation = save = 0
+
+        with transaction.atomic():
+            user = UserFactory(avatar=None)
+            tasks = [TaskFactory(created_by=user).pk for _ in range(10)]
+
+            for _ in range(requests):
+                serializer = TimeLogBulkSerializer(data={'time_logs': [{
+                    'task': randomizer.choice(tasks),
+                    'date': '2019-10-{:02}'.format(randomizer.randint(1, 31)),
+                    'time_logged': randomizer.choice(durations),
+                } for _ in range(entries)]})
+
+                start = time.perf_counter()
+                serializer.is_valid(raise_exception=True)
+                validation += time.perf_counter() - start
+
+                start = time.perf_counter()
+                serializer.save(user=user)
+                save += time.perf_counter() - start
+
+            transaction.set_rollback(True)
+
+        return validation, save
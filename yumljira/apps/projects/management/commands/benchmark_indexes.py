@@ -0,0 +1,142 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.backends.base.creation import TEST_DATABASE_PREFIX
+
+from yumljira.apps.projects.models import Column, Comment, Project, Sprint, Task, TimeLog
+from yumljira.apps.projects.ranks import rank_after
+
+
+FILTER_INDEXES = (
+    (Comment, 'projects_co_task_id_7ad6a7_idx'),
+    (Sprint, 'projects_sprint_open_idx'),
+    (Task, 'projects_ta_assigne_319a2a_idx'),
+    (TimeLog, 'projects_ti_user_id_6ae88c_idx'),
+    (TimeLog, 'projects_ti_task_id_60f435_idx'),
+)
+"""Indexes made for filters and ordering of viewsets (see migration 0022)."""
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds test data with test factories and prints EXPLAIN ANALYZE of filter queries '
+        'without and with filter indexes. Everything is rolled back at the end, but indexes '
+        'are dropped under exclusive locks so it runs only on test database or on database '
+        'confirmed as scratch one with --scratch-database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=20000, help='Number of seeded tasks.')
+        parser.add_argument('--users', type=int, default=50, help='Number of seeded users.')
+        parser.add_argument('--projects', type=int, default=20, help='Number of seeded projects.')
+        parser.add_argument('--scratch-database',
+            help='Name of configured database, confirms it is not used by application.')
+
+    def handle(self, *args, **options):
+        self._check_database(options['scratch_database'])
+
+        try:
+            from yumljira.apps.projects import test_factories
+            from yumljira.apps.users.test_factories import UserFactory
+        except ImportError:
+            raise CommandError('Benchmark requires development requirements (factory-boy).')
+
+        self.randomizer = random.Random(0)
+
+        with transaction.atomic():
+            self.stdout.write('Seeding...')
+            samples = self._seed(test_factories, UserFactory, options)
+            queries = self._get_queries(samples)
+
+            with connection.schema_editor() as schema_editor:
+                for model, index in self._get_indexes():
+                    schema_editor.remove_index(model, index)
+
+            self._explain('Without filter indexes', queries)
+
+            with connection.schema_editor() as schema_editor:
+                for model, index in self._get_indexes():
+                    schema_editor.add_index(model, index)
+
+            self._explain('With filter indexes', queries)
+
+            transaction.set_rollback(True)
+
+    def _check_database(self, scratch_database):
+        """Refuses to run on database which may be used by the application."""
+        settings = connection.settings_dict
+        name = settings['NAME']
+
+        if name == settings['TEST'].get('NAME') or name.startswith(TEST_DATABASE_PREFIX):
+            return
+
+        if scratch_database != name:
+            raise CommandError('Benchmark drops indexes of "{}" database. Run it on test or scratch '
+                'database and confirm it with --scratch-database={}.'.format(name, name))
+
+    def _get_indexes(self):
+        for model, name in FILTER_INDEXES:
+            yield (model, next(index for index in model._meta.indexes if index.name == name))
+
+    def _seed(self, factories, user_factory, options):
+        users = user_factory._meta.model.objects.bulk_create(
+            user_factory.build_batch(options['users'], avatar=None))
+
+        projects = Project.objects.bulk_create(factories.ProjectFactory.build(
+            created_by=self.randomizer.choice(users)) for _ in range(options['projects']))
+
+        Sprint.objects.bulk_create(Sprint(project=project, name='Sprint {}'.format(number),
+            is_closed=number < 9) for project in projects for number in range(10))
+
+        columns = Column.objects.bulk_create(factories.ColumnFactory.build(project=project,
+            number_in_board=number)
+            for project in projects for number in range(1, 5))
+
+        ranks = {}
+        tasks = []
+
+        for _ in range(options['tasks']):
+            column = self.randomizer.choice(columns)
+            ranks[column.pk] = rank_after(ranks.get(column.pk))
+            tasks.append(factories.TaskFactory.build(column=column, rank=ranks[column.pk],
+                created_by=self.randomizer.choice(users), assigned_to=self.randomizer.choice(users)))
+
+        tasks = Task.objects.bulk_create(tasks, batch_size=1000)
+
+        TimeLog.objects.bulk_create((factories.TimeLogFactory.build(
+            task=self.randomizer.choice(tasks), user=self.randomizer.choice(users),
+            time_logged=self.randomizer.randint(1, 480)) for _ in range(options['tasks'] * 2)),
+            batch_size=1000)
+
+        Comment.objects.bulk_create((factories.CommentFactory.build(
+            task=self.randomizer.choice(tasks), owner=self.randomizer.choice(users))
+            for _ in range(options['tasks'])), batch_size=1000)
+
+        with connection.cursor() as cursor:
+            # Indexes cannot be changed while deferred constraints of seeded rows are pending.
+            cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+            cursor.execute('ANALYZE')
+
+        return {'user': users[0], 'project': projects[0], 'task': tasks[0]}
+
+    def _get_queries(self, samples):
+        """Returns queries made by filters and ordering of viewsets."""
+        user, project, task = samples['user'], samples['project'], samples['task']
+
+        return {
+            'Tasks assigned to user': Task.objects.filter(assigned_to=user).order_by('id')[:100],
+            'Tasks of project': Task.objects.filter(column__project=project).order_by('id')[:100],
+            'Time logs of user in month': TimeLog.objects.filter(user=user,
+                date__range=('2019-10-01', '2019-10-31')).order_by('id')[:100],
+            'Time logs of task': TimeLog.objects.filter(task=task).order_by('-date')[:100],
+            'Comments of task': Comment.objects.filter(task=task).order_by('-created', '-id')[:100],
+            'Open sprints of project': Sprint.objects.filter(project=project, is_closed=False),
+        }
+
+    def _explain(self, title, queries):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+
+        for name, queryset in queries.items():
+            self.stdout.write(self.style.MIGRATE_LABEL(name))
+            self.stdout.write(queryset.explain(analyze=True))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from yumljira.apps.projects.board_cache import get_board_cache_stats, reset_board_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Prints numbers of board cache hits and misses counted in shared cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Resets counters after printing.')
+
+    def handle(self, *args, **options):
+        stats = get_board_cache_stats()
+        requests = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / requests if requests else 0
+
+        self.stdout.write('Hits: {hits}, misses: {misses}'.format(**stats))
+        self.stdout.write('Hit ratio: {:.1%}'.format(ratio))
+
+        if options['reset']:
+            reset_board_cache_stats()
@@ -0,0 +1,44 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.exceptions import ValidationError
+
+from yumljira.apps.projects.importer import ProjectImporter
+
+
+class Command(BaseCommand):
+    help = 'Imports projects, columns, sprints, tasks, comments and time logs from JSON Lines file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path of JSON Lines file, "-" reads standard input.')
+        parser.add_argument('--user',
+            help='Username used when record does not name creator, comment owner or time log user.')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+            help='Number of records of single type saved with one insert.')
+
+    def handle(self, *args, **options):
+        default_user = None
+
+        if options['user']:
+            try:
+                default_user = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError('User {} does not exist.'.format(options['user']))
+
+        importer = ProjectImporter(chunk_size=options['chunk_size'], default_user=default_user)
+
+        try:
+            if options['path'] == '-':
+                counts = importer.run(sys.stdin)
+            else:
+                with open(options['path'], encoding='utf-8') as lines:
+                    counts = importer.run(lines)
+        except ValidationError as error:
+            raise CommandError('Import failed: {}'.format(error.detail))
+
+        for record_type, count in counts.items():
+            self.stdout.write('Imported {}s: {}'.format(record_type, count))
+
+        self.stdout.write(self.style.SUCCESS('Import finished.'))
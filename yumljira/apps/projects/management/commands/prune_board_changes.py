@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from yumljira.apps.projects.models import BOARD_CHANGES_RETENTION, BoardChange
+
+
+class Command(BaseCommand):
+    help = 'Removes board changes older than retention period used for delta sync of boards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=BOARD_CHANGES_RETENTION.days,
+            help='Number of days changes are kept for.')
+
+    def handle(self, *args, **options):
+        count = BoardChange.prune(timezone.now() - timedelta(days=options['days']))
+
+        self.stdout.write(self.style.SUCCESS('Board changes removed: {}'.format(count)))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Length
+
+from yumljira.apps.projects.models import Task
+from yumljira.apps.projects.ranks import REBALANCE_LENGTH
+
+
+class Command(BaseCommand):
+    help = 'Rebalances ranks of tasks in columns which ranks got too long.'
+
+    def handle(self, *args, **options):
+        columns = list(Task.objects.annotate(rank_length=Length('rank')) \
+            .filter(rank_length__gt=REBALANCE_LENGTH) \
+            .order_by() \
+            .values_list('column', flat=True) \
+            .distinct())
+
+        for column in columns:
+            Task.rebalance_ranks(column)
+
+        self.stdout.write(self.style.SUCCESS('Rebalanced columns: {}'.format(len(columns))))
@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from yumljira.apps.projects.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds search documents of all tasks and comments with backend set in SEARCH_BACKEND.'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        start = time.perf_counter()
+        count = backend.rebuild()
+
+        self.stdout.write(self.style.SUCCESS('{}: {} documents indexed in {:.2f}s'.format(
+            type(backend).__name__, count, time.perf_counter() - start)))
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models, transaction
+
+from yumljira.apps.projects.models import DailyUserTime, Project, Task, TimeLog
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds stored time totals of tasks, projects and users days from time logs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+            help='Only report drift between stored totals and time logs.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            tasks, projects, days = self._get_drift()
+
+            self.stdout.write('Tasks with drift: {}'.format(tasks))
+            self.stdout.write('Projects with drift: {}'.format(projects))
+            self.stdout.write('User days with drift: {}'.format(days))
+
+            if options['check']:
+                if tasks or projects or days:
+                    raise CommandError('Stored time totals are out of sync.')
+
+                return
+
+            self._rebuild()
+
+        self.stdout.write(self.style.SUCCESS('Time totals rebuilt.'))
+
+    def _get_drift(self):
+        """
+        Returns:
+            Tuple (int, int, int) - Number of tasks, projects and users days
+            which stored totals differ from sum of time logs.
+        """
+        tasks = Task.objects.with_time_logged() \
+            .exclude(total_minutes=models.F('time_logged_sum')) \
+            .count()
+
+        projects = Project.objects.with_time_logged() \
+            .exclude(total_minutes=models.F('time_logged_sum')) \
+            .count()
+
+        stored = {(day.user_id, day.date): day.minutes
+            for day in DailyUserTime.objects.exclude(minutes=0).iterator()}
+        logged = {(day['user'], day['date']): day['minutes']
+            for day in self._get_daily_times().iterator()}
+
+        days = sum(1 for key in stored.keys() | logged.keys()
+            if stored.get(key) != logged.get(key))
+
+        return (tasks, projects, days)
+
+    def _rebuild(self):
+        Task.objects.with_time_logged().update(total_minutes=models.F('time_logged_sum'))
+        Project.objects.with_time_logged().update(total_minutes=models.F('time_logged_sum'))
+
+        DailyUserTime.objects.all().delete()
+        DailyUserTime.objects.bulk_create(
+            (DailyUserTime(user_id=day['user'], date=day['date'], minutes=day['minutes'])
+                for day in self._get_daily_times().iterator()),
+            batch_size=1000,
+        )
+
+    def _get_daily_times(self):
+        return TimeLog.objects.order_by() \
+            .values('user', 'date') \
+            .annotate(minutes=models.Sum('time_logged'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from yumljira.apps.projects.models import TimeLogRollup
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds daily time log rollups from time logs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since',
+            help='First rebuilt day (YYYY-MM-DD). All days are rebuilt when not given.')
+
+    def handle(self, *args, **options):
+        since = None
+
+        if options['since']:
+            try:
+                since = parse_date(options['since'])
+            except ValueError:
+                since = None
+
+            if since is None:
+                raise CommandError('Wrong date: {}.'.format(options['since']))
+
+        count = TimeLogRollup.refresh(since)
+
+        self.stdout.write(self.style.SUCCESS('Rollups refreshed: {}'.format(count)))
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.28 on 2026-10-18 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0016_auto_20261018_1502'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['created', 'id'], name='projects_co_created_684a51_idx'),
+        ),
+    ]
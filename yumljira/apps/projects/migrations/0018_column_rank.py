@@ -0,0 +1,34 @@
+from django.db import migrations, models
+
+
+def set_ranks(apps, schema_editor):
+    from yumljira.apps.projects.ranks import rank_from_number
+
+    Column = apps.get_model('projects', 'Column')
+    columns = list(Column.objects.all())
+
+    for column in columns:
+        column.rank = rank_from_number(column.number_in_board)
+
+    Column.objects.bulk_update(columns, ['rank'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0017_auto_20261018_1505'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='column',
+            name='rank',
+            field=models.CharField(default='', max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunPython(set_ranks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='column',
+            index=models.Index(fields=['project', 'rank'], name='projects_co_project_3e1ae4_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 2.2.28 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+def set_ranks(apps, schema_editor):
+    from yumljira.apps.projects.ranks import rank_from_number
+
+    Column = apps.get_model('projects', 'Column')
+    Task = apps.get_model('projects', 'Task')
+
+    for column in Column.objects.all().iterator():
+        tasks = list(Task.objects.filter(column=column).order_by('id').only('pk'))
+
+        for number, task in enumerate(tasks, start=1):
+            task.rank = rank_from_number(number)
+
+        Task.objects.bulk_update(tasks, ['rank'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0018_column_rank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='rank',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.RunPython(set_ranks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['column', 'rank'], name='projects_ta_column__4b716d_idx'),
+        ),
+    ]
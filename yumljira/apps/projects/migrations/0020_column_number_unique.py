@@ -0,0 +1,44 @@
+from django.db import migrations
+
+
+def renumber_columns(apps, schema_editor):
+    """
+    Columns of other projects were renumbered when column was moved
+    so numbers have to be fixed before constraint is added.
+    """
+    Column = apps.get_model('projects', 'Column')
+    Project = apps.get_model('projects', 'Project')
+
+    for project in Project.objects.all().iterator():
+        columns = list(Column.objects.filter(project=project).order_by('rank', 'id'))
+
+        for number, column in enumerate(columns, start=1):
+            column.number_in_board = number
+
+        Column.objects.bulk_update(columns, ['number_in_board'])
+
+
+def add_constraint(apps, schema_editor):
+    # Deferrable constraints are PostgreSQL only, other databases keep numbers unchecked.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE projects_column ADD CONSTRAINT projects_column_project_number_uniq '
+            'UNIQUE (project_id, number_in_board) DEFERRABLE INITIALLY DEFERRED')
+
+
+def drop_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'ALTER TABLE projects_column DROP CONSTRAINT projects_column_project_number_uniq')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0019_task_rank'),
+    ]
+
+    operations = [
+        migrations.RunPython(renumber_columns, migrations.RunPython.noop),
+        migrations.RunPython(add_constraint, drop_constraint),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 2.2.28 on 2026-10-18 15:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_rollups(apps, schema_editor):
+    TimeLog = apps.get_model('projects', 'TimeLog')
+    TimeLogRollup = apps.get_model('projects', 'TimeLogRollup')
+
+    TimeLogRollup.objects.bulk_create(
+        (TimeLogRollup(date=row['date'], user_id=row['user'], task_id=row['task'],
+            project_id=row['task__column__project'], minutes=row['minutes'],
+            logs_count=row['logs_count'])
+        for row in TimeLog.objects.order_by()
+            .values('date', 'user', 'task', 'task__column__project')
+            .annotate(minutes=models.Sum('time_logged'), logs_count=models.Count('pk'))
+            .iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('projects', '0020_column_number_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimeLogRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('minutes', models.IntegerField(default=0)),
+                ('logs_count', models.IntegerField(default=0)),
+                ('project', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='time_rollups', to='projects.Project')),
+                ('task', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='time_rollups', to='projects.Task')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='time_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='timelogrollup',
+            index=models.Index(fields=['project', 'date'], name='projects_ti_project_fb1b95_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timelogrollup',
+            index=models.Index(fields=['user', 'date'], name='projects_ti_user_id_a01273_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='timelogrollup',
+            unique_together={('date', 'user', 'task')},
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.28 on 2026-10-18 15:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0021_time_log_rollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['task', '-created', '-id'], name='projects_co_task_id_7ad6a7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sprint',
+            index=models.Index(condition=models.Q(is_closed=False), fields=['project'], name='projects_sprint_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'id'], name='projects_ta_assigne_319a2a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timelog',
+            index=models.Index(fields=['user', 'date'], name='projects_ti_user_id_6ae88c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timelog',
+            index=models.Index(fields=['task', 'date'], name='projects_ti_task_id_60f435_idx'),
+        ),
+    ]
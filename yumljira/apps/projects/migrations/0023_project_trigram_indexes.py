@@ -0,0 +1,50 @@
+from django.db import migrations
+
+
+"""
+`icontains` lookup is compiled to `UPPER("field"::text) LIKE UPPER(%s)` on PostgreSQL
+so trigram indexes are built on the same expression. Databases without `pg_trgm`
+extension are skipped and project search falls back to plain `icontains`.
+"""
+
+TRIGRAM_INDEXES = (
+    ('projects_project_name_trgm_idx', 'name'),
+    ('projects_project_key_trgm_idx', 'key'),
+)
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+
+        if not cursor.fetchone():
+            return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    for name, field in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            'CREATE INDEX {} ON projects_project USING gin (UPPER("{}"::text) gin_trgm_ops)'
+            .format(name, field))
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name, _field in TRIGRAM_INDEXES:
+        schema_editor.execute('DROP INDEX IF EXISTS {}'.format(name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0022_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
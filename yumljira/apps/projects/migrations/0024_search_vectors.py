@@ -0,0 +1,75 @@
+# Generated by Django 2.2.28 on 2026-10-18 15:27
+
+from django.db import migrations
+
+import yumljira.apps.projects.models
+
+
+# Configuration has to be the same as `search.SEARCH_CONFIG`.
+CREATE_TRIGGERS = """
+CREATE FUNCTION projects_task_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('pg_catalog.english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('pg_catalog.english', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER projects_task_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, description ON projects_task
+    FOR EACH ROW EXECUTE PROCEDURE projects_task_search_vector();
+
+CREATE TRIGGER projects_comment_search_vector_update
+    BEFORE INSERT OR UPDATE OF content ON projects_comment
+    FOR EACH ROW EXECUTE PROCEDURE tsvector_update_trigger(search_vector, 'pg_catalog.english', content);
+
+UPDATE projects_task SET title = title;
+UPDATE projects_comment SET content = content;
+"""
+
+DROP_TRIGGERS = """
+DROP TRIGGER projects_comment_search_vector_update ON projects_comment;
+DROP TRIGGER projects_task_search_vector_update ON projects_task;
+DROP FUNCTION projects_task_search_vector();
+"""
+
+
+def create_triggers(apps, schema_editor):
+    # Other databases are searched with `InMemorySearchBackend` which does not use vectors.
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_TRIGGERS)
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_TRIGGERS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0023_project_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='search_vector',
+            field=yumljira.apps.projects.models.TextSearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=yumljira.apps.projects.models.TextSearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_triggers, drop_triggers),
+        migrations.AddIndex(
+            model_name='comment',
+            index=yumljira.apps.projects.models.TextSearchIndex(fields=['search_vector'], name='projects_co_search__3d480c_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=yumljira.apps.projects.models.TextSearchIndex(fields=['search_vector'], name='projects_ta_search__54aa88_gin'),
+        ),
+    ]
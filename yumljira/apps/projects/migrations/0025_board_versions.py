@@ -0,0 +1,24 @@
+# Generated by Django 2.2.28 on 2026-10-18 15:36
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0024_search_vectors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='board_modified',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='board_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
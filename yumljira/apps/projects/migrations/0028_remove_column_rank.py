@@ -0,0 +1,21 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:11
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0027_project_list_version'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='column',
+            name='projects_co_project_3e1ae4_idx',
+        ),
+        migrations.RemoveField(
+            model_name='column',
+            name='rank',
+        ),
+    ]
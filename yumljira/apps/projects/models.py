@@ -1,10 +1,23 @@
+import hashlib
+import threading
+from calendar import timegm
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.http import quote_etag
 from django.utils.translation import gettext as _
 
 from model_utils.models import TimeStampedModel
 
 from .choices import *
+from .ranks import RANK_MAX_LENGTH, needs_rebalance, rank_after, rank_between, spread_ranks
 
 
 """
@@ -13,6 +26,8 @@ Board description:
     which user can use: Kanbad and Scrum. To represent board we use `Column` model.
     Each `Column` object has `number_in_board` field which represents the order
     of columns inside board. Those numbers have to be unique within single board.
+    Board is read in order of `rank` field (see `ranks.py`) which is kept in the
+    same order as `number_in_board` but is changed only for created or moved column.
 
     There is also a `Sprint` model used with Scrum board to
     keep informations about sprints in the project.
@@ -24,11 +39,101 @@ Board description:
         * IN PROGRESS
         * DONE
 
+    Project may be also created from template: custom column titles (placed
+    after BACKLOG) and names of initial sprints. Whole board is saved with
+    bulk inserts in the same transaction as the project (see `Project.create_boards`).
+
     `Task` has IntegerField `column` which is used to save last column task was moved to.
 """
 
 
-class Project(TimeStampedModel):
+_board_changes = threading.local()
+"""Changes collected by `Project.collect_board_changes` in current thread."""
+
+
+class TextSearchVectorField(SearchVectorField):
+    """
+    `SearchVectorField` kept as plain text column on databases other than PostgreSQL
+    which are searched with `InMemorySearchBackend` (see `search.py`).
+    """
+
+    def db_type(self, connection):
+        if connection.vendor != 'postgresql':
+            return 'text'
+
+        return super().db_type(connection)
+
+
+class TextSearchIndex(GinIndex):
+    """`GinIndex` of search vectors created as plain index on databases other than PostgreSQL."""
+
+    def create_sql(self, model, schema_editor, using=''):
+        if schema_editor.connection.vendor != 'postgresql':
+            return models.Index.create_sql(self, model, schema_editor, using=using)
+
+        return super().create_sql(model, schema_editor, using=using)
+
+
+class RunningTotalsMixin:
+    """
+    Running totals are changed only with `F()` expressions (see `TimeLog.update_totals`)
+    so saving existing instance must not overwrite them with values read earlier.
+    """
+    running_totals = ('total_minutes',)
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.running_totals]
+
+        super().save(*args, **kwargs)
+
+
+class ProjectQuerySet(models.QuerySet):
+    def with_time_logged(self):
+        """Annotates projects with sum of time logs of their tasks as `time_logged_sum`."""
+        time_logs = TimeLog.objects.filter(task__column__project=models.OuterRef('pk')) \
+            .order_by() \
+            .values('task__column__project') \
+            .annotate(total=models.Sum('time_logged')) \
+            .values('total')
+
+        return self.annotate(time_logged_sum=Coalesce(
+            models.Subquery(time_logs, output_field=models.IntegerField()), 0))
+
+    def delete(self):
+        # Tasks protect their columns so they are removed before boards.
+        with Project.collect_board_changes():
+            Task.objects.filter(column__project__in=self.values('pk')).delete()
+
+            return super().delete()
+
+    def get_board_etag(self):
+        """
+        Gets state of boards of projects in queryset with single aggregate query.
+        Every board change bumps version and time of some project (see `Project.board_changed`)
+        and time is never bumped back, so state changes whenever any of the boards changes.
+        Removed projects leave no rows behind so state includes `ProjectListVersion` too.
+
+        Returns:
+            Tuple (ETag, Last-Modified timestamp) or (None, None) when queryset is empty.
+        """
+        state = self.aggregate(count=models.Count('pk'), pks=models.Sum('pk'),
+            versions=models.Sum('board_version'), modified=models.Max('board_modified'))
+
+        if not state['count']:
+            return (None, None)
+
+        state['list_version'], deleted = ProjectListVersion.get_state()
+        modified = max(state['modified'], deleted) if deleted else state['modified']
+
+        key = '{count}:{pks}:{versions}:{modified}:{list_version}'.format(**state)
+
+        return (quote_etag(hashlib.md5(key.encode()).hexdigest()),
+            timegm(modified.utctimetuple()))
+
+
+class Project(RunningTotalsMixin, TimeStampedModel):
     name = models.CharField(_('Project name'), max_length=255)
     created_by = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL,
         verbose_name=_('Created by'), null=True, blank=False)
@@ -36,54 +141,157 @@ class Project(TimeStampedModel):
 
     board_type = models.CharField(max_length=50, choices=BOARD_TYPE_CHOICES, default=KANBAN)
 
+    total_minutes = models.IntegerField(default=0)
+    """
+    Sum of minutes logged for tasks in project. Kept in sync by `TimeLog.update_totals`
+    and rebuilt by `rebuild_time_totals` command.
+    """
+
+    board_version = models.PositiveIntegerField(default=0)
+    """Bumped by `board_changed` whenever anything shown on the board changes."""
+
+    board_modified = models.DateTimeField(default=timezone.now)
+    """Time of the last `board_version` bump."""
+
+    running_totals = ('total_minutes', 'board_version', 'board_modified')
+
+    objects = ProjectQuerySet.as_manager()
+
     def __str__(self):
         return '{}'.format(self.name)
 
+    @classmethod
+    @transaction.atomic
+    def board_changed(cls, changes):
+        """
+        Bumps board versions of projects (see `ProjectQuerySet.get_board_etag`
+        and `board_cache.py`) and records changed objects in `BoardChange` log
+        under new versions.
+
+        Inside `collect_board_changes` block changes are only collected.
+
+        Args:
+            changes (iterable) - Tuples (project pk, kind, object pk) where kind is
+                one of `BOARD_CHANGE_KINDS`. Changes without project are skipped.
+        """
+        changes = {change for change in changes if change[0] is not None}
+        collected = getattr(_board_changes, 'collected', None)
+
+        if collected is not None:
+            collected.update(changes)
+            return
+
+        pks = {project for project, _kind, _object_pk in changes}
+
+        if not pks:
+            return
+
+        now = timezone.now()
+
+        cls.objects.filter(pk__in=pks).update(board_version=models.F('board_version') + 1,
+            board_modified=now)
+
+        # Updated rows stay locked until commit so versions read back are ours.
+        versions = dict(cls.objects.filter(pk__in=pks).values_list('pk', 'board_version'))
+
+        BoardChange.objects.bulk_create([
+            BoardChange(project_id=project, version=versions[project], kind=kind,
+                object_pk=object_pk, created=now)
+            for project, kind, object_pk in changes
+            if project in versions
+        ], batch_size=1000)
+
+    @classmethod
+    @contextmanager
+    def collect_board_changes(cls):
+        """
+        Runs the block in transaction and records all changes passed to `board_changed`
+        inside it with single `board_changed` call at its end, e.g. changes of objects
+        removed by cascade. Nested blocks are recorded by the outermost one.
+        Changes of projects removed inside the block are dropped with them.
+        """
+        if getattr(_board_changes, 'collected', None) is not None:
+            yield
+            return
+
+        with transaction.atomic():
+            _board_changes.collected = set()
+
+            try:
+                yield
+                changes = _board_changes.collected
+            finally:
+                _board_changes.collected = None
+
+            cls.board_changed(changes)
+
+    def delete(self, *args, **kwargs):
+        # Tasks protect their columns so they are removed before board.
+        with Project.collect_board_changes():
+            Task.objects.filter(column__project=self).delete()
+
+            return super().delete(*args, **kwargs)
+
     def create_kanban_board(self):
-        self._create_columns(SELECTED_FOR_DEV)
+        self.create_board()
 
     def create_scrum_board(self, sprint_name):
-        self._create_columns(TO_DO)
+        self.create_board(sprint_names=[sprint_name])
 
-        Sprint.objects.create(
-            project=self,
-            name=sprint_name
-        )
+    def create_board(self, column_titles=None, sprint_names=()):
+        """Creates board of the project. See `build_board` for arguments."""
+        Project.create_boards([self.build_board(column_titles, sprint_names)])
 
-    def _create_columns(self, second_column_title):
-        """Creates columns for new project.
+    def build_board(self, column_titles=None, sprint_names=()):
+        """
+        Builds (without saving) columns and sprints of new board.
 
         Args:
-            second_column_title (str): Title for second column.
-        """
-        Column.objects.create(
-            title=BACKLOG,
-            project=self,
-            number_in_board=1,
-            should_show=False,
-            removable=False,
-        )
+            column_titles (list) - Titles of custom columns placed after BACKLOG.
+                When not given default columns of board type are used.
+            sprint_names (list) - Names of initial sprints.
 
-        Column.objects.create(
-            title=second_column_title,
-            project=self,
-            number_in_board=2,
-            removable=False,
-        )
+        Returns:
+            Tuple (list, list) - Unsaved `Column` and `Sprint` instances.
+        """
+        if column_titles is None:
+            titles = BOARD_COLUMNS[self.board_type]
+            removable = False
+        else:
+            titles = (BACKLOG, *column_titles)
+            removable = True
 
-        Column.objects.create(
-            title=IN_PROGRESS,
-            project=self,
-            number_in_board=3,
-            removable=False,
-        )
+        columns = [
+            Column(
+                title=title,
+                project=self,
+                number_in_board=number,
+                should_show=number > 1,
+                removable=removable and number > 1,
+            )
+            for number, title in enumerate(titles, 1)
+        ]
 
-        Column.objects.create(
-            title=DONE,
-            project=self,
-            number_in_board=4,
-            removable=False,
-        )
+        sprints = [Sprint(project=self, name=name) for name in sprint_names]
+
+        return (columns, sprints)
+
+    @staticmethod
+    @transaction.atomic
+    def create_boards(boards):
+        """
+        Saves boards built by `build_board` of any number of projects
+        with one bulk insert of columns and one of sprints.
+        """
+        columns = []
+        sprints = []
+
+        for board_columns, board_sprints in boards:
+            columns.extend(board_columns)
+            sprints.extend(board_sprints)
+
+        Column.objects.bulk_create(columns, batch_size=1000)
+        Sprint.objects.bulk_create(sprints, batch_size=1000)
 
 
 class Sprint(TimeStampedModel):
@@ -92,6 +300,13 @@ class Sprint(TimeStampedModel):
     is_closed = models.BooleanField(default=False)
     """Describes if sprint was closed by user."""
 
+    class Meta:
+        indexes = [
+            # Open sprints are few so partial index stays small.
+            models.Index(fields=['project'], name='projects_sprint_open_idx',
+                condition=models.Q(is_closed=False)),
+        ]
+
 
 class Column(models.Model):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='columns')
@@ -107,53 +322,157 @@ class Column(models.Model):
 
     @classmethod
     @transaction.atomic
-    def update_board_numbers(cls, number, action, project):
+    def update_board_numbers(cls, number, action, project, column=None):
         """
         Increase or decrease `number_in_board` field.
         Used when column is created or deleted.
 
         Args:
             number(int) - requested `number_in_board`.
+            column(`Column`) - removed column, its number is read again under board lock
+                instead of `number`.
         """
+        cls.lock_board(project)
+
+        if column is not None:
+            # Column could be moved or removed by other request while waiting for the lock.
+            number = cls.get_board_numbers(project, column)['old_number']
+
+            if number is None:
+                return
+
+        columns = cls.objects.filter(number_in_board__gte=number, project=project)
+
         if action == 'create':
-            cls.objects.filter(number_in_board__gte=number, project=project) \
-                .update(number_in_board=models.F('number_in_board') + 1)
+            columns.update(number_in_board=models.F('number_in_board') + 1)
 
         elif action == 'destroy':
-            cls.objects.filter(number_in_board__gte=number, project=project) \
-                .update(number_in_board=models.F('number_in_board') - 1)
+            columns.update(number_in_board=models.F('number_in_board') - 1)
+
+        # Shifted columns still match the filter, removed column is recorded on delete.
+        Project.board_changed((project.pk, COLUMN_CHANGE, pk)
+            for pk in columns.values_list('pk', flat=True))
 
     @classmethod
     @transaction.atomic
     def update_board_numbers_exist(cls, number, old_instance):
-        old_number = old_instance.number_in_board
-        project = old_instance.project
+        """
+        Moves existing column to `number` position of its board.
+        Used when column is updated.
+
+        Number of `old_instance` is read again under board lock (or set to the new one
+        when column is moved), so it may be saved until the end of transaction
+        without overwriting moves of other requests.
 
-        columns = project.columns.all().order_by('number_in_board') \
-            .values_list('number_in_board', flat=True)
+        Only columns between old and new position of moved column (including it)
+        are changed and all of them are changed with single UPDATE.
+        Uniqueness of numbers is checked at the end of transaction
+        (see deferred `projects_column_project_number_uniq` constraint).
 
-        last_number = columns.last()
+        Args:
+            number(int) - requested `number_in_board`, None when column is not moved.
+            old_instance(`Column`) - moved column.
+        """
+        project = old_instance.project
+        cls.lock_board(project)
 
-        if number == old_number:
+        # Numbers could be changed by other request while waiting for the lock.
+        old_instance.refresh_from_db(fields=['number_in_board'])
+        old_number = old_instance.number_in_board
+
+        if number is None or number == old_number:
             return
 
-        if number > last_number:
+        if number > cls.get_board_numbers(project)['last_number']:
             return
 
         if number > old_number:
-            cls.objects.filter(
-                models.Q(number_in_board__gt=old_number)
-                | models.Q(number_in_board__lte=number)
-            ).update(number_in_board=models.F('number_in_board') - 1)
-
+            low, high, shift = old_number, number, -1
         else:
-            cls.objects.filter(
-                models.Q(number_in_board__lt=old_number)
-                | models.Q(number_in_board__gte=number)
-            ).update(number_in_board=models.F('number_in_board') + 1)
+            low, high, shift = number, old_number, 1
+
+        columns = project.columns.filter(number_in_board__range=(low, high))
+        columns.update(number_in_board=models.Case(
+            models.When(pk=old_instance.pk, then=models.Value(number)),
+            default=models.F('number_in_board') + shift,
+            output_field=models.PositiveSmallIntegerField(),
+        ))
+
+        old_instance.number_in_board = number
+        Project.board_changed((project.pk, COLUMN_CHANGE, pk)
+            for pk in columns.values_list('pk', flat=True))
+
+    @classmethod
+    def get_board_numbers(cls, project, column=None):
+        """
+        Gets `last_number` of board and `old_number` of `column` with single query.
+
+        Returns:
+            Dict with `last_number` and `old_number` keys. `old_number` is None
+            when column is not passed.
+        """
+        return project.columns.aggregate(
+            last_number=models.Max('number_in_board'),
+            old_number=models.Max('number_in_board',
+                filter=models.Q(pk=getattr(column, 'pk', None))))
+
+    @classmethod
+    def lock_board(cls, project):
+        """
+        Locks project row until the end of transaction so columns
+        of single board are never renumbered at the same time.
+        """
+        Project.objects.select_for_update().filter(pk=project.pk).values_list('pk').first()
+
+
+class TaskQuerySet(models.QuerySet):
+    def with_time_logged(self):
+        """
+        Annotates tasks with sum of their time logs as `time_logged_sum`.
+
+        Sum is calculated in subquery so it is not multiplied by other joins
+        (e.g. comments) which may be added to the queryset later.
+        """
+        time_logs = TimeLog.objects.filter(task=models.OuterRef('pk')) \
+            .order_by() \
+            .values('task') \
+            .annotate(total=models.Sum('time_logged')) \
+            .values('total')
+
+        return self.annotate(time_logged_sum=Coalesce(
+            models.Subquery(time_logs, output_field=models.IntegerField()), 0))
+
+    def first_pages(self, columns, size):
+        """
+        Gets first `size` tasks (ordered by rank) of every column in single query.
 
+        Args:
+            columns (list) - `Column` instances.
+            size (int) - Number of tasks per column.
+
+        Returns:
+            Dict with column pks as keys and lists of tasks as values.
+        """
+        pages = {column.pk: [] for column in columns}
+
+        if not pages:
+            return pages
+
+        querysets = [self.filter(column=column).order_by('rank', 'id')[:size] for column in columns]
+        tasks = querysets[0].union(*querysets[1:], all=True) if len(querysets) > 1 else querysets[0]
+
+        for task in sorted(tasks, key=lambda task: (task.rank, task.pk)):
+            pages[task.column_id].append(task)
+
+        return pages
+
+    def delete(self):
+        # Subtasks and comments are removed by cascade.
+        with Project.collect_board_changes():
+            return super().delete()
 
-class Task(TimeStampedModel):
+
+class Task(RunningTotalsMixin, TimeStampedModel):
     title = models.CharField(_('Title'), max_length=255)
     description = models.TextField(_('Description'), null=True, blank=True)
 
@@ -175,13 +494,152 @@ class Task(TimeStampedModel):
 
     column = models.ForeignKey(Column, on_delete=models.PROTECT, related_name='tasks')
 
+    rank = models.CharField(max_length=RANK_MAX_LENGTH, blank=True)
+    """
+    Lexicographic rank of task inside column (see `ranks.py`).
+    New tasks are placed at the end of column.
+    """
+
+    total_minutes = models.IntegerField(default=0)
+    """
+    Sum of minutes logged for task. Kept in sync by `TimeLog.update_totals`
+    and rebuilt by `rebuild_time_totals` command.
+    """
+
+    search_vector = TextSearchVectorField(null=True, editable=False)
+    """Full text search document of title and description kept by database trigger (see `search.py`)."""
+
+    objects = TaskQuerySet.as_manager()
+
     @property
     def time_logged(self):
-        return sum(self.time_logs.all().values_list('time_logged', flat=True))
+        """
+        Sum of minutes logged for task.
+
+        Uses `time_logged_sum` annotation (see `TaskQuerySet.with_time_logged`)
+        or prefetched time logs when available, otherwise hits the database.
+        """
+        if hasattr(self, 'time_logged_sum'):
+            return self.time_logged_sum
+
+        if 'time_logs' in getattr(self, '_prefetched_objects_cache', {}):
+            return sum(log.time_logged for log in self.time_logs.all())
+
+        return self.time_logs.aggregate(
+            total=Coalesce(models.Sum('time_logged'), 0))['total']
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['column', 'rank']),
+            models.Index(fields=['assigned_to', 'id']),
+            TextSearchIndex(fields=['search_vector']),
+        ]
 
     def __str__(self):
         return '{}'.format(self.title)
 
+    def save(self, *args, **kwargs):
+        if self.rank:
+            return super().save(*args, **kwargs)
+
+        with transaction.atomic():
+            self.rank = Task.get_append_rank(self.column_id)
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with Project.collect_board_changes():
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def get_last_rank(cls, column):
+        return cls.objects.filter(column=column) \
+            .order_by('-rank') \
+            .values_list('rank', flat=True) \
+            .first()
+
+    @classmethod
+    def get_append_rank(cls, column):
+        """
+        Gets rank which places task at the end of column.
+        Has to be used inside transaction because column is locked (see `lock_columns`).
+        """
+        cls.lock_columns([column])
+
+        return rank_after(cls.get_last_rank(column))
+
+    @classmethod
+    @transaction.atomic
+    def get_rank_after(cls, column, after, task=None):
+        """
+        Gets rank which places task right after `after` task in column.
+        Rebalances column ranks first when there is no room between neighbours
+        (empty or equal ranks) and schedules rebalance when rank gets too long.
+        Column is locked until the end of transaction (see `lock_columns`).
+
+        Args:
+            column (`Column` or int) - Column of the task.
+            after (`Task`) - Preceding task, None to place task at the top.
+            task (`Task`) - Moved task, None when task is created.
+        """
+        cls.lock_columns([column])
+        rank, next_rank = cls._get_neighbour_ranks(column, after, task)
+
+        # Tasks saved without rank (e.g. with `bulk_create`) get ranks by rebalance.
+        if rank == '' or next_rank == '' or (rank is not None and rank == next_rank):
+            cls.rebalance_ranks(column)
+            rank, next_rank = cls._get_neighbour_ranks(column, after, task)
+
+        new_rank = rank_between(rank, next_rank)
+
+        if needs_rebalance(new_rank):
+            transaction.on_commit(lambda: cls.rebalance_ranks(column))
+
+        return new_rank
+
+    @classmethod
+    def _get_neighbour_ranks(cls, column, after, task):
+        """Gets ranks of `after` task and the task following it (in `rebalance_ranks` order)."""
+        following = cls.objects.filter(column=column) \
+            .exclude(pk=getattr(task, 'pk', None)) \
+            .order_by('rank', 'id')
+        rank = None
+
+        if after:
+            rank = cls.objects.values_list('rank', flat=True).get(pk=after.pk)
+            following = following.filter(models.Q(rank__gt=rank) | models.Q(rank=rank, pk__gt=after.pk))
+
+        return rank, following.values_list('rank', flat=True).first()
+
+    @classmethod
+    def lock_columns(cls, columns):
+        """
+        Locks column rows until the end of transaction so ranks of tasks
+        placed in single column are never computed at the same time.
+
+        Args:
+            columns (iterable) - `Column` instances or pks.
+        """
+        pks = [getattr(column, 'pk', column) for column in columns]
+        list(Column.objects.select_for_update().filter(pk__in=pks).order_by('pk').values_list('pk'))
+
+    @classmethod
+    @transaction.atomic
+    def rebalance_ranks(cls, column):
+        """Spreads ranks of column tasks evenly keeping their order."""
+        tasks = list(cls.objects.filter(column=column)
+            .select_for_update()
+            .order_by('rank', 'id')
+            .only('pk', 'rank'))
+
+        for task, rank in zip(tasks, spread_ranks(len(tasks))):
+            task.rank = rank
+
+        cls.objects.bulk_update(tasks, ['rank'], batch_size=1000)
+
+        project = Column.objects.filter(pk=getattr(column, 'pk', column)) \
+            .values_list('project', flat=True).first()
+        Project.board_changed((project, TASK_CHANGE, task.pk) for task in tasks)
+
 
 class TimeLog(TimeStampedModel):
     task = models.ForeignKey(Task, null=True, blank=True, on_delete=models.SET_NULL,
@@ -199,6 +657,184 @@ class TimeLog(TimeStampedModel):
 
     date = models.DateField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date']),
+            models.Index(fields=['task', 'date']),
+        ]
+
+    @classmethod
+    @transaction.atomic
+    def update_totals(cls, task, user, date, minutes):
+        """
+        Adds `minutes` to stored totals of task, its project and user's day
+        and to daily rollup (see `TimeLogRollup`).
+        Used when time log is created, updated or deleted.
+
+        Args:
+            task (`Task`) - Task time was logged for, may be None.
+            user (`User`) - User who logged time.
+            date (date) - Day time was logged for.
+            minutes (int) - Number of minutes to add, negative to subtract.
+        """
+        if task:
+            Task.objects.filter(pk=task.pk) \
+                .update(total_minutes=models.F('total_minutes') + minutes)
+
+            Project.objects.filter(columns__tasks=task) \
+                .update(total_minutes=models.F('total_minutes') + minutes)
+
+        daily_time, _ = DailyUserTime.objects.get_or_create(user=user, date=date)
+
+        DailyUserTime.objects.filter(pk=daily_time.pk) \
+            .update(minutes=models.F('minutes') + minutes)
+
+        try:
+            rollup, _ = TimeLogRollup.objects.get_or_create(user=user, date=date, task=task,
+                defaults={'project_id': task.column.project_id if task else None})
+        except TimeLogRollup.MultipleObjectsReturned:
+            # Rollups of deleted tasks are not unique (see `TaskViewset.perform_destroy`).
+            rollup = TimeLogRollup.objects.filter(user=user, date=date, task=None).first()
+
+        # Time logs always have positive minutes so the sign tells if log was added or removed.
+        TimeLogRollup.objects.filter(pk=rollup.pk).update(
+            minutes=models.F('minutes') + minutes,
+            logs_count=models.F('logs_count') + (1 if minutes > 0 else -1),
+        )
+
+    @classmethod
+    @transaction.atomic
+    def add_to_totals(cls, time_logs):
+        """
+        Adds minutes of many saved time logs to stored totals and rollups
+        with a fixed number of queries (see `update_totals`). Used when
+        time logs are saved with `bulk_create`. All logs have to have task.
+        """
+        task_projects = dict(Task.objects.filter(pk__in={log.task_id for log in time_logs})
+            .values_list('pk', 'column__project'))
+
+        tasks = defaultdict(int)
+        projects = defaultdict(int)
+        days = defaultdict(int)
+        rollups = defaultdict(lambda: [0, 0])
+
+        for log in time_logs:
+            tasks[log.task_id] += log.time_logged
+            projects[task_projects[log.task_id]] += log.time_logged
+            days[(log.user_id, log.date)] += log.time_logged
+
+            rollup = rollups[(log.date, log.user_id, log.task_id)]
+            rollup[0] += log.time_logged
+            rollup[1] += 1
+
+        Task.objects.bulk_update([Task(pk=pk, total_minutes=models.F('total_minutes') + minutes)
+            for pk, minutes in tasks.items()], ['total_minutes'], batch_size=1000)
+
+        Project.objects.bulk_update([Project(pk=pk, total_minutes=models.F('total_minutes') + minutes)
+            for pk, minutes in projects.items()], ['total_minutes'], batch_size=1000)
+        Project.board_changed((task_projects[pk], TASK_CHANGE, pk) for pk in tasks)
+
+        DailyUserTime.objects.bulk_create([DailyUserTime(user_id=user, date=date)
+            for user, date in days], batch_size=1000, ignore_conflicts=True)
+
+        daily_times = DailyUserTime.objects.select_for_update() \
+            .filter(user__in={user for user, _date in days}, date__in={date for _user, date in days})
+
+        DailyUserTime.objects.bulk_update([
+            DailyUserTime(pk=daily_time.pk,
+                minutes=models.F('minutes') + days[(daily_time.user_id, daily_time.date)])
+            for daily_time in daily_times
+            if (daily_time.user_id, daily_time.date) in days
+        ], ['minutes'], batch_size=1000)
+
+        TimeLogRollup.objects.bulk_create([
+            TimeLogRollup(date=date, user_id=user, task_id=task, project_id=task_projects[task])
+            for date, user, task in rollups
+        ], batch_size=1000, ignore_conflicts=True)
+
+        updated_rollups = []
+
+        # Rollups of other days of the tasks are neither loaded nor locked.
+        for rollup in TimeLogRollup.objects.select_for_update() \
+                .filter(task__in={task for _date, _user, task in rollups},
+                    user__in={user for _date, user, _task in rollups},
+                    date__in={date for date, _user, _task in rollups}):
+            minutes, logs_count = rollups.get((rollup.date, rollup.user_id, rollup.task_id), (0, 0))
+
+            if logs_count:
+                rollup.minutes = models.F('minutes') + minutes
+                rollup.logs_count = models.F('logs_count') + logs_count
+                updated_rollups.append(rollup)
+
+        TimeLogRollup.objects.bulk_update(updated_rollups, ['minutes', 'logs_count'],
+            batch_size=1000)
+
+
+class DailyUserTime(models.Model):
+    """Sum of minutes logged by user in single day."""
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE,
+        related_name="daily_times")
+    date = models.DateField()
+    minutes = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'date')
+
+
+class TimeLogRollup(models.Model):
+    """
+    Sum of minutes logged by user for task in single day. Kept in sync by
+    `TimeLog.update_totals` and refreshed by `refresh_time_rollups` command.
+    Time reports read rollups instead of time logs for days before today.
+    """
+    date = models.DateField()
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE,
+        related_name='time_rollups')
+    project = models.ForeignKey(Project, null=True, on_delete=models.SET_NULL,
+        related_name='time_rollups')
+    task = models.ForeignKey(Task, null=True, on_delete=models.SET_NULL,
+        related_name='time_rollups')
+    minutes = models.IntegerField(default=0)
+    logs_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('date', 'user', 'task')
+        indexes = [
+            models.Index(fields=['project', 'date']),
+            models.Index(fields=['user', 'date']),
+        ]
+
+    @classmethod
+    @transaction.atomic
+    def refresh(cls, since=None):
+        """
+        Rebuilds rollups from time logs.
+
+        Args:
+            since (date) - First rebuilt day, None to rebuild all days.
+
+        Returns:
+            Number of created rollups.
+        """
+        rollups = cls.objects.all()
+        time_logs = TimeLog.objects.order_by()
+
+        if since:
+            rollups = rollups.filter(date__gte=since)
+            time_logs = time_logs.filter(date__gte=since)
+
+        rollups.delete()
+
+        return len(cls.objects.bulk_create(
+            (cls(date=row['date'], user_id=row['user'], task_id=row['task'],
+                project_id=row['task__column__project'], minutes=row['minutes'],
+                logs_count=row['logs_count'])
+            for row in time_logs.values('date', 'user', 'task', 'task__column__project')
+                .annotate(minutes=models.Sum('time_logged'), logs_count=models.Count('pk'))
+                .iterator()),
+            batch_size=1000,
+        ))
+
 
 class Comment(TimeStampedModel):
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="comments")
@@ -206,3 +842,69 @@ class Comment(TimeStampedModel):
 
     content = models.TextField()
 
+    search_vector = TextSearchVectorField(null=True, editable=False)
+    """Full text search document of content kept by database trigger (see `search.py`)."""
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created', 'id']),
+            models.Index(fields=['task', '-created', '-id']),
+            TextSearchIndex(fields=['search_vector']),
+        ]
+
+
+class ProjectListVersion(models.Model):
+    """
+    Single row bumped whenever any project is removed. Lists of projects, tasks
+    and comments include it in their state (see `ProjectQuerySet.get_board_etag`)
+    so their ETag and Last-Modified change also when a project disappears.
+    """
+    version = models.PositiveIntegerField(default=0)
+    modified = models.DateTimeField(default=timezone.now)
+
+    @classmethod
+    def bump(cls):
+        state, _ = cls.objects.get_or_create(pk=1)
+
+        cls.objects.filter(pk=state.pk).update(version=models.F('version') + 1,
+            modified=timezone.now())
+
+    @classmethod
+    def get_state(cls):
+        """Returns tuple (version, time of last bump), (0, None) when no project was removed."""
+        return cls.objects.filter(pk=1).values_list('version', 'modified').first() or (0, None)
+
+
+BOARD_CHANGES_RETENTION = timedelta(days=7)
+"""Clients which did not sync for longer have to refetch the whole board."""
+
+
+class BoardChange(models.Model):
+    """
+    Log of changed board objects used for delta sync of boards (see `board.get_board_changes`).
+    Every `Project.board_changed` call records changed objects under new board version.
+    Deleted objects are recorded too (tombstones), object which is missing when
+    changes are read was deleted or moved out of the project.
+
+    Log is kept for `BOARD_CHANGES_RETENTION`, older entries are removed by
+    `prune_board_changes` command. All entries of single version share `created`
+    so whole versions are removed.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='changes')
+    version = models.PositiveIntegerField()
+    kind = models.CharField(max_length=20, choices=BOARD_CHANGE_KINDS)
+    object_pk = models.IntegerField()
+    created = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project', 'version']),
+        ]
+
+    @classmethod
+    def prune(cls, before=None):
+        """Removes entries created before `before` (defaults to retention), returns their number."""
+        if before is None:
+            before = timezone.now() - BOARD_CHANGES_RETENTION
+
+        return cls.objects.filter(created__lt=before).delete()[0]
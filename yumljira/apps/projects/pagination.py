@@ -0,0 +1,67 @@
+from rest_framework.pagination import Cursor, CursorPagination, PageNumberPagination
+
+
+class ColumnTasksPagination(CursorPagination):
+    """Pagination of tasks inside single column."""
+    ordering = ('rank', 'id')
+    page_size = 50
+
+    def get_next_link_after(self, request, url, page):
+        """
+        Builds link to page following first `page`. Used for pages which
+        were not built by paginator e.g. first pages of columns in board.
+
+        Cursor position holds only the first ordering field, so like in `get_next_link`
+        position of the last item differing from following ones is used and items
+        after it are skipped with offset. Page without such item is skipped with offset only.
+        """
+        self.base_url = request.build_absolute_uri(url)
+        compare = self._get_position_from_instance(page[-1], self.ordering)
+        offset = 0
+
+        for instance in reversed(page):
+            position = self._get_position_from_instance(instance, self.ordering)
+
+            if position != compare:
+                break
+
+            offset += 1
+        else:
+            position = None
+
+        return self.encode_cursor(Cursor(offset=offset, reverse=False, position=position))
+
+
+class SearchPagination(CursorPagination):
+    """Pagination of search results from the best matching ones (see `search.py`)."""
+    ordering = ('-search_rank', '-id')
+    page_size = 20
+
+
+class CursorOrPageNumberPagination(PageNumberPagination):
+    """
+    Page number pagination which switches to cursor pagination when
+    `pagination=cursor` or `cursor` is in query params. Cursor pages do not
+    count rows nor scan skipped ones so deep pages are as fast as the first one.
+
+    Cursor ordering is taken from `cursor_ordering` attribute of the view.
+    """
+    pagination_query_param = 'pagination'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+
+        if request.query_params.get(self.pagination_query_param) == 'cursor' \
+                or CursorPagination.cursor_query_param in request.query_params:
+            self.cursor_paginator = CursorPagination()
+            self.cursor_paginator.ordering = getattr(view, 'cursor_ordering', 'id')
+
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator:
+            return self.cursor_paginator.get_paginated_response(data)
+
+        return super().get_paginated_response(data)
@@ -0,0 +1,135 @@
+import string
+
+
+"""
+Ranks description:
+    Rank is a string used to order objects (e.g. tasks in column). Ranks are
+    compared lexicographically and never end with the lowest character so there
+    is always another rank between two different ranks. Thanks to that object
+    may be placed between its new neighbours by updating only its own rank.
+
+    Every insert between the same neighbours makes rank longer. When rank gets
+    longer than `REBALANCE_LENGTH` ranks of all objects in the group should be
+    spread again evenly (see `spread_ranks`).
+"""
+
+ALPHABET = string.digits + string.ascii_lowercase
+
+BASE = len(ALPHABET)
+
+RANK_MAX_LENGTH = 64
+"""Max length of rank field."""
+
+REBALANCE_LENGTH = 16
+"""Length of rank after which group of ranks should be rebalanced."""
+
+RANK_WIDTH = 6
+"""Minimal number of characters used to encode ranks by `spread_ranks` and `rank_from_number`."""
+
+RANK_STEP = BASE ** 2
+"""Distance between ranks created by `rank_from_number`."""
+
+
+def rank_between(before=None, after=None):
+    """
+    Returns rank placed between two ranks.
+
+    Args:
+        before (str) - Rank which result has to be greater than.
+            None or empty rank means there is no lower limit.
+        after (str) - Rank which result has to be lower than.
+            None or empty rank means there is no upper limit. Empty ranks
+            are left by rows saved without rank (e.g. with `bulk_create`).
+
+    Returns:
+        Shortest rank (str) which is greater than `before` and lower than `after`
+        and which last character is not the lowest one.
+
+    Raises:
+        ValueError: When `before` is not lower than `after`.
+    """
+    before = before or ''
+    after = after or None
+
+    if after is not None and before >= after:
+        raise ValueError('Rank {!r} is not lower than {!r}.'.format(before, after))
+
+    rank = ''
+    position = 0
+
+    while True:
+        low = ALPHABET.index(before[position]) if position < len(before) else 0
+        high = ALPHABET.index(after[position]) \
+            if after is not None and position < len(after) else BASE
+
+        middle = (low + high) // 2
+
+        if middle > low:
+            return rank + ALPHABET[middle]
+
+        rank += ALPHABET[low]
+        position += 1
+
+        # Result is already lower than `after` so it does not limit next characters.
+        if low < high:
+            after = None
+
+
+def rank_after(rank=None):
+    """
+    Returns rank placed after `rank` with `RANK_STEP` distance. Used to append
+    objects at the end of the group without making ranks longer.
+    """
+    if rank is None:
+        return rank_from_number(1)
+
+    number = _decode(rank[:RANK_WIDTH].ljust(RANK_WIDTH, ALPHABET[0])) + RANK_STEP
+
+    if number < BASE ** RANK_WIDTH:
+        return _encode(number)
+
+    return rank_between(rank, None)
+
+
+def rank_from_number(number):
+    """Converts positive position number (e.g. position of task in column) to rank."""
+    return _encode(number * RANK_STEP)
+
+
+def spread_ranks(count):
+    """
+    Returns list of `count` ranks spread evenly in ranks space.
+    Used to create or rebalance ranks of whole group.
+    """
+    width = RANK_WIDTH
+
+    while BASE ** width <= count:
+        width += 1
+
+    step = BASE ** width // (count + 1)
+
+    return [_encode(step * (i + 1), width) for i in range(count)]
+
+
+def needs_rebalance(rank):
+    return len(rank) > REBALANCE_LENGTH
+
+
+def _decode(rank):
+    number = 0
+
+    for character in rank:
+        number = number * BASE + ALPHABET.index(character)
+
+    return number
+
+
+def _encode(number, width=RANK_WIDTH):
+    digits = []
+
+    while number:
+        number, digit = divmod(number, BASE)
+        digits.append(ALPHABET[digit])
+
+    # Trailing lowest characters do not change the order of fixed width ranks.
+    return ''.join(reversed(digits)).rjust(width, ALPHABET[0]).rstrip(ALPHABET[0])
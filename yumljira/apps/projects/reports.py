@@ -0,0 +1,86 @@
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+
+"""
+Time reports are aggregated in database with `GROUP BY` of chosen fields
+so only totals are sent to the client.
+
+Days before today are read from daily rollups (`TimeLogRollup`) which are much
+smaller than time logs table. Only today's and future time logs are read
+directly. Both parts are merged by groups in memory.
+"""
+
+REPORT_GROUPS = {
+    'user': 'user',
+    'task': 'task',
+    'project': 'task__column__project',
+}
+"""Report group name -> `TimeLog` lookup."""
+
+ROLLUP_GROUPS = {
+    'user': 'user',
+    'task': 'task',
+    'project': 'project',
+}
+"""Report group name -> `TimeLogRollup` lookup."""
+
+REPORT_PERIODS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+"""Report period -> function truncating date to the first day of period."""
+
+
+def get_time_report(time_logs, rollups, group_by, period=None):
+    """
+    Sums logged time grouped by given fields and period.
+
+    Args:
+        time_logs (`QuerySet`) - Time logs included in the report.
+        rollups (`QuerySet`) - Rollups matching the same filters as `time_logs`.
+        group_by (list) - Names of `REPORT_GROUPS`.
+        period (str) - One of `REPORT_PERIODS` keys, None to not group by date.
+
+    Returns:
+        List of dicts with group values, `period` (first day of period)
+        when given, `minutes` and `logs_count` ordered by groups.
+    """
+    today = timezone.localdate()
+    names = list(group_by) + (['period'] if period else [])
+    totals = {}
+
+    parts = (
+        (rollups.filter(date__lt=today, logs_count__gt=0), ROLLUP_GROUPS,
+            Sum('minutes'), Sum('logs_count')),
+        (time_logs.filter(date__gte=today), REPORT_GROUPS,
+            Sum('time_logged'), Count('pk')),
+    )
+
+    for queryset, groups, minutes, logs_count in parts:
+        for key, row in _aggregate(queryset, groups, group_by, period, minutes, logs_count):
+            total = totals.setdefault(key, {'minutes': 0, 'logs_count': 0})
+            total['minutes'] += row['minutes']
+            total['logs_count'] += row['logs_count']
+
+    return [
+        dict(zip(names, key), **totals[key])
+        for key in sorted(totals, key=lambda key: [(value is None, value) for value in key])
+    ]
+
+
+def _aggregate(queryset, groups, group_by, period, minutes, logs_count):
+    """Yields (group values, totals) of `queryset` aggregated with `GROUP BY`."""
+    lookups = [groups[name] for name in group_by]
+    queryset = queryset.order_by()
+
+    if period:
+        queryset = queryset.annotate(period=REPORT_PERIODS[period]('date'))
+        lookups.append('period')
+
+    rows = queryset.values(*lookups).annotate(minutes=minutes, logs_count=logs_count)
+
+    for row in rows:
+        yield (tuple(row[lookup] for lookup in lookups), row)
@@ -0,0 +1,226 @@
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils.module_loading import import_string
+
+from .models import Comment, Task
+from .search_index import InvertedIndex, analyze
+
+
+"""
+Search description:
+    Task is found when its own text (title and description) or text of any of
+    its comments matches the query. Rank of the task is sum of its own rank and
+    the best rank of its comments. Search is done by backend set in
+    `SEARCH_BACKEND` setting (dotted path to backend class):
+
+    * `PostgresSearchBackend` (default) - tasks and comments have `search_vector`
+      columns with GIN indexes. Vectors are computed by database triggers on
+      insert and update (see migration 0024) so they are kept also for rows
+      saved with `bulk_create` or `update`:
+        * task - title (weight A) and description (weight B),
+        * comment - content.
+
+    * `InMemorySearchBackend` - pure Python inverted index with BM25 ranking
+      (see `search_index.py`) for databases without Postgres full text search.
+      Index is built from database on first search in the process and then
+      updated from model saves and deletes committed in the same process
+      (see `signals.py`). Index lives in memory of single process, so writes
+      done by other workers and rows changed with `bulk_create` or `update`
+      are seen only after the index is rebuilt. Index older than `MAX_AGE`
+      is rebuilt on the next search, which bounds how stale it gets.
+      `rebuild_search_index` command rebuilds only the index of its own process.
+"""
+
+SEARCH_CONFIG = 'english'
+"""Text search configuration, the same one is used by triggers."""
+
+DEFAULT_SEARCH_BACKEND = 'yumljira.apps.projects.search.PostgresSearchBackend'
+
+_backends = {}
+
+
+def get_search_backend():
+    """Returns instance of backend set in `SEARCH_BACKEND` setting, one per process."""
+    path = getattr(settings, 'SEARCH_BACKEND', DEFAULT_SEARCH_BACKEND)
+
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+
+    return _backends[path]
+
+
+def search_tasks(text, project=None):
+    """
+    Returns tasks matching `text` annotated with `search_rank`.
+
+    Args:
+        text (str) - Searched words.
+        project (int) - Project to search in, None to search in all projects.
+    """
+    return get_search_backend().search_tasks(text, project)
+
+
+class SearchBackend:
+    """Base of search backends. Index updates are no-ops by default."""
+
+    def search_tasks(self, text, project=None):
+        raise NotImplementedError
+
+    def rebuild(self):
+        """Rebuilds search documents of all tasks and comments, returns number of them."""
+        raise NotImplementedError
+
+    def update_task(self, task):
+        pass
+
+    def remove_task(self, pk):
+        pass
+
+    def update_comment(self, comment):
+        pass
+
+    def remove_comment(self, pk):
+        pass
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Postgres full text search of trigger maintained `search_vector` columns."""
+
+    def search_tasks(self, text, project=None):
+        query = SearchQuery(text, config=SEARCH_CONFIG)
+
+        comments = Comment.objects.filter(search_vector=query)
+        comment_ranks = comments.filter(task=models.OuterRef('pk')) \
+            .annotate(rank=SearchRank(models.F('search_vector'), query)) \
+            .order_by('-rank') \
+            .values('rank')[:1]
+
+        # Union lets both parts use their GIN indexes, `OR` of them would scan all tasks.
+        matching = Task.objects.filter(search_vector=query).values('pk') \
+            .union(comments.values('task'))
+        tasks = Task.objects.filter(pk__in=matching)
+
+        if project is not None:
+            tasks = tasks.filter(column__project=project)
+
+        return tasks.annotate(search_rank=
+            Coalesce(SearchRank(models.F('search_vector'), query), 0.0)
+            + Coalesce(models.Subquery(comment_ranks, output_field=models.FloatField()), 0.0))
+
+    def rebuild(self):
+        # No-op updates fire triggers which recompute vectors.
+        return Task.objects.update(title=models.F('title')) \
+            + Comment.objects.update(content=models.F('content'))
+
+
+class InMemorySearchBackend(SearchBackend):
+    """In-process inverted index of tasks and comments, works with any database."""
+
+    TITLE_WEIGHT = 2
+    """Title terms count as many times as this in task document."""
+
+    MAX_RESULTS = 1000
+    """Max number of returned tasks, the best ranked ones are kept."""
+
+    MAX_AGE = 300
+    """Seconds after which index is rebuilt on search to pick up writes of other processes."""
+
+    def __init__(self):
+        self.tasks = InvertedIndex()
+        self.comments = InvertedIndex()
+        self.comment_tasks = {}
+        """Comment pk -> task pk."""
+        self.is_built = False
+        self.built_at = None
+        self.lock = threading.RLock()
+
+    def search_tasks(self, text, project=None):
+        self._ensure_built()
+
+        terms = analyze(text)
+        scores = self.tasks.search(terms)
+        comment_scores = {}
+
+        with self.lock:
+            for comment, score in self.comments.search(terms).items():
+                task = self.comment_tasks[comment]
+                comment_scores[task] = max(comment_scores.get(task, 0.0), score)
+
+        for task, score in comment_scores.items():
+            scores[task] = scores.get(task, 0.0) + score
+
+        # Database drops tasks removed without model delete and those out of project.
+        tasks = Task.objects.filter(pk__in=scores)
+
+        if project is not None:
+            tasks = tasks.filter(column__project=project)
+
+        found = sorted(tasks.values_list('pk', flat=True),
+            key=lambda pk: (-scores[pk], -pk))[:self.MAX_RESULTS]
+
+        return Task.objects.filter(pk__in=found).annotate(search_rank=models.Case(
+            *[models.When(pk=pk, then=models.Value(scores[pk])) for pk in found],
+            default=models.Value(0.0), output_field=models.FloatField()))
+
+    def rebuild(self):
+        with self.lock:
+            self.tasks.clear()
+            self.comments.clear()
+            self.comment_tasks = {}
+
+            for task in Task.objects.values('pk', 'title', 'description').iterator():
+                self.tasks.add(task['pk'], self._task_terms(task['title'], task['description']))
+
+            for comment in Comment.objects.values('pk', 'task', 'content').iterator():
+                self._add_comment(comment['pk'], comment['task'], comment['content'])
+
+            self.is_built = True
+            self.built_at = time.monotonic()
+
+        return len(self.tasks) + len(self.comments)
+
+    def update_task(self, task):
+        if self.is_built:
+            self.tasks.add(task.pk, self._task_terms(task.title, task.description))
+
+    def remove_task(self, pk):
+        if self.is_built:
+            self.tasks.remove(pk)
+
+    def update_comment(self, comment):
+        if self.is_built:
+            with self.lock:
+                self._add_comment(comment.pk, comment.task_id, comment.content)
+
+    def remove_comment(self, pk):
+        if self.is_built:
+            with self.lock:
+                self.comments.remove(pk)
+                self.comment_tasks.pop(pk, None)
+
+    def _ensure_built(self):
+        if not self._is_fresh():
+            with self.lock:
+                if not self._is_fresh():
+                    self.rebuild()
+
+    def _is_fresh(self):
+        return self.is_built and time.monotonic() - self.built_at < self.MAX_AGE
+
+    def _task_terms(self, title, description):
+        terms = Counter(analyze(description))
+
+        for term in analyze(title):
+            terms[term] += self.TITLE_WEIGHT
+
+        return terms
+
+    def _add_comment(self, pk, task, content):
+        self.comments.add(pk, analyze(content))
+        self.comment_tasks[pk] = task
@@ -0,0 +1,150 @@
+import math
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+
+
+"""
+In-process inverted index description:
+    Text is split to lowercase words, stop words are dropped and remaining words
+    are reduced by light suffix stemmer (e.g. 'crashes', 'crashing' -> 'crash').
+
+    Index keeps posting list (document -> term frequency) of every term and
+    length of every document. Document matches query when it contains all
+    query terms, matching documents are scored with BM25. Index does not
+    depend on database so it works with any database backend.
+"""
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_RE = re.compile(r'\w+')
+
+STOP_WORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'if', 'in', 'into', 'is',
+    'it', 'no', 'not', 'of', 'on', 'or', 'such', 'that', 'the', 'their', 'then', 'there',
+    'these', 'they', 'this', 'to', 'was', 'will', 'with',
+))
+
+SUFFIXES = ('ing', 'ed', 'es', 's', 'e')
+"""Stripped suffixes, the first matching one is stripped."""
+
+MIN_STEM_LENGTH = 3
+
+
+@lru_cache(maxsize=16384)
+def stem(word):
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            if suffix == 's' and word.endswith('ss'):
+                return word
+
+            return word[:-len(suffix)]
+
+    return word
+
+
+def analyze(text):
+    """Returns list of terms of `text`."""
+    return [stem(word) for word in TOKEN_RE.findall((text or '').lower())
+        if word not in STOP_WORDS]
+
+
+class InvertedIndex:
+    """
+    Thread safe inverted index of documents identified by hashable keys.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        """Term -> {document -> term frequency}."""
+        self.documents = {}
+        """Document -> `Counter` of its terms."""
+        self.lengths = {}
+        """Document -> number of its terms."""
+        self.total_length = 0
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, document, terms):
+        """
+        Adds document or replaces terms of already indexed one.
+
+        Args:
+            document - Document key.
+            terms (`Counter` or iterable) - Terms of document.
+        """
+        if not isinstance(terms, Counter):
+            terms = Counter(terms)
+
+        with self.lock:
+            self.remove(document)
+
+            if not terms:
+                return
+
+            self.documents[document] = terms
+            self.lengths[document] = sum(terms.values())
+            self.total_length += self.lengths[document]
+
+            for term, frequency in terms.items():
+                self.postings.setdefault(term, {})[document] = frequency
+
+    def remove(self, document):
+        with self.lock:
+            terms = self.documents.pop(document, None)
+
+            if terms is None:
+                return
+
+            self.total_length -= self.lengths.pop(document)
+
+            for term in terms:
+                posting = self.postings[term]
+                del posting[document]
+
+                if not posting:
+                    del self.postings[term]
+
+    def clear(self):
+        with self.lock:
+            self.postings = {}
+            self.documents = {}
+            self.lengths = {}
+            self.total_length = 0
+
+    def search(self, terms):
+        """
+        Finds documents containing all `terms`.
+
+        Returns:
+            Dict document -> BM25 score.
+        """
+        terms = set(terms)
+
+        with self.lock:
+            postings = [self.postings.get(term) for term in terms]
+
+            if not postings or not all(postings):
+                return {}
+
+            postings.sort(key=len)
+            matching = set(postings[0]).intersection(*postings[1:])
+
+            count = len(self.documents)
+            average_length = self.total_length / count
+            scores = dict.fromkeys(matching, 0.0)
+
+            for posting in postings:
+                idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+
+                for document in matching:
+                    frequency = posting[document]
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[document] / average_length)
+
+                    scores[document] += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+
+            return scores
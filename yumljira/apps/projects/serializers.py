@@ -1,13 +1,18 @@
-from decimal import Decimal, InvalidOperation
-
+from django.db.models import Count, Max, prefetch_related_objects
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.translation import gettext as _
 
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from .choices import *
+from .durations import DurationError, parse_duration
 from .models import *
-from .validators import validate_number_in_board
+from .pagination import ColumnTasksPagination
+from .ranks import rank_after
+from .reports import REPORT_GROUPS, REPORT_PERIODS
+from .validators import validate_number_in_board, validate_story
 
 class CommentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -28,11 +33,13 @@ class TaskSerializer(serializers.ModelSerializer):
         model = Task
         fields = ('pk', 'title', 'description', 'priority',
             'created_by', 'assigned_to', 'task_type', 'story', 'time_logged',
-            'comments', 'created', 'modified', 'column')
+            'total_minutes', 'comments', 'created', 'modified', 'column', 'rank')
         extra_kwargs = {
             'created': {'read_only': True},
             'modified': {'read_only': True},
             'created_by': {'required': False},
+            'total_minutes': {'read_only': True},
+            'rank': {'read_only': True},
         }
 
     def validate(self, data):
@@ -40,15 +47,138 @@ class TaskSerializer(serializers.ModelSerializer):
         task_type = data.get('task_type', None)
 
         if story and task_type:
-            if task_type == STORY and story.task_type == STORY:
-                raise ValidationError({'story': [_('Story cannot contain another story.')]})
+            valid, errors = validate_story(task_type, story.task_type)
 
-            if not story.task_type == STORY:
-                raise ValidationError({'task_type': [_('Only story may contain subtasks.')]})
+            if not valid:
+                raise ValidationError(errors)
 
         return data
 
 
+class TaskMoveSerializer(serializers.Serializer):
+    pk = serializers.IntegerField()
+    column = serializers.IntegerField()
+
+
+class TaskMovedSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Task
+        fields = ('pk', 'column', 'rank', 'modified')
+
+
+class TaskBulkMoveSerializer(serializers.Serializer):
+    """
+    Moves many tasks to other columns within their projects. Tasks and columns
+    are fetched with one query each and moved tasks are saved with single `bulk_update`.
+    Moved tasks are placed at the end of columns in requested order, tasks are
+    reordered inside their columns by `TaskReorderSerializer`.
+    Has to be used inside transaction because moved tasks are locked.
+    """
+    tasks = TaskMoveSerializer(many=True, allow_empty=False)
+
+    def validate_tasks(self, moves):
+        # Tasks are locked in the same order by every request so overlapping moves do not deadlock.
+        tasks = Task.objects.select_for_update(of=('self',)) \
+            .select_related('column') \
+            .order_by('pk') \
+            .in_bulk([move['pk'] for move in moves])
+        columns = Column.objects.in_bulk([move['column'] for move in moves])
+
+        errors = []
+        moved = set()
+
+        for move in moves:
+            task = tasks.get(move['pk'])
+            column = columns.get(move['column'])
+            error = {}
+
+            if not task:
+                error['pk'] = [_('Task does not exist.')]
+            elif task.pk in moved:
+                error['pk'] = [_('Task may be moved only once.')]
+
+            if not column:
+                error['column'] = [_('Column does not exist.')]
+            elif task and column.project_id != task.column.project_id:
+                error['column'] = [_('Task may be moved only within its project.')]
+            elif task and column.pk == task.column_id:
+                error['column'] = [_('Task is already in this column.')]
+
+            if task:
+                moved.add(task.pk)
+
+            errors.append(error)
+
+        if any(errors):
+            raise ValidationError(errors)
+
+        return [{'task': tasks[move['pk']], 'column': columns[move['column']]} for move in moves]
+
+    def create(self, validated_data):
+        now = timezone.now()
+        tasks = []
+
+        # Tasks appended to the columns by other requests wait for this one.
+        Task.lock_columns(move['column'] for move in validated_data['tasks'])
+        last_ranks = dict(Task.objects.filter(column__in=[move['column'] for move in validated_data['tasks']])
+            .order_by()
+            .values('column')
+            .annotate(last_rank=Max('rank'))
+            .values_list('column', 'last_rank'))
+
+        for move in validated_data['tasks']:
+            task = move['task']
+            column = move['column']
+            last_ranks[column.pk] = rank_after(last_ranks.get(column.pk))
+
+            task.column = column
+            task.rank = last_ranks[column.pk]
+            task.modified = now
+            tasks.append(task)
+
+        Task.objects.bulk_update(tasks, ['column', 'rank', 'modified'])
+        Project.board_changed((task.column.project_id, TASK_CHANGE, task.pk) for task in tasks)
+
+        return tasks
+
+
+class TaskReorderSerializer(serializers.Serializer):
+    """
+    Places task right after `after` task (or at the top when it is null)
+    in its column or in `column` within the same project.
+    """
+    column = serializers.PrimaryKeyRelatedField(queryset=Column.objects.all(), required=False)
+    after = serializers.PrimaryKeyRelatedField(queryset=Task.objects.all(), allow_null=True)
+
+    def validate(self, data):
+        task = self.instance
+        column = data.setdefault('column', task.column)
+        after = data['after']
+
+        if column.project_id != task.column.project_id:
+            raise ValidationError({'column': [_('Task may be moved only within its project.')]})
+
+        if after and after.column_id != column.pk:
+            raise ValidationError({'after': [_('Task has to be in the same column.')]})
+
+        if after and after.pk == task.pk:
+            raise ValidationError({'after': [_('Task cannot be placed after itself.')]})
+
+        return data
+
+    def update(self, task, validated_data):
+        after = validated_data['after']
+
+        task.column = validated_data['column']
+        task.rank = Task.get_rank_after(task.column, after, task)
+        task.save(update_fields=['column', 'rank', 'modified'])
+
+        return task
+
+    def to_representation(self, task):
+        return TaskMovedSerializer(task).data
+
+
 class ColumnSerializer(serializers.ModelSerializer):
     class Meta:
         model = Column
@@ -61,8 +191,9 @@ class ColumnSerializer(serializers.ModelSerializer):
 
     def validate_number_in_board(self, number):
         if self.instance:
+            project = self.instance.project
             valid, error_msg = validate_number_in_board(
-                number, self.instance.project, self.instance.number_in_board)
+                number, project, self.instance.number_in_board, self._get_last_number(project))
 
             if not valid:
                 raise ValidationError({'number_in_board': [error_msg]})
@@ -74,19 +205,52 @@ class ColumnSerializer(serializers.ModelSerializer):
         project = data.get('project')
 
         if number is not None and project:
-            valid, error_msg = validate_number_in_board(number, project)
+            valid, error_msg = validate_number_in_board(
+                number, project, last_number=self._get_last_number(project))
 
             if not valid:
                 raise ValidationError({'number_in_board': [error_msg]})
 
         return data
 
+    def _get_last_number(self, project):
+        """Gets last number of project board once per serializer."""
+        if not hasattr(self, '_last_numbers'):
+            self._last_numbers = {}
+
+        if project.pk not in self._last_numbers:
+            self._last_numbers[project.pk] = Column.get_board_numbers(project)['last_number'] or 0
+
+        return self._last_numbers[project.pk]
+
 
 class ColumnSerializerTasks(ColumnSerializer):
-    tasks = TaskSerializer(many=True, read_only=True)
+    """
+    Column with number of its tasks and their first page. Pages are taken
+    from `first_pages` in context (see `TaskQuerySet.first_pages`).
+    """
+    tasks = serializers.SerializerMethodField()
+    tasks_count = serializers.IntegerField(read_only=True)
+    tasks_next = serializers.SerializerMethodField()
 
     class Meta(ColumnSerializer.Meta):
-        ColumnSerializer.Meta.fields += ('tasks',)
+        fields = ColumnSerializer.Meta.fields + ('tasks', 'tasks_count', 'tasks_next')
+
+    def _get_page(self, column):
+        return self.context.get('first_pages', {}).get(column.pk, [])
+
+    def get_tasks(self, column):
+        return TaskSerializer(self._get_page(column), many=True, context=self.context).data
+
+    def get_tasks_next(self, column):
+        page = self._get_page(column)
+        request = self.context.get('request')
+
+        if not page or not request or column.tasks_count <= len(page):
+            return None
+
+        return ColumnTasksPagination().get_next_link_after(request,
+            reverse('columns-tasks', kwargs={'pk': column.pk}), page)
 
 
 class SprintSerializer(serializers.ModelSerializer):
@@ -98,12 +262,20 @@ class SprintSerializer(serializers.ModelSerializer):
 class ProjectSerializer(serializers.ModelSerializer):
     sprint_name = serializers.CharField(max_length=200, write_only=True,
         allow_null=True, required=False)
+    column_titles = serializers.ListField(child=serializers.CharField(max_length=100),
+        write_only=True, required=False, allow_empty=False)
+    """Template of the board: custom columns created after BACKLOG instead of default ones."""
+    sprint_names = serializers.ListField(child=serializers.CharField(max_length=200),
+        write_only=True, required=False)
+    """Template of the board: initial sprints created after `sprint_name` (Scrum only)."""
 
     class Meta:
         model = Project
-        fields = ('pk', 'name', 'created_by', 'key', 'board_type', 'sprint_name')
+        fields = ('pk', 'name', 'created_by', 'key', 'board_type', 'sprint_name',
+            'column_titles', 'sprint_names', 'total_minutes')
         extra_kwargs = {
             'created_by': {'required': False},
+            'total_minutes': {'read_only': True},
         }
 
     def validate(self, data):
@@ -116,101 +288,170 @@ class ProjectSerializer(serializers.ModelSerializer):
         if board_type == SCRUM and not sprint_name:
             raise ValidationError({'sprint_name': [_('Sprint name is required for scrum board.')]})
 
+        if board_type == KANBAN and data.get('sprint_names'):
+            raise ValidationError({'sprint_names': [_('Kanban board do not contain sprints')]})
+
         return data
 
 
 class ProjectDetailSerializer(ProjectSerializer):
     sprints = SprintSerializer(many=True, read_only=True)
-    columns = ColumnSerializerTasks(many=True, read_only=True)
+    columns = serializers.SerializerMethodField()
 
     class Meta:
         model = Project
-        fields = ('pk', 'name', 'created_by', 'key', 'board_type',
-            'sprint_name', 'sprints', 'columns')
+        fields = ('pk', 'name', 'created_by', 'key', 'board_type', 'sprint_name',
+            'column_titles', 'sprint_names', 'total_minutes', 'sprints', 'columns')
         extra_kwargs = {
             'created_by': {'required': False},
+            'total_minutes': {'read_only': True},
         }
 
+    def get_columns(self, project):
+        """
+        Hidden columns (e.g. BACKLOG) contain only number of tasks,
+        visible ones also first page of tasks.
+        """
+        columns = project.columns.annotate(tasks_count=Count('tasks')) \
+            .order_by('number_in_board')
 
-class TimeLogSerializer(serializers.ModelSerializer):
-    time_logged = serializers.CharField(required=True, allow_null=False)
+        first_pages = Task.objects.with_time_logged().first_pages(
+            [column for column in columns if column.should_show],
+            ColumnTasksPagination.page_size)
+        prefetch_related_objects(
+            [task for page in first_pages.values() for task in page], 'comments')
+
+        context = dict(self.context, first_pages=first_pages)
+
+        return ColumnSerializerTasks(columns, many=True, context=context).data
+
+
+class BoardChangesParamsSerializer(serializers.Serializer):
+    since = serializers.IntegerField(min_value=0)
+    """Board version client has (see `board.get_board_changes`)."""
+
+
+class SearchParamsSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=255)
+    project = serializers.IntegerField(required=False)
+
+
+class TaskSearchResultSerializer(serializers.ModelSerializer):
+    project = serializers.IntegerField(source='column.project_id', read_only=True)
+    search_rank = serializers.FloatField(read_only=True)
 
     class Meta:
-        model = TimeLog
-        fields = ('pk', 'user', 'task', 'date', 'time_logged')
-        extra_kwargs = {
-            'user': {'required': False},
-        }
+        model = Task
+        fields = ('pk', 'title', 'priority', 'task_type', 'column', 'project', 'search_rank')
 
-    def validate_task(self, task):
-        if not task:
-            raise ValidationError({'task': [_('You have to assign issue first.')]})
 
-        return task
+class TimeLogEntrySerializer(serializers.Serializer):
+    task = serializers.IntegerField()
+    date = serializers.DateField()
+    time_logged = serializers.CharField()
 
-    def validate_time_logged(self, time_logged):
-        """
-        Validation of `time_logged` properties may depends on value which is send to the API.
-        There are 2 possibilities:
-            * as minutes e.g. '20'
-            * as periods e.g. '2h 30m'
 
-        For the first option we check if user has send more then 0 minutes to the API if not
-        error is raised.
+class TimeLogBulkSerializer(serializers.Serializer):
+    """
+    Logs time of request user for many entries. Tasks are fetched with one query,
+    time logs are saved with single `bulk_create` and totals are updated with
+    `TimeLog.add_to_totals`. Errors are returned for every entry.
+    """
+    time_logs = TimeLogEntrySerializer(many=True, allow_empty=False)
 
-        The second option is a little harder. We are doing the following to validated data:
-            1. First we divide string into dict with periods as keys and their time as values.
-                In addition in this step we check if values we put inside the dict are convertable
-                to float. If any value is not valid error is raised. If value is negative then we change it to 0.
+    max_time_logs = 500
+    """Max number of entries, all of them are saved and their totals locked in single transaction."""
 
-            2. Next we check the keys. Keys are valid when:
-                * do not repeat
-                * correct character is used
+    def to_internal_value(self, data):
+        # Checked before entries are validated one by one.
+        time_logs = self.fields['time_logs'].get_value(data)
 
-            To make sure those two conditions have been fulfilled first we make set
-            of periods and check if keys inside the dict are the same as new set.
-            If this is not correct then error is raised. Second condition is checked
-            with help of `issubset` method with `AVAILABLE_TIME_OPTIONS` argument used
-            for periods set.
+        if isinstance(time_logs, list) and len(time_logs) > self.max_time_logs:
+            raise ValidationError({'time_logs': [_('Ensure this field has no more than {} elements.')
+                .format(self.max_time_logs)]})
 
-            The last check is used to make sure first value is not 0.
+        return super().to_internal_value(data)
 
-            If all of those conditions are correct then we calculate sum of minutes
-            by specific period and returns the value.
-        """
-        try:
-            time_logged = int(time_logged)
+    def validate_time_logs(self, entries):
+        tasks = Task.objects.in_bulk([entry['task'] for entry in entries])
 
-            if time_logged <= 0:
-                raise ValidationError({'time_logged': [_('You have to log more than 0 minutes')]})
+        errors = []
+
+        for entry in entries:
+            error = {}
+
+            if entry['task'] not in tasks:
+                error['task'] = [_('Task does not exist.')]
 
-            return time_logged
-        except ValueError:
             try:
-                time_dict = dict([(option[-1], self._get_value(option[:-1])) for option in time_logged.split(' ')])
-            except InvalidOperation:
-                raise ValidationError({'time_logged': [_('Wrong values')]})
+                entry['time_logged'] = parse_duration(entry['time_logged'])
+            except DurationError as duration_error:
+                error['time_logged'] = [str(duration_error)]
+
+            errors.append(error)
+
+        if any(errors):
+            raise ValidationError(errors)
+
+        return [dict(entry, task=tasks[entry['task']]) for entry in entries]
+
+    def create(self, validated_data):
+        time_logs = TimeLog.objects.bulk_create([
+            TimeLog(user=validated_data['user'], **entry) for entry in validated_data['time_logs']
+        ])
+
+        TimeLog.add_to_totals(time_logs)
+
+        return time_logs
+
+
+class TimeReportSerializer(serializers.Serializer):
+    """Query params of time report. `group_by` is comma separated list of `REPORT_GROUPS`."""
+    group_by = serializers.CharField(required=False, default='')
+    period = serializers.ChoiceField(choices=list(REPORT_PERIODS), required=False, allow_null=True)
+
+    def validate_group_by(self, group_by):
+        groups = [group for group in group_by.split(',') if group]
 
-            time_values = list(time_dict.values())
-            time_options = time_dict.keys()
-            options = set(time_options)
+        if not set(groups).issubset(REPORT_GROUPS):
+            raise ValidationError({'group_by': [_('Allowed groups are: {}.').format(
+                ', '.join(REPORT_GROUPS))]})
 
-            # Check if options do not repeat e.g. ['d', 'd'].
-            if len(options) != len(time_options):
-                raise ValidationError({'time_logged': [_('You cannot repeat periods')]})
+        if len(set(groups)) != len(groups):
+            raise ValidationError({'group_by': [_('Groups cannot repeat.')]})
 
-            # Check if options are correct e.g. ['d', 'x'].
-            if not options.issubset(AVAILABLE_TIME_OPTIONS):
-                raise ValidationError({'time_logged': [_('You can only use those characters to describe periods: m, h, d, w')]})
+        return groups
 
-            # First value cannot be less or equal 0.
-            if time_values[0] == 0:
-                raise ValidationError({'time_logged': [_('You can only use those characters to describe periods: m, h, d, w')]})
+    def validate(self, data):
+        if not data['group_by'] and not data.get('period'):
+            raise ValidationError({'group_by': [_('Choose at least one group or period.')]})
+
+        return data
+
+
+class TimeLogSerializer(serializers.ModelSerializer):
+    time_logged = serializers.CharField(required=True, allow_null=False)
+
+    class Meta:
+        model = TimeLog
+        fields = ('pk', 'user', 'task', 'date', 'time_logged')
+        extra_kwargs = {
+            'user': {'required': False},
+        }
 
-            time_logged = sum(OPTION_TO_MINUTE[option] * time for option, time in time_dict.items())
+    def validate_task(self, task):
+        if not task:
+            raise ValidationError({'task': [_('You have to assign issue first.')]})
 
-        return time_logged
+        return task
 
-    def _get_value(self, value):
-        return max(Decimal(value), 0)
+    def validate_time_logged(self, time_logged):
+        """
+        Time may be logged as minutes e.g. '20' or as periods e.g. '2h 30m'
+        (see `durations.py`).
+        """
+        try:
+            return parse_duration(time_logged)
+        except DurationError as error:
+            raise ValidationError({'time_logged': [str(error)]})
 
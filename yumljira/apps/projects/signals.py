@@ -0,0 +1,97 @@
+from copy import copy
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .choices import COLUMN_CHANGE, COMMENT_CHANGE, PROJECT_CHANGE, SPRINT_CHANGE, TASK_CHANGE
+from .models import Column, Comment, Project, ProjectListVersion, Sprint, Task, TimeLog
+from .search import get_search_backend
+
+
+# Index is changed only when transaction is committed so rolled back writes are never indexed.
+# Removed instances lose pk before commit so pk is passed instead.
+
+@receiver(post_save, sender=Task)
+def index_task(sender, instance, **kwargs):
+    task = copy(instance)
+    transaction.on_commit(lambda: get_search_backend().update_task(task))
+
+
+@receiver(post_delete, sender=Task)
+def unindex_task(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: get_search_backend().remove_task(pk))
+
+
+@receiver(post_save, sender=Comment)
+def index_comment(sender, instance, **kwargs):
+    comment = copy(instance)
+    transaction.on_commit(lambda: get_search_backend().update_comment(comment))
+
+
+@receiver(post_delete, sender=Comment)
+def unindex_comment(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: get_search_backend().remove_comment(pk))
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, **kwargs):
+    if not created:
+        Project.board_changed([(instance.pk, PROJECT_CHANGE, instance.pk)])
+
+
+@receiver(post_delete, sender=Project)
+def project_deleted(sender, instance, **kwargs):
+    ProjectListVersion.bump()
+
+
+@receiver(post_save, sender=Column)
+@receiver(post_delete, sender=Column)
+def column_changed(sender, instance, **kwargs):
+    Project.board_changed([(instance.project_id, COLUMN_CHANGE, instance.pk)])
+
+
+@receiver(post_save, sender=Sprint)
+@receiver(post_delete, sender=Sprint)
+def sprint_changed(sender, instance, **kwargs):
+    Project.board_changed([(instance.project_id, SPRINT_CHANGE, instance.pk)])
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance, **kwargs):
+    project = Column.objects.filter(pk=instance.column_id) \
+        .values_list('project', flat=True).first()
+
+    Project.board_changed([(project, TASK_CHANGE, instance.pk)])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    project = Task.objects.filter(pk=instance.task_id) \
+        .values_list('column__project', flat=True).first()
+
+    # Comments count of the task is changed too.
+    Project.board_changed([(project, COMMENT_CHANGE, instance.pk),
+        (project, TASK_CHANGE, instance.task_id)])
+
+
+@receiver(pre_save, sender=TimeLog)
+def time_log_saving(sender, instance, **kwargs):
+    # Log moved to other task changes time logged of its old task too.
+    instance._old_task_id = TimeLog.objects.filter(pk=instance.pk) \
+        .values_list('task', flat=True).first() if instance.pk else None
+
+
+@receiver(post_save, sender=TimeLog)
+@receiver(post_delete, sender=TimeLog)
+def time_log_changed(sender, instance, **kwargs):
+    tasks = {instance.task_id, instance.__dict__.pop('_old_task_id', None)} - {None}
+
+    if tasks:
+        # Time logs are not shown on board, only time logged for the task.
+        Project.board_changed((project, TASK_CHANGE, pk) for pk, project in
+            Task.objects.filter(pk__in=tasks).values_list('pk', 'column__project'))
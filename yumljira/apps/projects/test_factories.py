@@ -25,7 +25,7 @@ class ColumnFactory(Factory):
 
     project = factory.SubFactory(ProjectFactory)
     title = factory.Faker('word')
-    number_in_board = factory.Faker('pyint')
+    number_in_board = factory.Faker('pyint', min_value=1)
     should_show = factory.Faker('pybool')
     removable = factory.Faker('pybool')
 
@@ -1,7 +1,12 @@
 import pytest
+from io import StringIO
 
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.db.utils import IntegrityError
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from faker import Faker
@@ -17,10 +22,11 @@ from yumljira.apps.common.test_utils import user_strategy
 
 from .utils import add_token
 
-from ..choices import KANBAN, SCRUM, SELECTED_FOR_DEV, TO_DO
-from ..models import Column, Project
+from ..board_cache import get_board_cache_stats
+from ..choices import KANBAN, SCRUM, SELECTED_FOR_DEV, TASK_CHANGE, TO_DO
+from ..models import Column, Project, Sprint, Task
 from ..serializers import ProjectSerializer, TaskSerializer
-from ..test_factories import ColumnFactory, ProjectFactory, TaskFactory
+from ..test_factories import ColumnFactory, CommentFactory, ProjectFactory, TaskFactory, TimeLogFactory
 
 
 pytestmark = pytest.mark.django_db
@@ -182,3 +188,186 @@ class ColumnValidationTestCase(HTestCase):
 
         assert task.column.pk is not column_pk
 
+
+class BoardEndpointTestCase(TestCase):
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+        self.api_client = APIClient()
+        add_token(self.api_client, self.jwt)
+
+        self.project = ProjectFactory(board_type=KANBAN)
+        self.project.create_kanban_board()
+        self.url = reverse('projects-board', kwargs={'pk': self.project.pk})
+
+    def _create_tasks(self, count):
+        for column in self.project.columns.all():
+            for _ in range(count):
+                task = TaskFactory(column=column)
+                TimeLogFactory(task=task, time_logged=10)
+                CommentFactory(task=task)
+
+    def _get_board(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api_client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+
+        return response.data, len(queries)
+
+    def test_board(self):
+        self._create_tasks(1)
+
+        data, _ = self._get_board()
+
+        assert data['pk'] == self.project.pk
+        assert [column['number_in_board'] for column in data['columns']] == [1, 2, 3, 4]
+
+        for column in data['columns']:
+            task = Task.objects.get(column=column['pk'])
+
+            assert len(column['tasks']) == 1
+            assert column['tasks'][0]['pk'] == task.pk
+            assert column['tasks'][0]['time_logged'] == 10
+            assert column['tasks'][0]['comments_count'] == 1
+
+        assert len(data['assignees']) == 4
+
+    def test_board_queries_count(self):
+        self._create_tasks(1)
+        _, queries_before = self._get_board()
+
+        self._create_tasks(5)
+        _, queries = self._get_board()
+
+        assert queries_before == queries
+
+
+class BoardCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.user, self.jwt = user_strategy()
+        self.api_client = APIClient()
+        add_token(self.api_client, self.jwt)
+
+        self.project = ProjectFactory(board_type=KANBAN)
+        self.project.create_kanban_board()
+        self.column = self.project.columns.order_by('number_in_board').first()
+        self.task = TaskFactory(column=self.column)
+        self.url = reverse('projects-board', kwargs={'pk': self.project.pk})
+
+    def _get_board(self):
+        response = self.api_client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+
+        return response.data
+
+    def _tasks(self, board):
+        return {task['pk'] for column in board['columns'] for task in column['tasks']}
+
+    def test_cache_hit(self):
+        board = self._get_board()
+
+        with CaptureQueriesContext(connection) as queries:
+            assert self._get_board() == board
+
+        # Only board version is read.
+        queries = [query['sql'] for query in queries if 'projects_' in query['sql']]
+
+        assert len(queries) == 1
+        assert queries[0].startswith('SELECT "projects_project"."board_version" FROM')
+        assert get_board_cache_stats() == {'hits': 1, 'misses': 1}
+
+    def test_missing_project(self):
+        url = reverse('projects-board', kwargs={'pk': self.project.pk + 1000})
+
+        assert self.api_client.get(url).status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalidated_on_model_writes(self):
+        self._get_board()
+        task = TaskFactory(column=self.column)
+
+        assert task.pk in self._tasks(self._get_board())
+
+        CommentFactory(task=task)
+
+        assert self._get_board()['columns'][0]['tasks'][-1]['comments_count'] == 1
+
+        TimeLogFactory(task=task, time_logged=15)
+
+        assert self._get_board()['columns'][0]['tasks'][-1]['time_logged'] == 15
+
+        Sprint.objects.create(project=self.project, name='Sprint 1')
+
+        assert len(self._get_board()['sprints']) == 1
+
+        self.project.name = 'Renamed'
+        self.project.save()
+
+        assert self._get_board()['name'] == 'Renamed'
+
+        task.delete()
+
+        assert task.pk not in self._tasks(self._get_board())
+        assert get_board_cache_stats()['hits'] == 0
+
+    def test_invalidated_on_bulk_move(self):
+        self._get_board()
+        column = self.project.columns.order_by('number_in_board').last()
+
+        response = self.api_client.post(reverse('tasks-move'),
+            {'tasks': [{'pk': self.task.pk, 'column': column.pk}]}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [task['pk'] for task in self._get_board()['columns'][-1]['tasks']] == [self.task.pk]
+
+    def test_invalidated_on_bulk_time_logs(self):
+        self._get_board()
+
+        response = self.api_client.post(reverse('timelogs-bulk'), {'time_logs': [
+            {'task': self.task.pk, 'date': '2019-10-01', 'time_logged': '1h'}]}, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert self._get_board()['columns'][0]['tasks'][0]['time_logged'] == 60
+
+    def test_invalidated_on_move_to_other_project(self):
+        self._get_board()
+        column = ColumnFactory()
+
+        response = self.api_client.patch(reverse('tasks-detail', kwargs={'pk': self.task.pk}),
+            {'column': column.pk}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert self.task.pk not in self._tasks(self._get_board())
+
+    def test_invalidated_on_time_log_moved_to_other_project(self):
+        response = self.api_client.post(reverse('timelogs-list'),
+            {'task': self.task.pk, 'date': '2019-10-01', 'time_logged': '30m'}, format='json')
+        url = reverse('timelogs-detail', kwargs={'pk': response.data['pk']})
+
+        assert self._get_board()['columns'][0]['tasks'][0]['time_logged'] == 30
+
+        response = self.api_client.patch(url, {'task': TaskFactory().pk}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert self._get_board()['columns'][0]['tasks'][0]['time_logged'] == 0
+
+    def test_snapshot_of_old_version_not_served(self):
+        board = self._get_board()
+        Project.board_changed([(self.project.pk, TASK_CHANGE, self.task.pk)])
+        # Snapshot stored after the change by other request which read data before it.
+        cache.set('projects:board:{}:{}'.format(self.project.pk, board['version']), board)
+
+        assert self._get_board()['version'] == board['version'] + 1
+
+    def test_stats_command(self):
+        self._get_board()
+        self._get_board()
+        out = StringIO()
+
+        call_command('board_cache_stats', reset=True, stdout=out)
+
+        assert 'Hits: 1, misses: 1' in out.getvalue()
+        assert 'Hit ratio: 50.0%' in out.getvalue()
+        assert get_board_cache_stats() == {'hits': 0, 'misses': 0}
@@ -0,0 +1,209 @@
+import pytest
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from yumljira.apps.common.test_utils import user_strategy
+
+from .utils import add_token
+
+from ..choices import KANBAN
+from ..models import BoardChange, Project, Sprint
+from ..test_factories import ColumnFactory, CommentFactory, ProjectFactory, TaskFactory, TimeLogFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class BoardChangesTestCase(TestCase):
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+        self.api_client = APIClient()
+        add_token(self.api_client, self.jwt)
+
+        self.project = ProjectFactory(board_type=KANBAN)
+        self.project.create_kanban_board()
+        self.column = self.project.columns.order_by('number_in_board').first()
+        self.task = TaskFactory(column=self.column)
+        self.url = reverse('projects-changes', kwargs={'pk': self.project.pk})
+
+        self.version = self._get_version()
+
+    def _get_version(self):
+        response = self.api_client.get(reverse('projects-board', kwargs={'pk': self.project.pk}))
+
+        assert response.status_code == status.HTTP_200_OK
+
+        return response.data['version']
+
+    def _changes(self, since=None):
+        response = self.api_client.get(self.url, {'since': self.version if since is None else since})
+
+        assert response.status_code == status.HTTP_200_OK
+
+        return response.data
+
+    def test_no_changes(self):
+        data = self._changes()
+
+        assert data['version'] == self.version
+        assert data['project'] is None
+        assert data['tasks'] == data['columns'] == data['comments'] == data['sprints'] == []
+        assert data['deleted'] == {'tasks': [], 'columns': [], 'comments': [], 'sprints': []}
+
+    def test_task_changes(self):
+        created = TaskFactory(column=self.column)
+        self.task.title = 'Renamed'
+        self.task.save()
+
+        data = self._changes()
+
+        assert data['version'] == self.version + 2
+        assert {task['pk']: task['title'] for task in data['tasks']} == \
+            {created.pk: created.title, self.task.pk: 'Renamed'}
+        assert {user['pk'] for user in data['assignees']} == \
+            {created.assigned_to_id, self.task.assigned_to_id}
+        assert data['columns'] == []
+
+    def test_comment_and_time_log(self):
+        comment = CommentFactory(task=self.task)
+        TimeLogFactory(task=self.task, time_logged=30)
+
+        data = self._changes()
+
+        assert [item['pk'] for item in data['comments']] == [comment.pk]
+        assert data['tasks'][0]['comments_count'] == 1
+        assert data['tasks'][0]['time_logged'] == 30
+
+    def test_bulk_time_logs(self):
+        response = self.api_client.post(reverse('timelogs-bulk'), {'time_logs': [
+            {'task': self.task.pk, 'date': '2019-10-01', 'time_logged': '1h'}]}, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+        data = self._changes()
+
+        assert data['tasks'][0]['time_logged'] == 60
+        assert data['project']['total_minutes'] == 60
+
+    def test_time_log_moved_to_other_project(self):
+        log = TimeLogFactory(task=self.task, time_logged=30)
+        version = self._get_version()
+
+        log.task = TaskFactory()
+        log.save()
+
+        data = self._changes(since=version)
+
+        assert [(task['pk'], task['time_logged']) for task in data['tasks']] == [(self.task.pk, 0)]
+        assert data['deleted']['tasks'] == []
+
+    def test_deleted(self):
+        comment = CommentFactory(task=self.task)
+        version = self._get_version()
+        sprint = Sprint.objects.create(project=self.project, name='Sprint 1')
+        deleted = {'tasks': [self.task.pk], 'columns': [], 'comments': [comment.pk],
+            'sprints': [sprint.pk]}
+
+        self.task.delete()
+        sprint.delete()
+
+        data = self._changes(since=version)
+
+        assert data['tasks'] == data['comments'] == data['sprints'] == []
+        assert data['deleted'] == deleted
+
+    def test_cascade_recorded_under_one_version(self):
+        subtask = TaskFactory(column=self.column, story=self.task)
+        comments = [CommentFactory(task=task) for task in (self.task, subtask, subtask)]
+        version = self._get_version()
+        deleted = sorted([self.task.pk, subtask.pk])
+
+        self.task.delete()
+
+        data = self._changes(since=version)
+
+        assert data['version'] == version + 1
+        assert data['deleted']['tasks'] == deleted
+        assert data['deleted']['comments'] == sorted(comment.pk for comment in comments)
+
+    def test_columns_renumbered(self):
+        response = self.api_client.post(reverse('columns-list'),
+            {'title': 'Review', 'number_in_board': 2, 'project': self.project.pk}, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+        data = self._changes()
+
+        assert [column['number_in_board'] for column in data['columns']] == [2, 3, 4, 5]
+
+    def test_bulk_move(self):
+        column = self.project.columns.order_by('number_in_board').last()
+
+        response = self.api_client.post(reverse('tasks-move'),
+            {'tasks': [{'pk': self.task.pk, 'column': column.pk}]}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert self._changes()['tasks'][0]['column'] == column.pk
+
+    def test_moved_to_other_project(self):
+        response = self.api_client.patch(reverse('tasks-detail', kwargs={'pk': self.task.pk}),
+            {'column': ColumnFactory().pk}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert self._changes()['deleted']['tasks'] == [self.task.pk]
+
+    def test_query_count_does_not_depend_on_board_size(self):
+        TaskFactory(column=self.column)
+
+        with CaptureQueriesContext(connection) as queries:
+            self._changes()
+
+        for _ in range(10):
+            TaskFactory(column=self.column)
+
+        version = self._get_version()
+        TaskFactory(column=self.column)
+
+        with CaptureQueriesContext(connection) as more_queries:
+            assert len(self._changes(since=version)['tasks']) == 1
+
+        assert len(queries) == len(more_queries)
+
+    def test_version_not_available(self):
+        TaskFactory(column=self.column)
+
+        response = self.api_client.get(self.url, {'since': self.version + 100})
+
+        assert response.status_code == status.HTTP_410_GONE
+
+        BoardChange.prune(timezone.now() + timedelta(seconds=1))
+
+        response = self.api_client.get(self.url, {'since': self.version})
+
+        assert response.status_code == status.HTTP_410_GONE
+        assert self._changes(since=self.version + 1)['tasks'] == []
+
+    def test_since_required(self):
+        response = self.api_client.get(self.url)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_prune_command(self):
+        TaskFactory(column=self.column)
+        BoardChange.objects.update(created=timezone.now() - timedelta(days=8))
+        out = StringIO()
+
+        call_command('prune_board_changes', stdout=out)
+
+        assert 'Board changes removed:' in out.getvalue()
+        assert not BoardChange.objects.exists()
+        assert Project.objects.get(pk=self.project.pk).board_version == self.version + 1
@@ -0,0 +1,204 @@
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils.http import parse_http_date
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from yumljira.apps.common.test_utils import user_strategy
+
+from .utils import add_token
+
+from ..models import Project
+from ..serializers import ProjectDetailSerializer
+from ..test_factories import (ColumnFactory, CommentFactory, ProjectFactory, TaskFactory,
+    TimeLogFactory)
+
+pytestmark = pytest.mark.django_db
+
+
+class BoardVersionTestCase(TestCase):
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+        self.api_client = APIClient()
+        add_token(self.api_client, self.jwt)
+
+        self.project = ProjectFactory()
+        self.column = ColumnFactory(project=self.project)
+        self.task = TaskFactory(column=self.column)
+        self.comment = CommentFactory(task=self.task, owner=self.user)
+
+        self.other_task = TaskFactory()
+
+    def _get(self, url, response=None, **params):
+        headers = {}
+
+        if response is not None:
+            headers['HTTP_IF_NONE_MATCH'] = response['ETag']
+
+        return self.api_client.get(url, params, **headers)
+
+    def _assert_not_modified(self, url, **params):
+        response = self._get(url, **params)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert self._get(url, response, **params).status_code == status.HTTP_304_NOT_MODIFIED
+
+        return response
+
+    def test_project_not_modified(self):
+        url = reverse('projects-detail', kwargs={'pk': self.project.pk})
+        response = self._get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['ETag'] and response['Last-Modified']
+
+        with patch.object(ProjectDetailSerializer, 'to_representation') as to_representation:
+            not_modified = self._get(url, response)
+
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+        assert not_modified['ETag'] == response['ETag']
+        assert not not_modified.content
+        assert not to_representation.called
+
+    def test_if_modified_since(self):
+        url = reverse('projects-detail', kwargs={'pk': self.project.pk})
+        response = self._get(url)
+
+        not_modified = self.api_client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+        assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_project_list_after_delete(self):
+        url = reverse('projects-list')
+        project = ProjectFactory()
+        response = self._assert_not_modified(url)
+
+        # Deleted project was modified last so the rest is older than client's copy.
+        with patch('django.utils.timezone.now', return_value=project.board_modified + timedelta(hours=1)):
+            project.delete()
+
+        assert self._get(url, response).status_code == status.HTTP_200_OK
+
+        modified = self.api_client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+
+        assert modified.status_code == status.HTTP_200_OK
+        assert parse_http_date(modified['Last-Modified']) > parse_http_date(response['Last-Modified'])
+
+    def test_project_changes(self):
+        url = reverse('projects-detail', kwargs={'pk': self.project.pk})
+        changes = [
+            lambda: TaskFactory(column=self.column),
+            lambda: CommentFactory(task=self.task),
+            lambda: TimeLogFactory(task=self.task),
+            lambda: ColumnFactory(project=self.project),
+            lambda: self.task.delete(),
+        ]
+
+        for change in changes:
+            response = self._assert_not_modified(url)
+            change()
+
+            assert self._get(url, response).status_code == status.HTTP_200_OK
+
+    def test_other_project_change(self):
+        url = reverse('projects-detail', kwargs={'pk': self.project.pk})
+        response = self._get(url)
+
+        TaskFactory(column=self.other_task.column)
+
+        assert self._get(url, response).status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_time_log_moved_to_other_project(self):
+        response = self.api_client.post(reverse('timelogs-list'),
+            {'task': self.task.pk, 'date': '2019-10-01', 'time_logged': '1h'}, format='json')
+        log_url = reverse('timelogs-detail', kwargs={'pk': response.data['pk']})
+        url = reverse('projects-detail', kwargs={'pk': self.project.pk})
+        response = self._assert_not_modified(url)
+
+        moved = self.api_client.patch(log_url, {'task': self.other_task.pk}, format='json')
+
+        assert moved.status_code == status.HTTP_200_OK
+
+        response = self._get(url, response)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['total_minutes'] == 0
+
+    def test_stale_instance_save_keeps_version(self):
+        stale = Project.objects.get(pk=self.project.pk)
+        TaskFactory(column=self.column)
+        version = Project.objects.get(pk=self.project.pk).board_version
+
+        stale.name = 'Renamed'
+        stale.save()
+
+        assert Project.objects.get(pk=self.project.pk).board_version == version + 1
+
+    def test_task(self):
+        url = reverse('tasks-detail', kwargs={'pk': self.task.pk})
+        response = self._assert_not_modified(url)
+
+        self.task.title = 'Renamed'
+        self.task.save()
+
+        assert self._get(url, response).data['title'] == 'Renamed'
+
+    def test_task_moved_to_other_project(self):
+        url = reverse('tasks-detail', kwargs={'pk': self.task.pk})
+        response = self._assert_not_modified(url)
+
+        self.task.column = self.other_task.column
+        self.task.save()
+
+        assert self._get(url, response).status_code == status.HTTP_200_OK
+
+    def test_task_list(self):
+        url = reverse('tasks-list')
+        scoped = self._assert_not_modified(url, column__project=self.project.pk)
+        by_column = self._assert_not_modified(url, column=self.column.pk)
+        unscoped = self._assert_not_modified(url)
+
+        TaskFactory(column=self.other_task.column)
+
+        assert self._get(url, scoped, column__project=self.project.pk).status_code == \
+            status.HTTP_304_NOT_MODIFIED
+        assert self._get(url, by_column, column=self.column.pk).status_code == \
+            status.HTTP_304_NOT_MODIFIED
+        assert self._get(url, unscoped).status_code == status.HTTP_200_OK
+
+    def test_comment(self):
+        url = reverse('comments-detail', kwargs={'pk': self.comment.pk})
+        response = self._assert_not_modified(url)
+
+        self.comment.content = 'Edited'
+        self.comment.save()
+
+        assert self._get(url, response).data['content'] == 'Edited'
+
+    def test_comment_of_other_user(self):
+        comment = CommentFactory(task=self.task)
+        url = reverse('comments-detail', kwargs={'pk': comment.pk})
+
+        response = self.api_client.get(url, HTTP_IF_NONE_MATCH='*')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_comment_list(self):
+        url = reverse('comments-list')
+        response = self._assert_not_modified(url)
+
+        CommentFactory(task=self.other_task)
+
+        assert self._get(url, response).status_code == status.HTTP_200_OK
+
+    def test_missing_project(self):
+        url = reverse('projects-detail', kwargs={'pk': self.project.pk + 1000})
+
+        response = self.api_client.get(url, HTTP_IF_NONE_MATCH='*')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -1,5 +1,11 @@
 import pytest
+import threading
+from random import Random
+from unittest.mock import patch
 
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from hypothesis import given, settings
@@ -14,8 +20,9 @@ from yumljira.apps.common.test_utils import user_strategy
 from .utils import add_token
 
 from ..models import Column
+from ..pagination import ColumnTasksPagination
 from ..serializers import ColumnSerializer, ProjectSerializer
-from ..test_factories import ColumnFactory, ProjectFactory
+from ..test_factories import ColumnFactory, ProjectFactory, TaskFactory
 
 
 class ColumnViewsTestCase(TestCase):
@@ -183,3 +190,167 @@ class ColumnViewsTestCase(TestCase):
         assert response.status_code == status.HTTP_400_BAD_REQUEST
         assert self.project.columns.count() == 4
 
+    def test_validate_number_single_query(self):
+        column = self.project.columns.get(number_in_board=2)
+        data = {'title': column.title, 'number_in_board': 3, 'project': self.project.pk}
+        serializer = ColumnSerializer(column, data=data)
+
+        with CaptureQueriesContext(connection) as queries:
+            assert serializer.is_valid()
+
+        # One query for `project` field and one for board numbers.
+        assert len(queries) == 2
+
+    def test_move_column_does_not_change_other_projects(self):
+        other_project = ProjectFactory()
+        other_project.create_kanban_board()
+        other_numbers = dict(other_project.columns.values_list('pk', 'number_in_board'))
+
+        column = self.project.columns.get(number_in_board=1)
+
+        response = self.api_client.patch(self._detail_url(column.pk),
+            {'number_in_board': 3}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert dict(other_project.columns.values_list('pk', 'number_in_board')) == other_numbers
+        assert list(self.project.columns.order_by('number_in_board')
+            .values_list('number_in_board', flat=True)) == [1, 2, 3, 4]
+        assert self.project.columns.get(pk=column.pk).number_in_board == 3
+
+
+class ColumnConcurrentMoveTestCase(TransactionTestCase):
+    COLUMNS = 6
+    THREADS = 6
+    MOVES = 20
+
+    def setUp(self):
+        self.project = ProjectFactory()
+        self.project.create_kanban_board()
+
+        for number in range(5, self.COLUMNS + 1):
+            ColumnFactory(project=self.project, number_in_board=number)
+
+        self.other_project = ProjectFactory()
+        self.other_project.create_kanban_board()
+
+    def _move_columns(self, barrier, moves, errors):
+        try:
+            barrier.wait()
+
+            for column_pk, number in moves:
+                with transaction.atomic():
+                    column = Column.objects.select_related('project').get(pk=column_pk)
+                    Column.update_board_numbers_exist(number, column)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    def test_simultaneous_moves(self):
+        columns = list(self.project.columns.values_list('pk', flat=True))
+        other_numbers = dict(self.other_project.columns.values_list('pk', 'number_in_board'))
+        barrier = threading.Barrier(self.THREADS)
+        random = Random(0)
+        errors = []
+
+        threads = [threading.Thread(target=self._move_columns, args=(barrier, [
+            (random.choice(columns), random.randint(1, self.COLUMNS)) for _ in range(self.MOVES)
+        ], errors)) for _ in range(self.THREADS)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        numbers = list(self.project.columns.order_by('number_in_board').values_list('number_in_board', flat=True))
+
+        assert not errors
+        assert numbers == list(range(1, self.COLUMNS + 1))
+        assert dict(self.other_project.columns.values_list('pk', 'number_in_board')) == other_numbers
+
+
+class ColumnConcurrentRequestsTestCase(TransactionTestCase):
+    COLUMNS = 8
+    REMOVED = 3
+    THREADS = 6
+    MOVES = 10
+
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+
+        self.project = ProjectFactory()
+        self.project.create_kanban_board()
+
+        for number in range(5, self.COLUMNS + 1):
+            ColumnFactory(project=self.project, number_in_board=number, removable=True)
+
+    def _send(self, barrier, requests, responses):
+        api_client = APIClient()
+        add_token(api_client, self.jwt)
+
+        try:
+            barrier.wait()
+
+            for method, column_pk, data in requests:
+                url = reverse('columns-detail', kwargs={'pk': column_pk})
+                responses.append(getattr(api_client, method)(url, data, format='json').status_code)
+        finally:
+            connection.close()
+
+    def test_simultaneous_moves_and_deletes(self):
+        columns = list(self.project.columns.values_list('pk', flat=True))
+        removed = list(self.project.columns.filter(number_in_board__gt=4)
+            .values_list('pk', flat=True))[:self.REMOVED]
+        barrier = threading.Barrier(self.THREADS + 1)
+        random = Random(0)
+        responses = []
+
+        threads = [threading.Thread(target=self._send, args=(barrier, [
+            ('patch', random.choice(columns), {'number_in_board': random.randint(1, self.COLUMNS)})
+            for _ in range(self.MOVES)
+        ], responses)) for _ in range(self.THREADS)]
+        threads.append(threading.Thread(target=self._send, args=(barrier, [
+            ('delete', column_pk, None) for column_pk in removed
+        ], responses)))
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        numbers = list(self.project.columns.order_by('number_in_board').values_list('number_in_board', flat=True))
+
+        # Moves validated before other request removed columns may be rejected or not found.
+        assert set(responses) <= {status.HTTP_200_OK, status.HTTP_204_NO_CONTENT,
+            status.HTTP_400_BAD_REQUEST, status.HTTP_404_NOT_FOUND}
+        assert responses.count(status.HTTP_204_NO_CONTENT) == self.REMOVED
+        assert numbers == list(range(1, self.COLUMNS - self.REMOVED + 1))
+
+
+class ColumnTasksTestCase(TestCase):
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+        self.api_client = APIClient()
+        add_token(self.api_client, self.jwt)
+
+        self.column = ColumnFactory()
+        self.tasks = [TaskFactory(column=self.column) for _ in range(7)]
+        TaskFactory()
+
+    def test_tasks_pages(self):
+        url = reverse('columns-tasks', kwargs={'pk': self.column.pk})
+        tasks = []
+
+        with patch.object(ColumnTasksPagination, 'page_size', 3):
+            while url:
+                response = self.api_client.get(url)
+
+                assert response.status_code == status.HTTP_200_OK
+                assert len(response.data['results']) <= 3
+
+                tasks += [task['pk'] for task in response.data['results']]
+                url = response.data['next']
+
+        assert tasks == [task.pk for task in self.tasks]
@@ -1,11 +1,15 @@
 import pytest
+from datetime import datetime
+from unittest.mock import patch
 
 from django.urls import reverse
 from django.test import TestCase
+from django.utils.timezone import utc
 
 from faker import Faker
 
 from rest_framework import status
+from rest_framework.pagination import CursorPagination
 from rest_framework.test import APIClient
 
 from yumljira.apps.common.test_utils import user_strategy
@@ -52,6 +56,39 @@ class CommentViewsetTestCase(TestCase):
 
         assert results[0]['pk'] == comment.pk
 
+    def test_list_comment_cursor(self):
+        comments = [CommentFactory() for _ in range(5)]
+        add_token(self.client, self.jwt)
+
+        url = f'{self.url}?pagination=cursor'
+        results = []
+
+        with patch.object(CursorPagination, 'page_size', 2):
+            while url:
+                response = self.client.get(url)
+
+                assert response.status_code == status.HTTP_200_OK
+                assert 'count' not in response.data
+
+                results += [comment['pk'] for comment in response.data['results']]
+                url = response.data['next']
+
+        assert results == [comment.pk for comment in reversed(comments)]
+
+    def test_filter_comments(self):
+        comment = CommentFactory()
+        CommentFactory()
+        Comment.objects.filter(pk=comment.pk).update(created=datetime(2019, 10, 2, tzinfo=utc))
+        add_token(self.client, self.jwt)
+
+        response = self.client.get(self.url, {'task': comment.task.pk})
+
+        assert [result['pk'] for result in response.data['results']] == [comment.pk]
+
+        response = self.client.get(self.url, {'date_after': '2019-10-02', 'date_before': '2019-10-02'})
+
+        assert [result['pk'] for result in response.data['results']] == [comment.pk]
+
     def _detail_url(self, pk):
         return reverse('comments-detail', kwargs={'pk': pk})
 
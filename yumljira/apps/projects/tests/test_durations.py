@@ -0,0 +1,78 @@
+import pytest
+from io import StringIO
+
+from django.core.management import call_command
+
+from ..durations import DurationError, _parse_duration, parse_duration
+from ..models import TimeLog
+
+
+@pytest.mark.parametrize('value, minutes', [
+    ('20', 20),
+    (' 20 ', 20),
+    (20, 20),
+    ('30m', 30),
+    ('1h 30m', 90),
+    ('30m 1h', 90),
+    ('1w 2d', 12960),
+    ('0.5h', 30),
+    ('0.5m', 1),
+    ('1.49m', 1),
+    ('2147483647', 2147483647),
+    ('1h -30m', 60),
+    ('1h 0m', 60),
+])
+def test_parse_duration(value, minutes):
+    assert parse_duration(value) == minutes
+
+
+@pytest.mark.parametrize('value, message', [
+    ('0', 'You have to log more than 0 minutes'),
+    ('-5', 'You have to log more than 0 minutes'),
+    ('', 'Wrong values'),
+    ('h', 'Wrong values'),
+    ('2h15m', 'Wrong values'),
+    ('1x 2y', 'You can only use those characters to describe periods: m, h, d, w'),
+    ('1x ay', 'Wrong values'),
+    ('1H', 'You can only use those characters to describe periods: m, h, d, w'),
+    ('0m', 'You can only use those characters to describe periods: m, h, d, w'),
+    ('-1h', 'You can only use those characters to describe periods: m, h, d, w'),
+    ('1h 2h', 'You cannot repeat periods'),
+    ('0.4m', 'You have to log more than 0 minutes'),
+    ('infm', 'Wrong values'),
+    ('1h Infinitym', 'Wrong values'),
+    ('NaNh', 'Wrong values'),
+    ('2147483648', 'Logged time is too long'),
+    ('4000000w', 'Logged time is too long'),
+    ('1e999999h', 'Logged time is too long'),
+])
+def test_parse_duration_errors(value, message):
+    with pytest.raises(DurationError) as error:
+        parse_duration(value)
+
+    assert str(error.value) == message
+
+
+def test_parse_duration_cache():
+    _parse_duration.cache_clear()
+
+    for _ in range(3):
+        parse_duration('2h 30m')
+
+        with pytest.raises(DurationError):
+            parse_duration('2x')
+
+    info = _parse_duration.cache_info()
+
+    assert (info.hits, info.misses) == (4, 2)
+
+
+@pytest.mark.django_db
+def test_benchmark_durations():
+    out = StringIO()
+
+    call_command('benchmark_durations', count=100, entries=20, requests=2, stdout=out)
+
+    assert 'Durations: 100' in out.getvalue()
+    assert 'Bulk requests: 2 of 20 entries' in out.getvalue()
+    assert not TimeLog.objects.exists()
@@ -0,0 +1,239 @@
+import json
+import os
+import pytest
+import tempfile
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from yumljira.apps.common.test_utils import user_strategy
+from yumljira.apps.users.test_factories import UserFactory
+
+from .utils import add_token
+
+from ..importer import ProjectImporter
+from ..models import Column, Comment, DailyUserTime, Project, Sprint, Task, TimeLog, TimeLogRollup
+
+pytestmark = pytest.mark.django_db
+
+
+def _lines(*records):
+    return [json.dumps(record) + '\n' for record in records]
+
+
+class ProjectImporterTestCase(TestCase):
+    def setUp(self):
+        self.user = UserFactory()
+        self.user2 = UserFactory()
+
+    def _records(self, tasks=3):
+        records = [
+            {'type': 'project', 'ref': 'p1', 'name': 'Web', 'key': 'WEB', 'board_type': 'scrum'},
+            {'type': 'column', 'ref': 'c1', 'project': 'p1', 'title': 'TO DO'},
+            {'type': 'column', 'ref': 'c2', 'project': 'p1', 'title': 'DONE'},
+            {'type': 'sprint', 'project': 'p1', 'name': 'Sprint 1'},
+            {'type': 'task', 'ref': 'story', 'column': 'c1', 'title': 'Story', 'task_type': 'STORY'},
+        ]
+
+        for number in range(tasks):
+            records.append({'type': 'task', 'ref': 't{}'.format(number), 'column': 'c2',
+                'title': 'Task {}'.format(number), 'story': 'story',
+                'created_by': self.user.username, 'assigned_to': self.user2.username})
+
+        for number in range(tasks):
+            records.append({'type': 'comment', 'task': 't{}'.format(number),
+                'owner': self.user2.username, 'content': 'Comment'})
+            records.append({'type': 'timelog', 'task': 't{}'.format(number),
+                'user': self.user.username, 'date': '2019-10-01', 'time_logged': 30})
+
+        return _lines(*records)
+
+    def test_import(self):
+        counts = ProjectImporter(default_user=self.user).run(self._records())
+
+        assert counts == {'project': 1, 'column': 2, 'sprint': 1,
+            'task': 4, 'comment': 3, 'timelog': 3}
+
+        project = Project.objects.get(key='WEB')
+
+        assert project.created_by == self.user
+        assert project.total_minutes == 90
+        assert list(project.columns.order_by('number_in_board')
+            .values_list('title', 'number_in_board')) == [('TO DO', 1), ('DONE', 2)]
+        assert list(project.sprints.values_list('name', flat=True)) == ['Sprint 1']
+
+        story = Task.objects.get(title='Story')
+        tasks = list(Task.objects.filter(story=story).order_by('rank'))
+
+        assert [task.title for task in tasks] == ['Task 0', 'Task 1', 'Task 2']
+        assert all(task.assigned_to == self.user2 and task.total_minutes == 30 for task in tasks)
+        assert Comment.objects.filter(task__in=tasks, owner=self.user2).count() == 3
+        assert DailyUserTime.objects.get(user=self.user, date='2019-10-01').minutes == 90
+        assert list(TimeLogRollup.objects.filter(project=project).order_by('task')
+            .values_list('task', 'minutes', 'logs_count')) == [(task.pk, 30, 1) for task in tasks]
+
+    def test_import_adds_to_existing_daily_time(self):
+        DailyUserTime.objects.create(user=self.user, date='2019-10-01', minutes=15)
+
+        ProjectImporter(chunk_size=2).run(self._records())
+
+        assert DailyUserTime.objects.get(user=self.user, date='2019-10-01').minutes == 105
+
+    def test_queries_do_not_depend_on_number_of_records(self):
+        with CaptureQueriesContext(connection) as queries:
+            ProjectImporter(default_user=self.user).run(self._records(tasks=2))
+
+        with CaptureQueriesContext(connection) as queries2:
+            ProjectImporter(default_user=self.user).run(self._records(tasks=20))
+
+        assert len(queries) == len(queries2)
+
+    def test_chunks(self):
+        ProjectImporter(chunk_size=2).run(self._records(tasks=5))
+
+        assert Task.objects.count() == 6
+        assert TimeLog.objects.count() == 5
+        assert Project.objects.get(key='WEB').total_minutes == 150
+
+    def _assert_error(self, records, line, field):
+        with pytest.raises(ValidationError) as error:
+            ProjectImporter(default_user=self.user).run(records)
+
+        assert error.value.detail['line'] == [str(line)]
+        assert field in error.value.detail
+        assert not Project.objects.filter(key='WEB').exists()
+
+    def test_unknown_reference(self):
+        records = self._records()
+        records.append(json.dumps({'type': 'task', 'column': 'c3', 'title': 'Task'}))
+
+        self._assert_error(records, len(records), 'column')
+
+    def test_unknown_user(self):
+        records = self._records()
+        records.append(json.dumps({'type': 'comment', 'task': 't0',
+            'owner': 'nobody', 'content': 'Comment'}))
+
+        self._assert_error(records, len(records), 'owner')
+
+    def test_invalid_field(self):
+        records = self._records()
+        records.append(json.dumps({'type': 'task', 'column': 'c1', 'title': 'Task',
+            'priority': 'Urgent'}))
+
+        self._assert_error(records, len(records), 'priority')
+
+    def test_subtask_of_subtask(self):
+        records = self._records()
+        records.append(json.dumps({'type': 'task', 'column': 'c1', 'title': 'Task', 'story': 't0'}))
+
+        self._assert_error(records, len(records), 'task_type')
+
+    def test_story_of_story(self):
+        records = self._records()
+        records.append(json.dumps({'type': 'task', 'column': 'c1', 'title': 'Task',
+            'task_type': 'STORY', 'story': 'story'}))
+
+        self._assert_error(records, len(records), 'story')
+
+    def test_duplicated_reference(self):
+        records = self._records()
+        records.append(json.dumps({'type': 'column', 'ref': 'c1', 'project': 'p1', 'title': 'QA'}))
+
+        self._assert_error(records, len(records), 'ref')
+
+    def test_invalid_json(self):
+        self._assert_error(self._records() + ['{"type": '], len(self._records()) + 1, 'type')
+
+
+class ProjectImportViewTestCase(TestCase):
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+        self.client = APIClient()
+        self.url = reverse('projects-import-projects')
+
+    def _upload(self, *records):
+        return SimpleUploadedFile('import.jsonl', ''.join(_lines(*records)).encode('utf-8'))
+
+    def test_import(self):
+        add_token(self.client, self.jwt)
+
+        response = self.client.post(self.url, {'file': self._upload(
+            {'type': 'project', 'ref': 'p1', 'name': 'Web', 'key': 'WEB'},
+            {'type': 'column', 'ref': 'c1', 'project': 'p1', 'title': 'TO DO'},
+            {'type': 'task', 'column': 'c1', 'title': 'Task'},
+        )}, format='multipart')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['task'] == 1
+        assert Project.objects.get(key='WEB').created_by == self.user
+
+    def test_invalid_record(self):
+        add_token(self.client, self.jwt)
+
+        response = self.client.post(self.url, {'file': self._upload(
+            {'type': 'project', 'ref': 'p1', 'name': 'Web', 'key': 'WEB'},
+            {'type': 'column', 'project': 'p2', 'title': 'TO DO'},
+        )}, format='multipart')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['line'] == ['2']
+        assert not Project.objects.filter(key='WEB').exists()
+
+    def test_no_file(self):
+        add_token(self.client, self.jwt)
+
+        response = self.client.post(self.url, {}, format='multipart')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_no_credentials(self):
+        response = self.client.post(self.url, {}, format='multipart')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+class ImportProjectsCommandTestCase(TestCase):
+    def test_import(self):
+        user = UserFactory()
+        path = self._write(
+            {'type': 'project', 'ref': 'p1', 'name': 'Web', 'key': 'WEB'},
+            {'type': 'column', 'ref': 'c1', 'project': 'p1', 'title': 'TO DO'},
+            {'type': 'task', 'ref': 't1', 'column': 'c1', 'title': 'Task'},
+            {'type': 'comment', 'task': 't1', 'content': 'Comment'},
+        )
+        out = StringIO()
+
+        call_command('import_projects', path, user=user.username, stdout=out)
+
+        assert 'Imported comments: 1' in out.getvalue()
+        assert Comment.objects.get().owner == user
+
+    def test_missing_owner(self):
+        path = self._write(
+            {'type': 'project', 'ref': 'p1', 'name': 'Web', 'key': 'WEB'},
+            {'type': 'column', 'ref': 'c1', 'project': 'p1', 'title': 'TO DO'},
+            {'type': 'task', 'ref': 't1', 'column': 'c1', 'title': 'Task'},
+            {'type': 'comment', 'task': 't1', 'content': 'Comment'},
+        )
+
+        with pytest.raises(CommandError):
+            call_command('import_projects', path, stdout=StringIO())
+
+    def _write(self, *records):
+        with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as lines:
+            lines.writelines(_lines(*records))
+
+        self.addCleanup(os.remove, lines.name)
+
+        return lines.name
@@ -0,0 +1,34 @@
+import pytest
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from ..models import Task
+
+pytestmark = pytest.mark.django_db
+
+
+def test_benchmark_indexes_rolls_back():
+    out = StringIO()
+
+    call_command('benchmark_indexes', tasks=20, users=3, projects=2, stdout=out)
+
+    assert 'Without filter indexes' in out.getvalue()
+    assert 'With filter indexes' in out.getvalue()
+    assert not Task.objects.exists()
+
+    with connection.cursor() as cursor:
+        indexes = connection.introspection.get_constraints(cursor, 'projects_timelog')
+
+    assert 'projects_ti_user_id_6ae88c_idx' in indexes
+
+
+def test_benchmark_indexes_refuses_application_database():
+    with patch.dict(connection.settings_dict, {'NAME': 'yumljira'}):
+        with pytest.raises(CommandError):
+            call_command('benchmark_indexes', tasks=20, users=3, projects=2, stdout=StringIO())
+
+        call_command('benchmark_indexes', tasks=20, users=3, projects=2,
+            scratch_database='yumljira', stdout=StringIO())
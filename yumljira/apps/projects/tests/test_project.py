@@ -1,6 +1,9 @@
 import pytest
+from unittest.mock import patch
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from faker import Faker
@@ -12,10 +15,12 @@ from yumljira.apps.common.test_utils import user_strategy
 
 from .utils import add_token
 
-from ..choices import KANBAN
-from ..models import Project
+from ..choices import BACKLOG, DONE, IN_PROGRESS, KANBAN, SCRUM, SELECTED_FOR_DEV, TO_DO
+from ..filters import has_trigram_extension
+from ..models import BoardChange, Column, Project, Sprint
+from ..pagination import ColumnTasksPagination
 from ..serializers import ProjectSerializer
-from ..test_factories import ProjectFactory
+from ..test_factories import ColumnFactory, CommentFactory, ProjectFactory, TaskFactory, TimeLogFactory
 
 
 pytestmark = pytest.mark.django_db
@@ -67,6 +72,31 @@ class ProjectTestCase(TestCase):
         assert data[0]['created_by'] == self.user.id
         assert data[0]['key'] == project.key
 
+    def _list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+
+        return [query['sql'] for query in queries]
+
+    def test_list_projects_skips_board(self):
+        project = ProjectFactory(created_by=self.user)
+        column = ColumnFactory(project=project)
+        add_token(self.client, self.jwt)
+
+        CommentFactory(task=TaskFactory(column=column))
+        queries_before = self._list_queries()
+
+        for _ in range(10):
+            CommentFactory(task=TaskFactory(column=column))
+
+        queries = self._list_queries()
+
+        assert len(queries_before) == len(queries)
+        assert not [sql for sql in queries
+            if 'projects_task' in sql or 'projects_comment' in sql or 'projects_column' in sql]
+
     def test_no_credentials(self):
         project = ProjectFactory()
         project2 = ProjectFactory()
@@ -99,6 +129,34 @@ class ProjectTestCase(TestCase):
 
         assert response.status_code == status.HTTP_204_NO_CONTENT
 
+    def test_project_delete_with_board(self):
+        add_token(self.client, self.jwt)
+        response = self.client.post(self.url, {'name': 'Board', 'key': 'BRD',
+            'board_type': SCRUM, 'sprint_name': 'Sprint 1'}, format='json')
+        project = Project.objects.get(pk=response.data['pk'])
+        column = project.columns.order_by('number_in_board').first()
+        story = TaskFactory(column=column)
+        CommentFactory(task=TaskFactory(column=column, story=story))
+        TimeLogFactory(task=story, time_logged=30)
+
+        response = self.client.delete(self._detail_url(project.pk))
+        # Deferred foreign keys are checked at commit which `TestCase` never reaches.
+        connection.check_constraints()
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not Project.objects.filter(pk=project.pk).exists()
+        assert not BoardChange.objects.filter(project=project.pk).exists()
+
+    def test_project_queryset_delete_with_board(self):
+        project = ProjectFactory(board_type=KANBAN)
+        project.create_kanban_board()
+        CommentFactory(task=TaskFactory(column=project.columns.first()))
+
+        Project.objects.filter(pk=project.pk).with_time_logged().delete()
+        connection.check_constraints()
+
+        assert not Project.objects.filter(pk=project.pk).exists()
+
     def test_project_update_patch(self):
         project = ProjectFactory()
         name = Faker().word()
@@ -138,3 +196,204 @@ class ProjectTestCase(TestCase):
         assert 'sprints' in response.data
         assert 'columns' in response.data
 
+    def _retrieve_queries_count(self, pk):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self._detail_url(pk))
+
+        assert response.status_code == status.HTTP_200_OK
+
+        return len(queries)
+
+    def test_retrieve_project_queries_count(self):
+        project = ProjectFactory(board_type=KANBAN)
+        column = ColumnFactory(project=project, number_in_board=1)
+        add_token(self.client, self.jwt)
+
+        for _ in range(2):
+            TimeLogFactory(task=TaskFactory(column=column))
+
+        queries_before = self._retrieve_queries_count(project.pk)
+
+        for _ in range(10):
+            task = TaskFactory(column=column)
+            TimeLogFactory(task=task)
+            CommentFactory(task=task)
+
+        assert queries_before == self._retrieve_queries_count(project.pk)
+
+    def test_retrieve_project_first_pages(self):
+        project = ProjectFactory(board_type=KANBAN)
+        hidden = ColumnFactory(project=project, number_in_board=1, should_show=False)
+        visible = ColumnFactory(project=project, number_in_board=2, should_show=True)
+        done = ColumnFactory(project=project, number_in_board=3, should_show=True)
+        tasks = [TaskFactory(column=visible) for _ in range(3)]
+        TaskFactory(column=hidden)
+        done_task = TaskFactory(column=done)
+        add_token(self.client, self.jwt)
+
+        with patch.object(ColumnTasksPagination, 'page_size', 2):
+            response = self.client.get(self._detail_url(project.pk))
+
+        assert response.status_code == status.HTTP_200_OK
+
+        hidden_data, visible_data, done_data = response.data['columns']
+
+        assert hidden_data['tasks'] == []
+        assert hidden_data['tasks_count'] == 1
+        assert hidden_data['tasks_next'] is None
+
+        assert [task['pk'] for task in visible_data['tasks']] == [task.pk for task in tasks[:2]]
+        assert visible_data['tasks_count'] == 3
+
+        assert [task['pk'] for task in done_data['tasks']] == [done_task.pk]
+        assert done_data['tasks_next'] is None
+
+        response = self.client.get(visible_data['tasks_next'])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [task['pk'] for task in response.data['results']] == [tasks[2].pk]
+
+    def test_retrieve_project_first_pages_equal_ranks(self):
+        project = ProjectFactory(board_type=KANBAN)
+        column = ColumnFactory(project=project, number_in_board=1, should_show=True)
+        equal = ColumnFactory(project=project, number_in_board=2, should_show=True)
+        tasks = [TaskFactory(column=column, rank=rank) for rank in ['a', 'b', 'b', 'b', 'c']]
+        equal_tasks = [TaskFactory(column=equal, rank='b') for _ in range(3)]
+        add_token(self.client, self.jwt)
+
+        with patch.object(ColumnTasksPagination, 'page_size', 2):
+            response = self.client.get(self._detail_url(project.pk))
+
+            for column_data, column_tasks in zip(response.data['columns'], [tasks, equal_tasks]):
+                pks = [task['pk'] for task in column_data['tasks']]
+                url = column_data['tasks_next']
+
+                while url:
+                    data = self.client.get(url).data
+                    pks += [task['pk'] for task in data['results']]
+                    url = data['next']
+
+                assert pks == [task.pk for task in column_tasks]
+
+
+class ProjectBoardBootstrapTestCase(TestCase):
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+        self.client = APIClient()
+        self.url = reverse('projects-list')
+        add_token(self.client, self.jwt)
+
+    def _create(self, **data):
+        data.setdefault('name', 'Project')
+        data.setdefault('key', 'PRJ')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, format='json')
+
+        return response, [query['sql'] for query in queries if query['sql'].startswith('INSERT')]
+
+    def _columns(self, pk):
+        return list(Column.objects.filter(project_id=pk).order_by('number_in_board')
+            .values_list('title', 'number_in_board', 'should_show', 'removable'))
+
+    def test_kanban_board(self):
+        response, inserts = self._create(board_type=KANBAN)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(inserts) == 2
+        assert self._columns(response.data['pk']) == [
+            (BACKLOG, 1, False, False),
+            (SELECTED_FOR_DEV, 2, True, False),
+            (IN_PROGRESS, 3, True, False),
+            (DONE, 4, True, False),
+        ]
+        assert not Sprint.objects.filter(project_id=response.data['pk']).exists()
+
+    def test_scrum_board(self):
+        response, inserts = self._create(board_type=SCRUM, sprint_name='Sprint 1')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(inserts) == 3
+        assert [column[0] for column in self._columns(response.data['pk'])] == \
+            [BACKLOG, TO_DO, IN_PROGRESS, DONE]
+        assert list(Sprint.objects.filter(project_id=response.data['pk'])
+            .values_list('name', flat=True)) == ['Sprint 1']
+
+    def test_board_template(self):
+        response, inserts = self._create(board_type=SCRUM, sprint_name='Sprint 1',
+            column_titles=['Design', 'Review'], sprint_names=['Sprint 2', 'Sprint 3'])
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(inserts) == 3
+        assert self._columns(response.data['pk']) == [
+            (BACKLOG, 1, False, False),
+            ('Design', 2, True, True),
+            ('Review', 3, True, True),
+        ]
+        assert list(Sprint.objects.filter(project_id=response.data['pk'])
+            .order_by('id').values_list('name', flat=True)) == ['Sprint 1', 'Sprint 2', 'Sprint 3']
+
+    def test_kanban_template_with_sprints(self):
+        response, _ = self._create(board_type=KANBAN, sprint_names=['Sprint 1'])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'sprint_names' in response.data
+
+    def test_empty_column_titles(self):
+        response, _ = self._create(board_type=KANBAN, column_titles=[])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'column_titles' in response.data
+
+    def test_board_failure_rolls_back_project(self):
+        projects_before = Project.objects.count()
+
+        with patch.object(Sprint.objects, 'bulk_create', side_effect=RuntimeError):
+            with pytest.raises(RuntimeError):
+                self._create(board_type=SCRUM, sprint_name='Sprint 1')
+
+        assert projects_before == Project.objects.count()
+        assert not Column.objects.filter(project__key='PRJ').exists()
+
+    def test_create_boards_in_bulk(self):
+        projects = [ProjectFactory(board_type=KANBAN) for _ in range(5)]
+
+        with CaptureQueriesContext(connection) as queries:
+            Project.create_boards([project.build_board(sprint_names=['Sprint'])
+                for project in projects])
+
+        assert len([query for query in queries if query['sql'].startswith('INSERT')]) == 2
+        assert Column.objects.filter(project__in=projects).count() == 20
+        assert Sprint.objects.filter(project__in=projects).count() == 5
+
+
+class ProjectSearchTestCase(TestCase):
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+        self.client = APIClient()
+        self.url = reverse('projects-list')
+        add_token(self.client, self.jwt)
+
+        self.backend = ProjectFactory(name='Backend', key='API')
+        self.frontend = ProjectFactory(name='Frontend', key='WEB')
+        self.mobile = ProjectFactory(name='Mobile app', key='MOB')
+
+    def _search(self, value):
+        response = self.client.get(self.url, {'search': value})
+
+        assert response.status_code == status.HTTP_200_OK
+
+        return [project['pk'] for project in response.data['results']]
+
+    def test_search_name_and_key(self):
+        assert set(self._search('END')) == {self.backend.pk, self.frontend.pk}
+        assert self._search('api') == [self.backend.pk]
+        assert self._search('web') == [self.frontend.pk]
+        assert self._search('desktop') == []
+
+    def test_search_ordered_by_similarity(self):
+        if not has_trigram_extension():
+            pytest.skip('pg_trgm extension is not available.')
+
+        assert self._search('mob') == [self.mobile.pk]
+        assert self._search('front')[0] == self.frontend.pk
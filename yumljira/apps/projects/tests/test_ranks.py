@@ -0,0 +1,212 @@
+import pytest
+import threading
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from hypothesis import given, settings
+from hypothesis.extra.django import TestCase
+from hypothesis.strategies import integers, lists
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from yumljira.apps.common.test_utils import user_strategy
+
+from .utils import add_token
+
+from ..models import Task
+from ..ranks import REBALANCE_LENGTH, needs_rebalance, rank_between, rank_from_number, spread_ranks
+from ..test_factories import ColumnFactory, ProjectFactory, TaskFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@given(lists(integers(min_value=0, max_value=1000), max_size=50))
+def test_rank_between(positions):
+    ranks = []
+
+    for position in positions:
+        index = position % (len(ranks) + 1)
+        before = ranks[index - 1] if index > 0 else None
+        after = ranks[index] if index < len(ranks) else None
+
+        rank = rank_between(before, after)
+
+        assert before is None or before < rank
+        assert after is None or rank < after
+        assert not rank.endswith('0')
+
+        ranks.insert(index, rank)
+
+    assert ranks == sorted(ranks)
+
+
+def test_rank_between_wrong_order():
+    with pytest.raises(ValueError):
+        rank_between('b', 'a')
+
+
+def test_rank_between_empty_ranks():
+    assert rank_between(None, '') == rank_between(None, None)
+    assert rank_between('', 'a') == rank_between(None, 'a')
+
+
+@given(integers(min_value=1, max_value=5000))
+@settings(max_examples=20)
+def test_spread_ranks(count):
+    ranks = spread_ranks(count)
+
+    assert ranks == sorted(set(ranks))
+    assert not any(needs_rebalance(rank) for rank in ranks)
+
+
+def test_rank_from_number():
+    ranks = [rank_from_number(number) for number in range(1, 2000)]
+
+    assert ranks == sorted(set(ranks))
+
+
+class TaskRankTestCase(TestCase):
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+        self.api_client = APIClient()
+        add_token(self.api_client, self.jwt)
+
+        self.project = ProjectFactory()
+        self.project.create_kanban_board()
+        self.backlog, self.to_do = self.project.columns.order_by('number_in_board')[:2]
+        self.tasks = [TaskFactory(column=self.backlog) for _ in range(5)]
+
+    def _column_tasks(self, column):
+        return list(column.tasks.order_by('rank').values_list('pk', flat=True))
+
+    def _reorder(self, task, **data):
+        return self.api_client.post(reverse('tasks-reorder', kwargs={'pk': task.pk}), data, format='json')
+
+    def test_new_tasks_at_the_end(self):
+        assert self._column_tasks(self.backlog) == [task.pk for task in self.tasks]
+
+    def test_reorder_changes_only_one_rank(self):
+        ranks_before = dict(Task.objects.values_list('pk', 'rank'))
+        task = self.tasks[4]
+
+        response = self._reorder(task, after=self.tasks[1].pk)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert self._column_tasks(self.backlog) == [self.tasks[i].pk for i in (0, 1, 4, 2, 3)]
+
+        changed = [pk for pk, rank in Task.objects.values_list('pk', 'rank') if ranks_before[pk] != rank]
+
+        assert changed == [task.pk]
+
+    def test_reorder_to_top(self):
+        response = self._reorder(self.tasks[2], after=None)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert self._column_tasks(self.backlog)[0] == self.tasks[2].pk
+
+    def test_reorder_to_other_column(self):
+        other = TaskFactory(column=self.to_do)
+
+        response = self._reorder(self.tasks[0], column=self.to_do.pk, after=other.pk)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert self._column_tasks(self.to_do) == [other.pk, self.tasks[0].pk]
+
+    def test_reorder_with_empty_ranks(self):
+        Task.objects.filter(pk__in=[self.tasks[0].pk, self.tasks[1].pk]).update(rank='')
+
+        with patch.object(transaction, 'on_commit', lambda func: func()):
+            response = self._reorder(self.tasks[4], after=None)
+
+            assert response.status_code == status.HTTP_200_OK
+
+            response = self._reorder(self.tasks[3], after=self.tasks[0].pk)
+
+            assert response.status_code == status.HTTP_200_OK
+
+        assert not self.backlog.tasks.filter(rank='').exists()
+        assert set(self._column_tasks(self.backlog)) == {task.pk for task in self.tasks}
+
+    def test_reorder_with_equal_ranks(self):
+        Task.objects.filter(pk__in=[task.pk for task in self.tasks[:3]]).update(rank=self.tasks[0].rank)
+
+        response = self._reorder(self.tasks[4], after=self.tasks[1].pk)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert self._column_tasks(self.backlog) == [self.tasks[i].pk for i in (0, 1, 4, 2, 3)]
+        assert len(set(self.backlog.tasks.values_list('rank', flat=True))) == len(self.tasks)
+
+    def test_reorder_wrong_data(self):
+        other = TaskFactory(column=self.to_do)
+
+        response = self._reorder(self.tasks[0], after=other.pk)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = self._reorder(self.tasks[0], column=ColumnFactory().pk, after=None)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_rebalance_ranks(self):
+        # Test case runs inside transaction so callbacks are run immediately.
+        with patch.object(transaction, 'on_commit', lambda func: func()):
+            for i in range(100):
+                response = self._reorder(self.tasks[1 + i % 2], after=self.tasks[0].pk)
+
+                assert response.status_code == status.HTTP_200_OK
+
+        assert not any(needs_rebalance(rank) for rank in Task.objects.values_list('rank', flat=True))
+        assert self._column_tasks(self.backlog) == [self.tasks[i].pk for i in (0, 2, 1, 3, 4)]
+
+    def test_rebalance_ranks_command(self):
+        task = self.tasks[2]
+        task.rank = self.tasks[1].rank + 'z' * REBALANCE_LENGTH
+        task.save()
+        tasks = self._column_tasks(self.backlog)
+
+        call_command('rebalance_ranks', stdout=StringIO())
+
+        assert self._column_tasks(self.backlog) == tasks
+        assert not any(needs_rebalance(rank) for rank in Task.objects.values_list('rank', flat=True))
+
+
+class TaskConcurrentAppendTestCase(TransactionTestCase):
+    THREADS = 6
+    TASKS = 5
+
+    def setUp(self):
+        self.column = ColumnFactory()
+
+    def _create_tasks(self, barrier, errors):
+        try:
+            barrier.wait()
+
+            for _ in range(self.TASKS):
+                TaskFactory(column=self.column)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    def test_simultaneous_appends(self):
+        barrier = threading.Barrier(self.THREADS)
+        errors = []
+        threads = [threading.Thread(target=self._create_tasks, args=(barrier, errors))
+            for _ in range(self.THREADS)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        ranks = list(self.column.tasks.values_list('rank', flat=True))
+
+        assert not errors
+        assert len(set(ranks)) == len(ranks) == self.THREADS * self.TASKS
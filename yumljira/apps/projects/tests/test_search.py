@@ -0,0 +1,202 @@
+import pytest
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from yumljira.apps.common.test_utils import user_strategy
+
+from .utils import add_token
+
+from ..models import Task
+from ..pagination import SearchPagination
+from ..search import InMemorySearchBackend, get_search_backend
+from ..search_index import InvertedIndex, analyze
+from ..test_factories import ColumnFactory, CommentFactory, TaskFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class SearchTestCase(TestCase):
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+        self.api_client = APIClient()
+        self.url = reverse('search-list')
+        add_token(self.api_client, self.jwt)
+
+        self.column = ColumnFactory()
+        self.title_task = TaskFactory(column=self.column, title='Login crashes on startup',
+            description='Steps to reproduce')
+        self.description_task = TaskFactory(column=self.column, title='Old bug',
+            description='Application crashes when login form is sent')
+        self.comment_task = TaskFactory(column=self.column, title='Form validation',
+            description='Validate email')
+        CommentFactory(task=self.comment_task, content='It still crashes for me')
+        self.other_task = TaskFactory(column=self.column, title='Add dark theme', description='')
+
+    def _search(self, **params):
+        response = self.api_client.get(self.url, params)
+
+        assert response.status_code == status.HTTP_200_OK
+
+        return response.data
+
+    def test_search_ranking(self):
+        results = self._search(q='crashes')['results']
+
+        assert [task['pk'] for task in results] == \
+            [self.title_task.pk, self.description_task.pk, self.comment_task.pk]
+        assert results[0]['project'] == self.column.project_id
+        assert results[0]['search_rank'] > results[1]['search_rank']
+
+    def test_search_stemming(self):
+        results = self._search(q='crashing')['results']
+
+        assert len(results) == 3
+
+    def test_vectors_updated_on_write(self):
+        Task.objects.filter(pk=self.other_task.pk).update(title='Theme crashes')
+        self.comment_task.comments.update(content='Works now')
+
+        results = self._search(q='crashes')['results']
+
+        assert {task['pk'] for task in results} == \
+            {self.title_task.pk, self.description_task.pk, self.other_task.pk}
+
+    def test_project_scope(self):
+        TaskFactory(title='Crashes everywhere')
+
+        results = self._search(q='crashes', project=self.column.project_id)['results']
+
+        assert len(results) == 3
+
+        assert len(self._search(q='crashes')['results']) == 4
+
+    def test_cursor_pagination(self):
+        with patch.object(SearchPagination, 'page_size', 2):
+            data = self._search(q='crashes')
+            response = self.api_client.get(data['next'])
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [task['pk'] for task in data['results'] + response.data['results']] == \
+            [self.title_task.pk, self.description_task.pk, self.comment_task.pk]
+        assert response.data['next'] is None
+
+    def test_query_required(self):
+        response = self.api_client.get(self.url)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_no_credentials(self):
+        self.api_client.credentials()
+
+        response = self.api_client.get(self.url, {'q': 'crashes'})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@override_settings(SEARCH_BACKEND='yumljira.apps.projects.search.InMemorySearchBackend')
+class InMemorySearchTestCase(SearchTestCase):
+    def setUp(self):
+        super().setUp()
+        self.backend = get_search_backend()
+        self.backend.rebuild()
+
+    def test_backend(self):
+        assert isinstance(self.backend, InMemorySearchBackend)
+
+    def test_vectors_updated_on_write(self):
+        # `TestCase` never commits so index callbacks are run right away.
+        with patch.object(transaction, 'on_commit', lambda func: func()):
+            self.other_task.title = 'Theme crashes'
+            self.other_task.save()
+            self.comment_task.comments.get().delete()
+            self.title_task.delete()
+
+        results = self._search(q='crashes')['results']
+
+        assert {task['pk'] for task in results} == {self.description_task.pk, self.other_task.pk}
+
+    def test_project_scope(self):
+        with patch.object(transaction, 'on_commit', lambda func: func()):
+            super().test_project_scope()
+
+    def test_rolled_back_write_not_indexed(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.other_task.title = 'Theme crashes'
+            self.other_task.save()
+            self.comment_task.comments.get().delete()
+
+            raise RuntimeError
+
+        results = self._search(q='crashes')['results']
+
+        assert {task['pk'] for task in results} == \
+            {self.title_task.pk, self.description_task.pk, self.comment_task.pk}
+
+    def test_stale_index_rebuilt(self):
+        Task.objects.filter(pk=self.other_task.pk).update(title='Theme crashes')
+
+        assert len(self._search(q='crashes')['results']) == 3
+
+        self.backend.built_at -= InMemorySearchBackend.MAX_AGE
+
+        assert len(self._search(q='crashes')['results']) == 4
+
+    def test_rebuild(self):
+        Task.objects.filter(pk=self.other_task.pk).update(title='Theme crashes')
+
+        assert len(self._search(q='crashes')['results']) == 3
+
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+
+        assert 'InMemorySearchBackend: 5 documents indexed' in out.getvalue()
+
+        assert len(self._search(q='crashes')['results']) == 4
+
+    def test_query_count(self):
+        with self.assertNumQueries(2):
+            list(self.backend.search_tasks('crashes'))
+
+
+class InvertedIndexTestCase(TestCase):
+    def test_analyze(self):
+        assert analyze('The login CRASHES, crashing crashed!') == ['login', 'crash', 'crash', 'crash']
+
+    def test_all_terms_required(self):
+        index = InvertedIndex()
+        index.add(1, ['login', 'crash'])
+        index.add(2, ['login'])
+
+        assert set(index.search(['login', 'crash'])) == {1}
+        assert index.search(['login', 'theme']) == {}
+
+    def test_bm25_ranking(self):
+        index = InvertedIndex()
+        index.add(1, ['crash', 'crash', 'login'])
+        index.add(2, ['crash', 'login', 'form', 'email', 'theme'])
+        index.add(3, ['theme'])
+
+        scores = index.search(['crash'])
+
+        assert scores[1] > scores[2] > 0
+
+    def test_replace_and_remove(self):
+        index = InvertedIndex()
+        index.add(1, ['crash'])
+        index.add(1, ['theme'])
+
+        assert index.search(['crash']) == {}
+
+        index.remove(1)
+
+        assert len(index) == 0
+        assert index.postings == {}
+        assert index.total_length == 0
@@ -1,7 +1,9 @@
 import pytest
 
+from django.db import connection
 from django.urls import reverse
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from faker import Faker
 
@@ -15,7 +17,7 @@ from .utils import add_token
 from ..choices import KANBAN, STORY, SUBTASK
 from ..models import Project, Task
 from ..serializers import ProjectSerializer, TaskSerializer
-from ..test_factories import ProjectFactory, TaskFactory
+from ..test_factories import ColumnFactory, CommentFactory, ProjectFactory, TaskFactory, TimeLogFactory
 
 pytestmark = pytest.mark.django_db
 
@@ -72,6 +74,32 @@ class TaskTestCase(TestCase):
         assert data[0]['title'] == task.title
         assert data[0]['created_by'] == self.user.id
 
+    def _list_queries_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+
+        return len(queries)
+
+    def test_list_tasks_queries_count(self):
+        column = self.project.columns.first()
+        add_token(self.client, self.jwt)
+
+        for _ in range(2):
+            task = TaskFactory(column=column)
+            TimeLogFactory(task=task)
+            CommentFactory(task=task)
+
+        queries_before = self._list_queries_count()
+
+        for _ in range(10):
+            task = TaskFactory(column=column)
+            TimeLogFactory(task=task)
+            CommentFactory(task=task)
+
+        assert queries_before == self._list_queries_count()
+
     def test_no_credentials(self):
         task = TaskFactory()
         task2 = TaskFactory()
@@ -172,3 +200,54 @@ class TaskTestCase(TestCase):
         task.refresh_from_db()
 
         assert task.title == title
+
+
+class TaskBulkMoveTestCase(TestCase):
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+        self.client = APIClient()
+        self.url = reverse('tasks-move')
+        add_token(self.client, self.jwt)
+
+        self.project = ProjectFactory(board_type=KANBAN)
+        self.project.create_kanban_board()
+        self.backlog, self.to_do = self.project.columns.order_by('number_in_board')[:2]
+
+    def test_move_tasks(self):
+        tasks = [TaskFactory(column=self.backlog) for _ in range(10)]
+        TaskFactory(column=self.to_do)
+
+        data = {'tasks': [{'pk': task.pk, 'column': self.to_do.pk} for task in tasks]}
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert sorted(task['pk'] for task in response.data) == [task.pk for task in tasks]
+        assert set(response.data[0].keys()) == {'pk', 'column', 'rank', 'modified'}
+
+        assert Task.objects.filter(column=self.to_do).count() == 11
+        assert len([query for query in queries
+            if query['sql'].startswith('UPDATE "projects_task"')]) == 1
+
+    def test_move_tasks_errors(self):
+        task = TaskFactory(column=self.backlog)
+        task2 = TaskFactory(column=self.backlog)
+        other_column = ColumnFactory()
+
+        data = {'tasks': [
+            {'pk': task.pk, 'column': self.to_do.pk},
+            {'pk': task2.pk, 'column': other_column.pk},
+            {'pk': task.pk, 'column': self.to_do.pk},
+            {'pk': TaskFactory(column=self.to_do).pk, 'column': self.to_do.pk},
+        ]}
+
+        response = self.client.post(self.url, data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['tasks'][0] == {}
+        assert 'column' in response.data['tasks'][1]
+        assert 'pk' in response.data['tasks'][2]
+        assert response.data['tasks'][3] == {'column': ['Task is already in this column.']}
+
+        assert Task.objects.filter(column=self.backlog).count() == 2
@@ -0,0 +1,174 @@
+import pytest
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Sum
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from yumljira.apps.common.test_utils import user_strategy
+
+from .utils import add_token
+
+from ..models import DailyUserTime, Project, Task, TimeLogRollup
+from ..test_factories import ColumnFactory, TaskFactory, TimeLogFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TimeTotalsTestCase(TestCase):
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+        self.api_client = APIClient()
+        self.url = reverse('timelogs-list')
+        add_token(self.api_client, self.jwt)
+
+        self.task = TaskFactory()
+        self.project = self.task.column.project
+
+    def _details_url(self, pk):
+        return reverse('timelogs-detail', kwargs={'pk': pk})
+
+    def _create_log(self, time_logged, date='2019-10-01'):
+        data = {'task': self.task.pk, 'date': date, 'time_logged': time_logged}
+        response = self.api_client.post(self.url, data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+        return response.data['pk']
+
+    def _assert_totals(self, minutes, date='2019-10-01'):
+        self.task.refresh_from_db()
+        self.project.refresh_from_db()
+
+        assert self.task.total_minutes == minutes
+        assert self.project.total_minutes == minutes
+        assert DailyUserTime.objects.get(user=self.user, date=date).minutes == minutes
+
+    def test_create_time_log(self):
+        self._create_log('1h 30m')
+        self._create_log(20)
+
+        self._assert_totals(110)
+
+    def test_update_time_log(self):
+        pk = self._create_log(30)
+
+        response = self.api_client.patch(self._details_url(pk), {'time_logged': 45}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+
+        self._assert_totals(45)
+
+    def test_update_time_log_date(self):
+        pk = self._create_log(30)
+
+        response = self.api_client.patch(self._details_url(pk), {'date': '2019-10-02'}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+
+        self._assert_totals(30, date='2019-10-02')
+        assert DailyUserTime.objects.get(user=self.user, date='2019-10-01').minutes == 0
+
+    def test_delete_time_log(self):
+        pk = self._create_log(30)
+        self._create_log(20)
+
+        response = self.api_client.delete(self._details_url(pk))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        self._assert_totals(20)
+
+    def test_task_update_keeps_totals(self):
+        self._create_log(30)
+
+        response = self.api_client.patch(reverse('tasks-detail', kwargs={'pk': self.task.pk}),
+            {'title': 'New title'}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+
+        self._assert_totals(30)
+
+    def test_task_moved_to_other_project(self):
+        self._create_log(30)
+        column = ColumnFactory()
+
+        response = self.api_client.patch(reverse('tasks-detail', kwargs={'pk': self.task.pk}),
+            {'column': column.pk}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+
+        self.project.refresh_from_db()
+        column.project.refresh_from_db()
+
+        assert self.project.total_minutes == 0
+        assert column.project.total_minutes == 30
+
+    def test_task_delete(self):
+        self._create_log(30)
+
+        response = self.api_client.delete(reverse('tasks-detail', kwargs={'pk': self.task.pk}))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        self.project.refresh_from_db()
+
+        assert self.project.total_minutes == 0
+
+    def test_story_delete(self):
+        self._create_log(30)
+        subtask = TaskFactory(column=self.task.column, story=self.task)
+        other_subtask = TaskFactory(story=self.task)
+        other_project = other_subtask.column.project
+
+        for task, minutes in ((subtask, 20), (other_subtask, 10)):
+            response = self.api_client.post(self.url,
+                {'task': task.pk, 'date': '2019-10-01', 'time_logged': minutes}, format='json')
+
+            assert response.status_code == status.HTTP_201_CREATED
+
+        response = self.api_client.delete(reverse('tasks-detail', kwargs={'pk': self.task.pk}))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        self.project.refresh_from_db()
+        other_project.refresh_from_db()
+
+        assert not Task.objects.filter(pk=subtask.pk).exists()
+        assert self.project.total_minutes == 0
+        assert other_project.total_minutes == 0
+        assert not TimeLogRollup.objects.exclude(project=None).exists()
+        assert TimeLogRollup.objects.filter(task=None).aggregate(total=Sum('minutes'))['total'] == 60
+        assert DailyUserTime.objects.get(user=self.user, date='2019-10-01').minutes == 60
+
+
+class RebuildTimeTotalsTestCase(TestCase):
+    def setUp(self):
+        self.task = TaskFactory()
+        self.log = TimeLogFactory(task=self.task, time_logged=30, date='2019-10-01')
+        self.log2 = TimeLogFactory(task=self.task, user=self.log.user,
+            time_logged=20, date='2019-10-01')
+
+    def test_check_drift(self):
+        with pytest.raises(CommandError):
+            call_command('rebuild_time_totals', check=True, stdout=StringIO())
+
+    def test_rebuild(self):
+        call_command('rebuild_time_totals', stdout=StringIO())
+
+        self.task.refresh_from_db()
+        project = Project.objects.get(pk=self.task.column.project_id)
+
+        assert self.task.total_minutes == 50
+        assert project.total_minutes == 50
+        assert DailyUserTime.objects.get(user=self.log.user, date='2019-10-01').minutes == 50
+
+        out = StringIO()
+        call_command('rebuild_time_totals', check=True, stdout=out)
+
+        assert 'Tasks with drift: 0' in out.getvalue()
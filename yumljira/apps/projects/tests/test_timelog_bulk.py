@@ -0,0 +1,141 @@
+import pytest
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from yumljira.apps.common.test_utils import user_strategy
+
+from .utils import add_token
+
+from ..models import DailyUserTime, Project, Task, TimeLog, TimeLogRollup
+from ..serializers import TimeLogBulkSerializer
+from ..test_factories import TaskFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TimeLogBulkTestCase(TestCase):
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+        self.api_client = APIClient()
+        self.url = reverse('timelogs-bulk')
+        add_token(self.api_client, self.jwt)
+
+        self.task = TaskFactory()
+        self.task2 = TaskFactory()
+
+    def _post(self, entries):
+        return self.api_client.post(self.url, {'time_logs': entries}, format='json')
+
+    def _week(self, task):
+        return [{'task': task.pk, 'date': '2019-10-0{}'.format(day), 'time_logged': '1h 30m'}
+            for day in range(1, 6)]
+
+    def test_bulk_create(self):
+        response = self._post(self._week(self.task) + [
+            {'task': self.task2.pk, 'date': '2019-10-01', 'time_logged': '45'},
+        ])
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data) == 6
+        assert TimeLog.objects.filter(user=self.user).count() == 6
+
+        self.task.refresh_from_db()
+        project = Project.objects.get(pk=self.task2.column.project_id)
+
+        assert self.task.total_minutes == 450
+        assert project.total_minutes == 45
+        assert DailyUserTime.objects.get(user=self.user, date='2019-10-01').minutes == 135
+        assert TimeLogRollup.objects.get(task=self.task2).minutes == 45
+
+    def test_queries_do_not_depend_on_number_of_entries(self):
+        with CaptureQueriesContext(connection) as queries:
+            assert self._post(self._week(self.task)[:1]).status_code == status.HTTP_201_CREATED
+
+        with CaptureQueriesContext(connection) as queries2:
+            assert self._post(self._week(self.task2)).status_code == status.HTTP_201_CREATED
+
+        assert len(queries) == len(queries2)
+
+    def test_locks_only_rollups_of_logged_days(self):
+        TimeLogRollup.objects.create(task=self.task, user=self.user, date='2019-09-01', minutes=30)
+
+        with CaptureQueriesContext(connection) as queries:
+            assert self._post(self._week(self.task)[:1]).status_code == status.HTTP_201_CREATED
+
+        locks = [query['sql'] for query in queries
+            if query['sql'].endswith('FOR UPDATE') and 'projects_timelogrollup' in query['sql']]
+
+        assert len(locks) == 1
+        assert '"projects_timelogrollup"."date" IN' in locks[0]
+        assert TimeLogRollup.objects.get(task=self.task, date='2019-09-01').minutes == 30
+        assert TimeLogRollup.objects.get(task=self.task, date='2019-10-01').minutes == 90
+
+    def test_duration_rounding_and_limits(self):
+        response = self._post([
+            {'task': self.task.pk, 'date': '2019-10-01', 'time_logged': '0.5m'},
+            {'task': self.task.pk, 'date': '2019-10-02', 'time_logged': '0.01h'},
+        ])
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [log['time_logged'] for log in response.data] == ['1', '1']
+
+        response = self._post([
+            {'task': self.task.pk, 'date': '2019-10-01', 'time_logged': 'infm'},
+            {'task': self.task.pk, 'date': '2019-10-01', 'time_logged': '9999999999w'},
+        ])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert all('time_logged' in error for error in response.data['time_logs'])
+
+    def test_errors_per_entry(self):
+        response = self._post([
+            {'task': self.task.pk, 'date': '2019-10-01', 'time_logged': '1h'},
+            {'task': 0, 'date': '2019-10-01', 'time_logged': '1x'},
+            {'task': self.task.pk, 'date': '2019-10-01', 'time_logged': '0'},
+        ])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        errors = response.data['time_logs']
+
+        assert errors[0] == {}
+        assert set(errors[1]) == {'task', 'time_logged'}
+        assert set(errors[2]) == {'time_logged'}
+        assert not TimeLog.objects.exists()
+
+    def test_invalid_entry_fields(self):
+        response = self._post([{'task': self.task.pk, 'date': 'yesterday', 'time_logged': '1h'}])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'date' in response.data['time_logs'][0]
+
+    def test_empty(self):
+        response = self._post([])
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_too_many_entries(self):
+        entry = {'task': self.task.pk, 'date': '2019-10-01', 'time_logged': '1m'}
+
+        with patch.object(TimeLogBulkSerializer, 'max_time_logs', 3):
+            assert self._post([entry] * 3).status_code == status.HTTP_201_CREATED
+
+            response = self._post([entry] * 4)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'time_logs' in response.data
+        assert TimeLog.objects.count() == 3
+
+    def test_no_credentials(self):
+        self.api_client.credentials()
+
+        response = self._post(self._week(self.task))
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
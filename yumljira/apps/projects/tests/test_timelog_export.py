@@ -0,0 +1,68 @@
+import csv
+import json
+import pytest
+
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from yumljira.apps.common.test_utils import user_strategy
+
+from .utils import add_token
+
+from ..exports import TIME_LOG_EXPORT_FIELDS
+from ..test_factories import TaskFactory, TimeLogFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TimeLogExportTestCase(TestCase):
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+        self.api_client = APIClient()
+        self.url = reverse('timelogs-export')
+        add_token(self.api_client, self.jwt)
+
+        self.task = TaskFactory()
+        self.logs = [TimeLogFactory(task=self.task, user=self.user, date='2019-10-0{}'.format(day),
+            time_logged=10 * day) for day in range(1, 4)]
+        TimeLogFactory(task=TaskFactory())
+
+    def _export(self, **params):
+        response = self.api_client.get(self.url, params)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv(self):
+        rows = list(csv.reader(self._export(task=self.task.pk).splitlines()))
+
+        assert tuple(rows[0]) == TIME_LOG_EXPORT_FIELDS
+        assert [int(row[0]) for row in rows[1:]] == [log.pk for log in self.logs]
+        assert rows[1][4] == self.user.username
+        assert rows[1][7] == str(self.task.column.project_id)
+
+    def test_jsonl_filtered_by_date(self):
+        content = self._export(export_format='jsonl', task=self.task.pk,
+            date_after='2019-10-02', date_before='2019-10-02')
+        rows = [json.loads(line) for line in content.splitlines()]
+
+        assert len(rows) == 1
+        assert rows[0]['pk'] == self.logs[1].pk
+        assert rows[0]['date'] == '2019-10-02'
+        assert rows[0]['time_logged'] == 20
+
+    def test_filter_by_project(self):
+        content = self._export(export_format='jsonl',
+            task__column__project=self.task.column.project_id)
+
+        assert len(content.splitlines()) == 3
+
+    def test_unknown_format(self):
+        response = self.api_client.get(self.url, {'export_format': 'xml'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,209 @@
+import pytest
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from yumljira.apps.common.test_utils import user_strategy
+from yumljira.apps.users.test_factories import UserFactory
+
+from .utils import add_token
+
+from ..models import TimeLogRollup
+from ..test_factories import ColumnFactory, TaskFactory, TimeLogFactory
+
+pytestmark = pytest.mark.django_db
+
+
+class TimeLogReportTestCase(TestCase):
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+        self.user2 = UserFactory()
+        self.api_client = APIClient()
+        self.url = reverse('timelogs-report')
+        add_token(self.api_client, self.jwt)
+
+        self.task = TaskFactory()
+        self.task2 = TaskFactory(column=ColumnFactory(project=self.task.column.project))
+        self.other_task = TaskFactory()
+        self.project = self.task.column.project
+
+        # 2019-09-30 is Monday.
+        TimeLogFactory(task=self.task, user=self.user, date='2019-09-30', time_logged=10)
+        TimeLogFactory(task=self.task, user=self.user, date='2019-10-01', time_logged=20)
+        TimeLogFactory(task=self.task2, user=self.user2, date='2019-10-07', time_logged=30)
+        TimeLogFactory(task=self.other_task, user=self.user, date='2019-10-01', time_logged=40)
+
+        # Factories do not update rollups.
+        TimeLogRollup.refresh()
+
+    def _report(self, **params):
+        response = self.api_client.get(self.url, params)
+
+        assert response.status_code == status.HTTP_200_OK
+
+        return response.data
+
+    def test_group_by_user(self):
+        assert self._report(group_by='user') == sorted([
+            {'user': self.user.pk, 'minutes': 70, 'logs_count': 3},
+            {'user': self.user2.pk, 'minutes': 30, 'logs_count': 1},
+        ], key=lambda row: row['user'])
+
+    def test_group_by_project_and_week(self):
+        report = self._report(group_by='project', period='week',
+            task__column__project=self.project.pk)
+
+        assert [(row['project'], str(row['period']), row['minutes']) for row in report] == [
+            (self.project.pk, '2019-09-30', 30),
+            (self.project.pk, '2019-10-07', 30),
+        ]
+
+    def test_group_by_task_and_month_with_date_bounds(self):
+        report = self._report(group_by='task', period='month',
+            date_after='2019-10-01', date_before='2019-10-31')
+
+        assert {(row['task'], str(row['period'])): row['minutes'] for row in report} == {
+            (self.task.pk, '2019-10-01'): 20,
+            (self.task2.pk, '2019-10-01'): 30,
+            (self.other_task.pk, '2019-10-01'): 40,
+        }
+
+    def test_period_only(self):
+        report = self._report(period='day', user=self.user.pk)
+
+        assert [(str(row['period']), row['minutes']) for row in report] == [
+            ('2019-09-30', 10),
+            ('2019-10-01', 60),
+        ]
+
+    def test_single_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._report(group_by='user,task,project', period='day')
+
+        # Rollups of closed days and time logs of today.
+        assert len([query for query in queries if 'projects_timelog' in query['sql']]) == 2
+
+    def test_invalid_params(self):
+        for params in ({}, {'group_by': 'column'}, {'group_by': 'user,user'}, {'period': 'year'}):
+            response = self.api_client.get(self.url, params)
+
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_closed_days_read_from_rollups(self):
+        TimeLogRollup.objects.filter(user=self.user2).delete()
+
+        assert self._report(group_by='user') == [
+            {'user': self.user.pk, 'minutes': 70, 'logs_count': 3}]
+
+    def test_today_read_from_time_logs(self):
+        TimeLogFactory(task=self.task, user=self.user2, date=timezone.localdate(), time_logged=5)
+
+        report = self._report(group_by='user,task', user=self.user2.pk)
+
+        assert report == [
+            {'user': self.user2.pk, 'task': self.task.pk, 'minutes': 5, 'logs_count': 1},
+            {'user': self.user2.pk, 'task': self.task2.pk, 'minutes': 30, 'logs_count': 1},
+        ]
+
+    def test_days_are_merged(self):
+        today = timezone.localdate()
+        yesterday = today - timedelta(days=1)
+        TimeLogFactory(task=self.task, user=self.user, date=yesterday, time_logged=5)
+        TimeLogRollup.refresh(since=yesterday)
+        TimeLogFactory(task=self.task, user=self.user, date=today, time_logged=7)
+
+        report = self._report(group_by='task', task=self.task.pk, date_after=yesterday)
+
+        assert report == [{'task': self.task.pk, 'minutes': 12, 'logs_count': 2}]
+
+
+class TimeLogRollupTestCase(TestCase):
+    def setUp(self):
+        self.user, self.jwt = user_strategy()
+        self.api_client = APIClient()
+        add_token(self.api_client, self.jwt)
+
+        self.task = TaskFactory()
+
+    def _create_log(self, time_logged, date='2019-10-01', task=None):
+        response = self.api_client.post(reverse('timelogs-list'), {'task': (task or self.task).pk,
+            'date': date, 'time_logged': time_logged}, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+        return response.data['pk']
+
+    def _rollups(self):
+        return list(TimeLogRollup.objects.filter(logs_count__gt=0).order_by('date')
+            .values_list('date', 'task', 'project', 'minutes', 'logs_count'))
+
+    def test_incremental_refresh(self):
+        pk = self._create_log(30)
+        self._create_log(20)
+        self._create_log(10, date='2019-10-02')
+
+        response = self.api_client.patch(reverse('timelogs-detail', kwargs={'pk': pk}),
+            {'date': '2019-10-02'}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+
+        response = self.api_client.delete(reverse('timelogs-detail', kwargs={'pk': pk}))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        rollups = self._rollups()
+        project = self.task.column.project_id
+
+        assert [(str(date), *values) for date, *values in rollups] == [
+            ('2019-10-01', self.task.pk, project, 20, 1),
+            ('2019-10-02', self.task.pk, project, 10, 1),
+        ]
+
+        TimeLogRollup.refresh()
+
+        assert self._rollups() == rollups
+
+    def test_task_moved_to_other_project(self):
+        self._create_log(30)
+        column = ColumnFactory()
+
+        response = self.api_client.patch(reverse('tasks-detail', kwargs={'pk': self.task.pk}),
+            {'column': column.pk}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert TimeLogRollup.objects.get().project_id == column.project_id
+
+    def test_task_deleted(self):
+        pk = self._create_log(30)
+        other_task = TaskFactory(column=self.task.column)
+        self._create_log(10, task=other_task)
+
+        for task in (self.task, other_task):
+            response = self.api_client.delete(reverse('tasks-detail', kwargs={'pk': task.pk}))
+
+            assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        response = self.api_client.delete(reverse('timelogs-detail', kwargs={'pk': pk}))
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert sum(TimeLogRollup.objects.values_list('minutes', flat=True)) == 10
+        assert not TimeLogRollup.objects.exclude(project=None).exists()
+
+    def test_refresh_command(self):
+        TimeLogFactory(task=self.task, user=self.user, date='2019-10-01', time_logged=30)
+        TimeLogFactory(task=self.task, user=self.user, date='2019-10-02', time_logged=20)
+        out = StringIO()
+
+        call_command('refresh_time_rollups', since='2019-10-02', stdout=out)
+
+        assert 'Rollups refreshed: 1' in out.getvalue()
+        assert [minutes for _date, _task, _project, minutes, _count in self._rollups()] == [20]
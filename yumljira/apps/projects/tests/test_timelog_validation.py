@@ -204,4 +204,4 @@ class LogTimeCalculationsTestCase(TestCase):
 
         response = self.api_client.post(self.url, data, format='json')
 
-        assert response.data['time_logged'] == '30.0'
+        assert response.data['time_logged'] == '30'
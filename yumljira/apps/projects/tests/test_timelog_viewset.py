@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import patch
 from urllib import parse
 
 from django.urls import reverse
@@ -10,6 +11,7 @@ from hypothesis.extra.django import TestCase as HTestCase
 from hypothesis.strategies import integers
 
 from rest_framework import status
+from rest_framework.pagination import CursorPagination
 from rest_framework.test import APIClient
 
 from yumljira.apps.common.test_utils import user_strategy
@@ -50,6 +52,25 @@ class TimeLogViewsetTestCase(HTestCase):
         assert response.status_code == status.HTTP_401_UNAUTHORIZED
         assert logs_before == TimeLog.objects.count()
 
+    def test_time_log_list_cursor(self):
+        logs = [TimeLogFactory(user=self.user) for _ in range(5)]
+        add_token(self.api_client, self.jwt)
+
+        query = parse.urlencode({'pagination': 'cursor', 'user': self.user.pk})
+        url = f'{self.url}?{query}'
+        results = []
+
+        with patch.object(CursorPagination, 'page_size', 2):
+            while url:
+                response = self.api_client.get(url)
+
+                assert response.status_code == status.HTTP_200_OK
+
+                results += [log['pk'] for log in response.data['results']]
+                url = response.data['next']
+
+        assert results == [log.pk for log in logs]
+
     def _details_url(self, pk):
         return reverse('timelogs-detail', kwargs={'pk': pk})
 
@@ -206,3 +227,17 @@ def test_task_no_time_logged():
     data = TaskSerializer(TaskFactory()).data
 
     assert data['time_logged'] == 0
+
+
+@given(integers(min_value=1, max_value=200), integers(min_value=1, max_value=200))
+@settings(max_examples=10)
+def test_task_with_time_logged_annotation(time1, time2):
+    task = TaskFactory()
+    log = TimeLogFactory(task=task, time_logged=time1)
+    log2 = TimeLogFactory(task=task, time_logged=time2)
+    task2 = TaskFactory()
+
+    tasks = Task.objects.with_time_logged().filter(pk__in=[task.pk, task2.pk]).order_by('pk')
+
+    assert [t.time_logged_sum for t in tasks] == [time1 + time2, 0]
+    assert [t.time_logged for t in tasks] == [time1 + time2, 0]
@@ -9,6 +9,7 @@ router.register(r'tasks', views.TaskViewset, basename='tasks')
 router.register(r'timelogs', views.TimeLogViewset, basename='timelogs')
 router.register(r'comments', views.CommentViewset, basename='comments')
 router.register(r'columns', views.ColumnCreateUpdate, basename='columns')
+router.register(r'search', views.SearchViewset, basename='search')
 
 urlpatterns = [
     path('', views.base_view, name='base_view'),
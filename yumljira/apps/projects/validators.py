@@ -1,22 +1,30 @@
 from django.utils.translation import gettext as _
 
+from .choices import STORY
+from .models import Column
 
-def validate_number_in_board(number, project, old_value=None):
+
+def validate_number_in_board(number, project, old_value=None, last_number=None):
     """
     Validates `Column's` `number_in_board` field.
 
     Args:
         number (int) - Number to validate.
         project (`Project`) - Project instance.
+        old_value (int) - Current number of validated column, None for new column.
+        last_number (int) - Last number of project board. It is taken from
+            database when not passed.
 
     Returns:
         Tuple (bool, str) - Tuple which first value is success status and second
         is error message to display.
 
     Validation process:
-        First we check if number is not 0. Then we take current order of board.
+        First we check if number is not 0. Then we take last number of board.
         If new number is greater than number in last column we have to check
         if number between new number and last number is not greater than one.
+        Numbers of board are unique and continuous (1, 2, ..., last number)
+        so existing column may be moved only to number not greater than last one.
 
     Examples:
         number - 3
@@ -35,20 +43,37 @@ def validate_number_in_board(number, project, old_value=None):
     if number == 0:
         return (False, _('You have to specify number greater than 0.'))
 
-    columns_numbers = project.columns.all() \
-        .order_by('number_in_board') \
-        .values_list('number_in_board', flat=True)
-
-    last_number = columns_numbers.last()
+    if last_number is None:
+        last_number = Column.get_board_numbers(project)['last_number'] or 0
 
-    if number > last_number and number - last_number is not 1:
+    if number > last_number and number - last_number != 1:
         return (False, _('Number is too big.'))
 
-    if old_value == last_number and number - old_value is not 0:
+    if old_value == last_number and number - old_value != 0:
         return (False, _('Number is too big.'))
 
-    if old_value and number not in columns_numbers:
+    if old_value and number > last_number:
         return (False, _('Number is too big.'))
 
     return (True, '')
 
+
+def validate_story(task_type, story_type):
+    """
+    Validates `Task's` `story` field. Used by API and by import.
+
+    Args:
+        task_type (str) - Type of validated task.
+        story_type (str) - Type of task set as its story.
+
+    Returns:
+        Tuple (bool, dict) - Tuple which first value is success status and second
+        is dict of errors to display with field names as keys.
+    """
+    if task_type == STORY and story_type == STORY:
+        return (False, {'story': [_('Story cannot contain another story.')]})
+
+    if story_type != STORY:
+        return (False, {'task_type': [_('Only story may contain subtasks.')]})
+
+    return (True, {})
@@ -1,15 +1,33 @@
-from django.http import Http404
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.translation import gettext as _
 
 from django_filters.rest_framework import DjangoFilterBackend
 
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import CreateAPIView, DestroyAPIView, UpdateAPIView
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
-from .choices import KANBAN
+from .board import get_board, get_board_changes
+from .board_cache import get_cached_board
+from .choices import SCRUM, TASK_CHANGE
+from .exports import EXPORT_FORMATS, TIME_LOG_EXPORT_FIELDS, stream_export
 from .filters import *
+from .importer import ProjectImporter
 from .models import *
+from .pagination import ColumnTasksPagination, CursorOrPageNumberPagination, SearchPagination
+from .reports import get_time_report
+from .search import search_tasks
 from .serializers import *
 
 
@@ -17,14 +35,69 @@ def base_view(request):
     return render(request, 'base.html')
 
 
-class ProjectViewset(viewsets.ModelViewSet):
+class BoardVersionMixin:
+    """
+    Answers `list` and `retrieve` with `304 Not Modified` when boards of projects
+    returned by `get_version_projects` did not change since ETag or Last-Modified
+    sent by client (see `ProjectQuerySet.get_board_etag`). Version is read before
+    the response is built so the response is never newer than its ETag.
+    """
+    version_projects = None
+    """Queryset of projects responses depend on, required. Narrowed by `get_version_projects`."""
+
+    def get_version_projects(self):
+        """Returns queryset of projects the response depends on or None to skip check."""
+        assert self.version_projects is not None, (
+            "'{}' should include a `version_projects` attribute.".format(self.__class__.__name__))
+
+        return self.version_projects.all()
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(super().retrieve, request, *args, **kwargs)
+
+    def _conditional(self, view, request, *args, **kwargs):
+        try:
+            projects = self.get_version_projects()
+        except ValueError:
+            # Malformed pk or filter value is reported by the view.
+            projects = None
+
+        etag, last_modified = projects.get_board_etag() if projects is not None else (None, None)
+
+        if etag is None:
+            return view(request, *args, **kwargs)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+        if response is None:
+            response = view(request, *args, **kwargs)
+
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+
+        return response
+
+
+class ProjectViewset(BoardVersionMixin, viewsets.ModelViewSet):
     model = Project
     permission_classes = [IsAuthenticated]
-    queryset = Project.objects.all().order_by('id') \
-        .prefetch_related('sprints', 'columns', 'columns__tasks') \
-        .prefetch_related('columns__tasks__comments')
+    queryset = Project.objects.all().order_by('id')
     filter_backends = [DjangoFilterBackend]
     filterset_class = ProjectFilter
+    version_projects = Project.objects.all()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        # Only detail serializer renders sprints.
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('sprints')
+
+        return queryset
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
@@ -32,29 +105,170 @@ class ProjectViewset(viewsets.ModelViewSet):
         else:
             return ProjectSerializer
 
+    def get_version_projects(self):
+        projects = super().get_version_projects()
+
+        if self.action == 'retrieve':
+            return projects.filter(pk=self.kwargs['pk'])
+
+        return projects
+
+    @transaction.atomic
     def perform_create(self, serializer):
         sprint_name = serializer.validated_data.pop('sprint_name', None)
+        column_titles = serializer.validated_data.pop('column_titles', None)
+        sprint_names = serializer.validated_data.pop('sprint_names', [])
         project = serializer.save(created_by=self.request.user)
 
-        if project.board_type == KANBAN:
-            project.create_kanban_board()
-        else:
-            project.create_scrum_board(sprint_name)
+        if project.board_type == SCRUM:
+            sprint_names = [sprint_name, *sprint_names]
+
+        project.create_board(column_titles, sprint_names)
+
+    def perform_update(self, serializer):
+        # Board template is used only when project is created.
+        for field in ('column_titles', 'sprint_names'):
+            serializer.validated_data.pop(field, None)
+
+        serializer.save()
+
+    @action(detail=True, methods=['get'])
+    def board(self, request, pk=None):
+        # Cached snapshot is served after reading only board version (see `board_cache.py`).
+        version = Project.objects.filter(pk=pk).values_list('board_version', flat=True).first()
+
+        if version is None:
+            raise Http404
+
+        return Response(get_cached_board(pk, version, lambda: get_board(self.get_object())))
+
+    @action(detail=True, methods=['get'])
+    def changes(self, request, pk=None):
+        """
+        Returns board objects changed since board version given in `since`.
+        Responds with 410 when changes are not kept that long and the whole
+        board has to be fetched again.
+        """
+        params = BoardChangesParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        changes = get_board_changes(self.get_object(), params.validated_data['since'])
 
+        if changes is None:
+            return Response({'detail': _('Changes since this version are not available.')},
+                status=status.HTTP_410_GONE)
 
-class TaskViewset(viewsets.ModelViewSet):
+        return Response(changes)
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_projects(self, request):
+        """Imports projects from uploaded JSON Lines `file` (see `importer.py`)."""
+        upload = request.FILES.get('file')
+
+        if upload is None:
+            raise ValidationError({'file': [_('File is required.')]})
+
+        counts = ProjectImporter(default_user=request.user).run(upload)
+
+        return Response(counts, status=status.HTTP_201_CREATED)
+
+
+class TaskViewset(BoardVersionMixin, viewsets.ModelViewSet):
     model = Task
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated]
-    queryset = Task.objects.all().order_by('id') \
+    queryset = Task.objects.with_time_logged().order_by('id') \
         .select_related('column', 'story') \
-        .prefetch_related('time_logs')
+        .prefetch_related('comments')
     filter_backends = [DjangoFilterBackend]
     filterset_class = TaskFilter
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = 'id'
+    version_projects = Project.objects.all()
+
+    def get_version_projects(self):
+        projects = super().get_version_projects()
+        params = self.request.query_params
+
+        if self.action == 'retrieve':
+            return projects.filter(columns__tasks=self.kwargs['pk'])
+        elif params.get('column__project'):
+            return projects.filter(pk=params['column__project'])
+        elif params.get('column'):
+            return projects.filter(columns=params['column'])
+
+        return projects
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    @action(detail=False, methods=['post'])
+    @transaction.atomic
+    def move(self, request):
+        """Moves many tasks between columns. Returns moved tasks."""
+        serializer = TaskBulkMoveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        tasks = serializer.save()
+
+        return Response(TaskMovedSerializer(tasks, many=True).data)
+
+    @action(detail=True, methods=['post'])
+    @transaction.atomic
+    def reorder(self, request, pk=None):
+        """Places task between its new neighbours. Changes only rank of the task."""
+        serializer = TaskReorderSerializer(self.get_object(), data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return Response(serializer.data)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        old_column = serializer.instance.column
+        old_project = old_column.project_id
+        new_column = serializer.validated_data.get('column', old_column)
+
+        if new_column != old_column:
+            task = serializer.save(rank=Task.get_append_rank(new_column))
+        else:
+            task = serializer.save()
+        new_project = task.column.project_id
+
+        if old_project != new_project:
+            # Subtasks keep their columns so only time of the task itself is moved.
+            # Lock task so no time is logged for it until totals are moved.
+            minutes = Task.objects.select_for_update() \
+                .values_list('total_minutes', flat=True) \
+                .get(pk=task.pk)
+
+            Project.objects.filter(pk=old_project) \
+                .update(total_minutes=F('total_minutes') - minutes)
+            Project.objects.filter(pk=new_project) \
+                .update(total_minutes=F('total_minutes') + minutes)
+            TimeLogRollup.objects.filter(task=task).update(project=new_project)
+            Project.board_changed([(old_project, TASK_CHANGE, task.pk)])
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        # Time logs are not removed with task so they stop counting to project.
+        # Subtasks of story are removed by cascade and may be in other projects.
+        tasks = Task.objects.select_for_update(of=('self',)) \
+            .filter(Q(pk=instance.pk) | Q(story=instance)) \
+            .values_list('pk', 'column__project', 'total_minutes')
+
+        pks = []
+        projects = defaultdict(int)
+
+        for pk, project, minutes in tasks:
+            pks.append(pk)
+            projects[project] += minutes
+
+        Project.objects.bulk_update([Project(pk=pk, total_minutes=F('total_minutes') - minutes)
+            for pk, minutes in projects.items()], ['total_minutes'])
+        TimeLogRollup.objects.filter(task__in=pks).update(project=None)
+
+        super().perform_destroy(instance)
+
 
 class TimeLogViewset(viewsets.ModelViewSet):
     model = TimeLog
@@ -63,9 +277,73 @@ class TimeLogViewset(viewsets.ModelViewSet):
     queryset = TimeLog.objects.all().order_by('id').select_related('task', 'user')
     filter_backends = [DjangoFilterBackend]
     filterset_class = TimeLogFilter
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = 'id'
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        log = serializer.save(user=self.request.user)
+
+        TimeLog.update_totals(log.task, log.user, log.date, log.time_logged)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        # Instance still keeps old values until serializer is saved.
+        old_log = serializer.instance
+        TimeLog.update_totals(old_log.task, old_log.user, old_log.date, -old_log.time_logged)
+
+        log = serializer.save()
+        TimeLog.update_totals(log.task, log.user, log.date, log.time_logged)
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        TimeLog.update_totals(instance.task, instance.user, instance.date, -instance.time_logged)
+
+        super().perform_destroy(instance)
+
+    @action(detail=False, methods=['post'])
+    @transaction.atomic
+    def bulk(self, request):
+        """Logs time of request user for many tasks at once."""
+        serializer = TimeLogBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        time_logs = serializer.save(user=request.user)
+
+        return Response(TimeLogSerializer(time_logs, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'])
+    def report(self, request):
+        """Returns logged time of logs matching `TimeLogFilter` summed by groups and period."""
+        serializer = TimeReportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        time_logs = self.filter_queryset(self.get_queryset())
+        rollups = TimeLogRollupFilter(request.query_params,
+            queryset=TimeLogRollup.objects.all(), request=request).qs
+
+        return Response(get_time_report(time_logs, rollups,
+            serializer.validated_data['group_by'], serializer.validated_data.get('period')))
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Streams time logs matching `TimeLogFilter` as CSV (default)
+        or JSON Lines (`export_format=jsonl`).
+        """
+        export_format = request.query_params.get('export_format', 'csv')
+
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({'export_format': [_('Unknown export format.')]})
+
+        queryset = self.filter_queryset(self.get_queryset())
+
+        response = StreamingHttpResponse(
+            stream_export(queryset, TIME_LOG_EXPORT_FIELDS, export_format),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        response['Content-Disposition'] = 'attachment; filename="timelogs.{}"'.format(export_format)
+
+        return response
 
     def get_object(self):
         obj = super().get_object()
@@ -76,17 +354,30 @@ class TimeLogViewset(viewsets.ModelViewSet):
         return obj
 
 
-class CommentViewset(viewsets.ModelViewSet):
+class CommentViewset(BoardVersionMixin, viewsets.ModelViewSet):
     model = Comment
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticated]
-    queryset = Comment.objects.all().order_by('-created').select_related('task', 'owner')
+    queryset = Comment.objects.all().order_by('-created', '-id').select_related('task', 'owner')
     filter_backends = [DjangoFilterBackend]
-    fiterset_class = CommentFilter
+    filterset_class = CommentFilter
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = ('-created', '-id')
+    version_projects = Project.objects.all()
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
+    def get_version_projects(self):
+        projects = super().get_version_projects()
+
+        if self.action == 'retrieve':
+            # Other users get 404 from `get_object`, their requests are not checked.
+            return projects.filter(columns__tasks__comments=self.kwargs['pk'],
+                columns__tasks__comments__owner=self.request.user)
+
+        return projects
+
     def get_object(self):
         obj = super().get_object()
 
@@ -101,26 +392,45 @@ class ColumnCreateUpdate(viewsets.ViewSet, CreateAPIView, DestroyAPIView, Update
     permission_classes = [IsAuthenticated]
     queryset = Column.objects.all().order_by('number_in_board').select_related('project')
 
+    @transaction.atomic
     def perform_create(self, serializer):
         number = serializer.validated_data['number_in_board']
         project = serializer.validated_data['project']
         Column.update_board_numbers(number, self.action, project)
 
-        super().perform_create(serializer)
+        serializer.save()
 
+    @transaction.atomic
     def perform_update(self, serializer):
-        number = serializer.validated_data.get('number_in_board', None)
+        column = serializer.instance
 
-        if number:
-            Column.update_board_numbers_exist(number, self.get_object())
+        try:
+            Column.update_board_numbers_exist(serializer.validated_data.get('number_in_board'), column)
+        except Column.DoesNotExist:
+            # Removed by other request while waiting for board lock.
+            raise Http404
 
-        super().perform_update(serializer)
+        # Only number applied under board lock is saved.
+        serializer.save(number_in_board=column.number_in_board)
 
+    @transaction.atomic
     def perform_destroy(self, instance):
-        Column.update_board_numbers(instance.number_in_board, self.action, instance.project)
+        Column.update_board_numbers(None, self.action, instance.project, instance)
 
         super().perform_destroy(instance)
 
+    @action(detail=True, methods=['get'])
+    def tasks(self, request, pk=None):
+        tasks = Task.objects.filter(column=self.get_object()) \
+            .with_time_logged() \
+            .prefetch_related('comments')
+
+        paginator = ColumnTasksPagination()
+        page = paginator.paginate_queryset(tasks, request, view=self)
+        serializer = TaskSerializer(page, many=True, context=self.get_serializer_context())
+
+        return paginator.get_paginated_response(serializer.data)
+
     def get_object(self):
         obj = super().get_object()
 
@@ -129,3 +439,22 @@ class ColumnCreateUpdate(viewsets.ViewSet, CreateAPIView, DestroyAPIView, Update
 
         return obj
 
+
+class SearchViewset(viewsets.GenericViewSet):
+    """
+    Full text search of tasks by their title, description and comments
+    (see `search.py`). Results may be limited to single `project`.
+    """
+    serializer_class = TaskSearchResultSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = SearchPagination
+
+    def list(self, request):
+        params = SearchParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        queryset = search_tasks(params.validated_data['q'], params.validated_data.get('project')) \
+            .select_related('column')
+        page = self.paginate_queryset(queryset)
+
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
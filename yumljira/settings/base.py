@@ -116,3 +116,16 @@ MEDIA_URL = '/uploads/'
 
 DEFAULT_AVATAR = 'assets/images/default_avatar.png'
 
+# Board snapshots are keyed by board version so per process cache is safe, board cache stats are per process then.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+# Search backend of tasks, use `InMemorySearchBackend` with databases other than Postgres.
+SEARCH_BACKEND = 'yumljira.apps.projects.search.PostgresSearchBackend'
+